@@ -0,0 +1,991 @@
+"""
+ASUS GARCH PRO 2025 - FUNÇÕES DO ANALYZER
+Download, ajuste dos modelos GARCH e geração de relatórios (sem Streamlit)
+"""
+
+import pandas as pd
+import numpy as np
+import motor_garch
+from diagnosticos import ljung_box_lote, arch_lm_lote, lags_ljung_box
+from cache_ajustes import chave_ajuste
+from graficos import reduzir_serie
+from previsao import estado_final, prever_lote, N_CAMINHOS, SEMENTE_PADRAO
+from tabela_candidatos import construir_tabela, visao_csv_mt5, visao_linhas_relatorio
+from coordenacao import VOO_DOWNLOADS, VOO_AJUSTES, LIMITE_DOWNLOADS, espelhar
+from grade_modelos import (
+    GRADE_ESTENDIDA, BuscaPodada, dist_modelo, nomes_parametros, valor_inicial, semente_aninhada, DISTRIBUICOES
+)
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED, CancelledError
+)
+from datetime import datetime
+
+# ==================== CONFIGURAÇÕES GLOBAIS ====================
+MODELOS_ANALYZER = [
+    ('GARCH', 1, 0, 1, 'GARCH(1,1)'),
+    ('GARCH', 1, 0, 2, 'GARCH(1,2)'),
+    ('GARCH', 2, 0, 1, 'GARCH(2,1)'),
+    ('EGARCH', 1, 1, 1, 'EGARCH(1,1)'),
+    ('EGARCH', 1, 1, 2, 'EGARCH(1,2)'),
+    ('GJR', 1, 1, 1, 'GJR-GARCH(1,1,1)')
+]
+
+# Grades disponíveis (grade_modelos.py): a padrão acima e a de erros t/skew-t
+# com ordens até (3,3), que pede a busca podada
+GRADES = {'padrao': MODELOS_ANALYZER, 'estendida': GRADE_ESTENDIDA}
+
+# "arch" = arch_model().fit(); "rapido" = motor_garch (GARCH/GJR em NumPy com
+# gradiente analítico; EGARCH continua no arch, cuja recursão é compilada)
+BACKENDS_AJUSTE = ("arch", "rapido")
+# O arch ajusta com os retornos em %: em fração o otimizador dele para perto
+# do valor inicial (é nessa escala que o motor rápido foi conferido)
+ESCALA_ARCH = motor_garch.ESCALA_ARCH
+# Filho semeado pelo pai aninhado que termina sem ganhar log-verossimilhança
+# (relativa) sobre ele parou na semente: é refeito a frio e fica o melhor
+TOL_LOGLIK_ANINHADO = 1e-6
+
+TICKER_MAP = {
+    'MES=F': 'ES', 'MNQ=F': 'NQ', 'M2K=F': 'RTY', 'MYM=F': 'YM',
+    'EURUSD=X': 'EURUSD', 'BRL=X': 'USDBRL'
+}
+
+# ==================== FUNÇÕES DO ANALYZER ====================
+MIN_PONTOS = 500
+
+class DadosInsuficientes(ValueError):
+    """Série com menos de MIN_PONTOS fechamentos — repetir o download não adianta"""
+
+def _baixar_uma_vez(ticker, inicio, fim, cache=None):
+    if cache is not None:
+        close = cache.obter(ticker, inicio, fim)
+    else:
+        import yfinance as yf  # importado sob demanda (início rápido do app)
+        with LIMITE_DOWNLOADS:
+            df = yf.download(ticker, start=inicio, end=fim, progress=False, auto_adjust=True)
+        close = df['Close'].dropna()
+    if len(close) < MIN_PONTOS:
+        raise DadosInsuficientes(f"Menos de {MIN_PONTOS} pontos")
+    return close
+
+def _espera_backoff(tentativa, espera_base=0.5, espera_max=8.0):
+    """Backoff exponencial com jitter completo: U(0, min(max, base·2^n))"""
+    return random.uniform(0, min(espera_max, espera_base * 2 ** tentativa))
+
+def _baixar_com_retentativas(ticker, inicio, fim, cache, tentativas, estat):
+    for n in range(tentativas):
+        estat['tentativas'] += 1
+        try:
+            return _baixar_uma_vez(ticker, inicio, fim, cache)
+        except Exception as e:
+            estat['falhas'] += 1
+            estat['erro'] = str(e)
+            if isinstance(e, DadosInsuficientes) or (cache is not None and cache.offline):
+                break
+            if n < tentativas - 1:
+                time.sleep(_espera_backoff(n))
+    raise ValueError(f"Falha ao baixar {ticker} ({estat['erro']})")
+
+def _chave_download(ticker, inicio, fim, cache):
+    origem = None if cache is None else (os.path.abspath(cache.diretorio), cache.offline)
+    return ticker, str(inicio)[:10], str(fim)[:10], origem
+
+def baixar_dados(ticker, inicio, fim, cache=None, tentativas=5, estat=None):
+    """
+    Fechamentos do ticker; com `cache` (CachePrecos) só baixa o que falta.
+    Repete com backoff exponencial + jitter; falta de dados (< MIN_PONTOS)
+    ou modo offline não são repetidos. `estat` (dict) recebe latência,
+    tentativas e falhas do ticker. O mesmo pedido já em voo em outra sessão
+    não é repetido: espera o dele ('compartilhado' em `estat`).
+    """
+    estat = estat if estat is not None else {}
+    estat.update({'ticker': ticker, 'tentativas': 0, 'falhas': 0, 'ok': False, 'erro': None,
+                  'compartilhado': False})
+    t0 = time.perf_counter()
+    try:
+        close = VOO_DOWNLOADS.executar(_chave_download(ticker, inicio, fim, cache), _baixar_com_retentativas,
+                                       ticker, inicio, fim, cache, tentativas, estat)
+        estat['ok'] = True
+        return close
+    except Exception as e:
+        estat['erro'] = estat['erro'] or str(e)
+        raise
+    finally:
+        # Quem esperou o download de outra sessão não fez nenhuma tentativa
+        estat['compartilhado'] = estat['tentativas'] == 0
+        estat['latencia_s'] = time.perf_counter() - t0
+
+def iterar_downloads(tickers, inicio, fim, cache=None, max_concorrencia=8, tentativas=5):
+    """
+    Etapa de download em lote: baixa os tickers num pool limitado de threads
+    e devolve (ticker, precos, erro, estat) à medida que cada um termina — um
+    ticker com falha não segura os demais. No máximo `max_concorrencia`
+    downloads ficam em voo/à espera do consumidor (memória limitada mesmo
+    com milhares de tickers).
+    """
+    fila = iter(tickers)
+    with ThreadPoolExecutor(max_workers=max(1, max_concorrencia)) as pool:
+        futuros = {}
+
+        def _enviar_proximo():
+            ticker = next(fila, None)
+            if ticker is not None:
+                estat = {}
+                fut = pool.submit(baixar_dados, ticker, inicio, fim, cache, tentativas, estat)
+                futuros[fut] = (ticker, estat)
+
+        for _ in range(max(1, max_concorrencia)):
+            _enviar_proximo()
+        while futuros:
+            prontos, _ = wait(list(futuros), return_when=FIRST_COMPLETED)
+            for fut in prontos:
+                ticker, estat = futuros.pop(fut)
+                _enviar_proximo()
+                try:
+                    yield ticker, fut.result(), None, estat
+                except Exception as e:
+                    yield ticker, None, e, estat
+
+def baixar_lote(tickers, inicio, fim, cache=None, max_concorrencia=8, tentativas=5):
+    """Versão não incremental: retorna ({ticker: precos}, {ticker: erro}, [estat])"""
+    precos, erros, relatorio = {}, {}, []
+    for ticker, serie, erro, estat in iterar_downloads(tickers, inicio, fim, cache,
+                                                       max_concorrencia, tentativas):
+        if erro is None:
+            precos[ticker] = serie
+        else:
+            erros[ticker] = erro
+        relatorio.append(estat)
+    return precos, erros, relatorio
+
+def calcular_retornos(precos):
+    ret = np.log(precos / precos.shift(1)).dropna()
+    return ret.replace([np.inf, -np.inf], np.nan).dropna()
+
+def ljung_box_candidatos(series, lags=20):
+    """
+    p-valores Ljung-Box de várias séries (z² de cada candidato) numa passada
+    vetorizada (diagnosticos.ljung_box_lote). Onde o teste não pode ser
+    calculado (série curta, NaN, constante) o p-valor é 0.0, como antes.
+    """
+    series = [np.asarray(s, dtype=float) for s in series]
+    pvalores = np.zeros(len(series))
+    for n in {len(s) for s in series}:
+        idx = [i for i, s in enumerate(series) if len(s) == n]
+        _, pv = ljung_box_lote([series[i] for i in idx], lags=(lags_ljung_box(n, lags),))
+        pvalores[idx] = pv[:, 0]
+    return [float(p) if np.isfinite(p) else 0.0 for p in pvalores]
+
+def ljung_box_test(residuals_sq, lags=20):
+    return ljung_box_candidatos([residuals_sq], lags)[0]
+
+def _vol_arch(vol_type):
+    """'GJR' não é um vol do arch_model: é o GARCH com termo assimétrico (o > 0)"""
+    return 'GARCH' if vol_type.upper() == 'GJR' else vol_type
+
+def _motor_efetivo(vol_type, backend, dist='normal'):
+    """Motor que de fato ajusta o modelo (EGARCH e erros não normais sempre vão para o arch)"""
+    return "rapido" if backend == "rapido" and vol_type.upper() != 'EGARCH' and dist == 'normal' else "arch"
+
+def chave_cache_modelo(ticker, retornos, vol_type, p, o, q, backend="arch", dist='normal', starting_values=None):
+    """Chave do CacheAjustes para um modelo da grade (a semente do warm start entra na chave)"""
+    return chave_ajuste(ticker, retornos, vol_type, p, o, q, dist, _motor_efetivo(vol_type, backend, dist),
+                        starting_values)
+
+def ajustar_modelo(retornos, vol_type, p, o, q, backend="arch", starting_values=None,
+                   cache_ajustes=None, ticker="", calcular_lb=True, dist='normal', loglik_pai=None):
+    """
+    Ajusta um modelo da grade. starting_values (layout do arch: mu, omega,
+    alpha..., gamma..., beta... e os parâmetros da distribuição) permite warm
+    start; com `loglik_pai` (semente vinda do pai aninhado) um ajuste que não
+    supera a log-verossimilhança do pai é refeito a frio e fica o de menor
+    AIC. 'nit' registra as iterações do otimizador (somadas as duas partidas). Com `cache_ajustes`
+    (CacheAjustes) o resultado é reaproveitado se a mesma série/modelo já foi
+    ajustada ('do_cache'). calcular_lb=False deixa 'lb_p' em None e devolve
+    os z² em 'z2', para o Ljung-Box ser feito em lote (selecionar_melhor_modelo).
+    dist ('normal', 't' ou 'skewt') é a distribuição dos erros; fora da normal
+    o model_name ganha o sufixo da distribuição (ex.: 'GARCH(1,1)-t').
+    """
+    if cache_ajustes is not None:
+        chave = chave_cache_modelo(ticker, retornos, vol_type, p, o, q, backend, dist, starting_values)
+        res = cache_ajustes.obter(chave)
+        if res is None:
+            res = ajustar_modelo(retornos, vol_type, p, o, q, backend, starting_values, dist=dist,
+                                 loglik_pai=loglik_pai)
+            cache_ajustes.guardar(chave, res)
+            return res
+        return resultado_do_cache(res)
+    # O mesmo ajuste (mesma semente) em voo em outra sessão não é refeito: espera o dele (coordenacao.py)
+    chave = (chave_cache_modelo(ticker, retornos, vol_type, p, o, q, backend, dist, starting_values), calcular_lb)
+    return VOO_AJUSTES.executar(chave, _ajustar_modelo, retornos, vol_type, p, o, q, backend, starting_values,
+                                calcular_lb, dist, loglik_pai)
+
+def loglik_ajuste(res):
+    """Log-verossimilhança de um resultado de ajustar_modelo (AIC = 2k - 2·LL)"""
+    return len(res['params']) - res['aic'] / 2
+
+def _parou_na_semente(res, loglik_pai):
+    if not (res['success'] and res['convergiu']):
+        return True
+    return loglik_ajuste(res) <= loglik_pai + TOL_LOGLIK_ANINHADO * max(1.0, abs(loglik_pai))
+
+def _ajustar_modelo(retornos, vol_type, p, o, q, backend, starting_values, calcular_lb, dist, loglik_pai=None):
+    res = _ajustar_partida(retornos, vol_type, p, o, q, backend, starting_values, calcular_lb, dist)
+    if starting_values is None or loglik_pai is None or not _parou_na_semente(res, loglik_pai):
+        return res
+    frio = _ajustar_partida(retornos, vol_type, p, o, q, backend, None, calcular_lb, dist)
+    melhor = frio if frio['success'] and frio['aic'] < res['aic'] else res
+    return dict(melhor, nit=res['nit'] + frio['nit'], tempo_ajuste_s=res['tempo_ajuste_s'] + frio['tempo_ajuste_s'])
+
+def _ajustar_partida(retornos, vol_type, p, o, q, backend, starting_values, calcular_lb, dist):
+    sufixo = "" if dist == 'normal' else f"-{dist}"
+    # No arch o ajuste roda em % e os parâmetros/AIC voltam para fração (o
+    # motor rápido já otimiza na série padronizada)
+    fator = 1.0 if _motor_efetivo(vol_type, backend, dist) == "rapido" else ESCALA_ARCH
+    t0 = time.perf_counter()
+    try:
+        if fator == 1.0:
+            res = motor_garch.estimar(retornos, vol_type, p, o, q, maxiter=1000,
+                                      starting_values=starting_values)
+            nit, flag = res.nit, res.convergence_flag
+        else:
+            from arch import arch_model  # importado sob demanda (início rápido do app)
+            if isinstance(retornos, motor_garch.EstatisticasRetorno):
+                retornos = pd.Series(retornos.y, index=retornos.index)
+            if starting_values is not None:
+                starting_values = motor_garch.reescalar_params(
+                    pd.Series(starting_values, index=nomes_parametros(p, o, q, dist)), vol_type, fator).values
+            model = arch_model(retornos * fator, vol=_vol_arch(vol_type), p=p, o=o, q=q, dist=dist)
+            res = model.fit(disp="off", starting_values=starting_values, options={'maxiter': 1000})
+            nit, flag = res.optimization_result.nit, res.convergence_flag
+        params, aic = res.params, res.aic
+        if fator != 1.0:
+            params = motor_garch.reescalar_params(params, vol_type, 1 / fator)
+            aic = aic - 2 * res.nobs * np.log(fator)  # em % a log-verossimilhança perde n·ln(fator)
+        t1 = time.perf_counter()
+        Z2 = (res.resid / res.conditional_volatility).dropna() ** 2
+        resultado = {
+            'params': params,
+            'aic': aic,
+            'lb_p': ljung_box_test(Z2) if calcular_lb else None,
+            'success': True,
+            'model_name': (f"{vol_type}({p},{o},{q})" if o else f"{vol_type}({p},{q})") + sufixo,
+            'especificacao': (vol_type, p, o, q),
+            'dist': dist,
+            'nit': int(nit),
+            'convergiu': flag == 0,
+            'tempo_ajuste_s': t1 - t0,
+            'tempo_lb_s': time.perf_counter() - t1
+        }
+        if not calcular_lb:
+            resultado['z2'] = Z2.values
+        return resultado
+    except:
+        return {'params': None, 'aic': np.inf, 'lb_p': 0.0, 'success': False, 'model_name': vol_type + sufixo,
+                'especificacao': (vol_type, p, o, q), 'dist': dist, 'nit': 0, 'convergiu': False, 'tempo_ajuste_s': time.perf_counter() - t0, 'tempo_lb_s': 0.0}
+
+def resultado_do_cache(res, **extras):
+    """Cópia de um ajuste vindo do CacheAjustes (sem iterações nem tempo gasto)"""
+    return dict(res, nit=0, tempo_ajuste_s=0.0, tempo_lb_s=0.0, do_cache=True, **extras)
+
+# ==================== WARM START (MODELOS ANINHADOS + PARÂMETROS DE ONTEM) ====================
+PARAMS_FILE = "params_anteriores.json"
+
+def carregar_params_anteriores(arquivo=PARAMS_FILE):
+    """Carrega os últimos parâmetros ajustados {ticker: {modelo: {param: valor}}}"""
+    if os.path.exists(arquivo):
+        try:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except:
+            return {}
+    return {}
+
+def salvar_params_anteriores(params_dict, arquivo=PARAMS_FILE):
+    """Salva os parâmetros de hoje para servirem de semente amanhã"""
+    tmp = arquivo + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(params_dict, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, arquivo)
+
+def _familia(vol_type):
+    return 'EGARCH' if vol_type.upper() == 'EGARCH' else 'GARCH'
+
+def _nivel_dist(modelo):
+    return DISTRIBUICOES.index(dist_modelo(modelo))
+
+def indice_pai_aninhado(modelos, i):
+    """
+    Índice do maior modelo ANTERIOR na grade do qual o modelo i é extensão
+    (mesma família, p/o/q menores ou iguais, distribuição normal ⊂ t ⊂ skew-t),
+    ou None. Pais da mesma distribuição vêm primeiro: as ordens crescem dentro
+    de cada distribuição (um ramo t que não melhora não poda o ramo normal).
+    Ex.: GARCH(1,1) é pai de GARCH(1,2), GARCH(2,1), GJR(1,1,1) e GARCH(1,1)-t.
+    """
+    vol, p, o, q = modelos[i][:4]
+    nivel = _nivel_dist(modelos[i])
+    candidatos = [j for j in range(i)
+                  if _familia(modelos[j][0]) == _familia(vol)
+                  and modelos[j][1] <= p and modelos[j][2] <= o and modelos[j][3] <= q
+                  and _nivel_dist(modelos[j]) <= nivel
+                  and (tuple(modelos[j][1:4]), _nivel_dist(modelos[j])) != ((p, o, q), nivel)]
+    if not candidatos:
+        return None
+    return max(candidatos, key=lambda j: (_nivel_dist(modelos[j]) == nivel, sum(modelos[j][1:4]),
+                                          _nivel_dist(modelos[j])))
+
+def _extensoes_diretas(modelos, i):
+    """Modelos da grade que estendem o i em um passo (uma ordem a mais ou a distribuição seguinte)"""
+    vol, p, o, q = modelos[i][:4]
+    nivel = _nivel_dist(modelos[i])
+    return [j for j, m in enumerate(modelos)
+            if _familia(m[0]) == _familia(vol) and m[1] >= p and m[2] >= o and m[3] >= q
+            and _nivel_dist(m) >= nivel
+            and sum(m[1:4]) - (p + o + q) + _nivel_dist(m) - nivel == 1]
+
+def semente_warm_start(modelos, i, ajustados, sementes=None):
+    """
+    Valores iniciais do modelo i: parâmetros de ontem do mesmo modelo, senão as
+    estimativas do pai aninhado com os termos novos fora do zero
+    (grade_modelos.semente_aninhada). Retorna (sv, origem) com origem
+    'ontem', 'aninhado' ou None (partida fria).
+    """
+    vol, p, o, q, nome = modelos[i][:5]
+    nomes = nomes_parametros(p, o, q, dist_modelo(modelos[i]))
+    anteriores = (sementes or {}).get(nome)
+    if anteriores and all(n in anteriores for n in nomes):
+        return [float(anteriores[n]) for n in nomes], 'ontem'
+    pai = indice_pai_aninhado(modelos, i)
+    if pai is not None and pai in ajustados and ajustados[pai]['success']:
+        return semente_aninhada(ajustados[pai]['params'], vol, p, o, q, dist_modelo(modelos[i])), 'aninhado'
+    return None, None
+
+def loglik_semente(modelos, i, ajustados, origem):
+    """Log-verossimilhança do pai que semeou o modelo i (None fora da semente aninhada)"""
+    return loglik_ajuste(ajustados[indice_pai_aninhado(modelos, i)]) if origem == 'aninhado' else None
+
+def params_para_semente(resultados):
+    """{nome_exibicao: {param: valor}} dos candidatos ajustados com sucesso"""
+    return {r['nome_exibicao']: {k: float(v) for k, v in r['params'].items()}
+            for r in resultados if r['success']}
+
+def diagnosticar_lote(resultados, lags=20, arch_lm_lags=None):
+    """
+    Ljung-Box (e ARCH-LM opcional, 'arch_lm_p') de todos os candidatos
+    ajustados com calcular_lb=False numa só passada; consome os 'z2'.
+    """
+    pendentes = [r for r in resultados if 'z2' in r]
+    if not pendentes:
+        return
+    t0 = time.perf_counter()
+    z2 = [r.pop('z2') for r in pendentes]
+    pvalores = ljung_box_candidatos(z2, lags)
+    if arch_lm_lags:
+        _, pv_lm = arch_lm_lote(z2, arch_lm_lags)
+    por_modelo = (time.perf_counter() - t0) / len(pendentes)
+    for i, r in enumerate(pendentes):
+        r['lb_p'] = pvalores[i]
+        r['tempo_lb_s'] = por_modelo
+        if arch_lm_lags:
+            r['arch_lm_p'] = float(pv_lm[i])
+
+def _motivo_poda(modelos, i, ajustados, podados, busca):
+    """Por que o modelo i não precisa ser ajustado (None = ajustar)"""
+    pai = indice_pai_aninhado(modelos, i)
+    if busca is None or pai is None:
+        return None
+    if pai in podados:
+        return 'pai_podado'
+    r_pai = ajustados[pai]
+    if busca.pular_pai_falho and not (r_pai['success'] and r_pai.get('convergiu', True)):
+        return 'pai_nao_convergiu'
+    avo = indice_pai_aninhado(modelos, pai)
+    if (busca.parar_sem_melhora and avo is not None and ajustados[avo]['success']
+            and r_pai['aic'] >= ajustados[avo]['aic']):
+        return 'sem_melhora_aic'
+    return None
+
+def _ajustar_grade(retornos, ticker, modelos, backend, cache_ajustes, semear, busca=None,
+                   indices=None, arch_lm_lags=None, base=None):
+    """
+    Ajusta os modelos `indices` da grade (todos por padrão), na ordem, com as
+    podas de `busca`; semear(i, ajustados) → (sv, origem). `base` são ajustes
+    já feitos na mesma série (semeiam os filhos e voltam no resultado). O
+    Ljung-Box é feito em lote no fim. Retorna ({i: resultado}, {i: motivo da poda}).
+    """
+    if backend == "rapido":
+        # Estatísticas da série calculadas uma vez para todos os modelos
+        retornos = motor_garch.EstatisticasRetorno(retornos)
+    ajustados, podados, chaves = dict(base or {}), {}, {}
+    for i in (range(len(modelos)) if indices is None else indices):
+        motivo = _motivo_poda(modelos, i, ajustados, podados, busca)
+        if motivo is not None:
+            podados[i] = motivo
+            continue
+        vol, p, o, q, nome = modelos[i][:5]
+        dist = dist_modelo(modelos[i])
+        sv, origem = semear(i, ajustados)
+        res = None
+        if cache_ajustes is not None:
+            chaves[i] = chave_cache_modelo(ticker, retornos, vol, p, o, q, backend, dist, sv)
+            res = cache_ajustes.obter(chaves[i])
+            res = resultado_do_cache(res) if res is not None else None
+        if res is None:
+            # Ljung-Box fica para o lote, depois de todos os ajustes
+            res = ajustar_modelo(retornos, vol, p, o, q, backend, sv, calcular_lb=False, dist=dist,
+                                 loglik_pai=loglik_semente(modelos, i, ajustados, origem))
+        res['nome_exibicao'] = nome
+        res['semente'] = origem
+        ajustados[i] = res
+    
+    novos = [i for i, r in ajustados.items() if not r.get('do_cache')]
+    diagnosticar_lote(list(ajustados.values()), arch_lm_lags=arch_lm_lags)
+    for i in novos:
+        if i in chaves:
+            cache_ajustes.guardar(chaves[i], {k: v for k, v in ajustados[i].items()
+                                              if k not in ('nome_exibicao', 'semente')})
+    return ajustados, podados
+
+def selecionar_melhor_modelo(retornos, ticker, backend="arch", warm_start=False, sementes=None,
+                             cache_ajustes=None, arch_lm_lags=None, modelos=MODELOS_ANALYZER, busca=None):
+    """
+    Ajusta a grade `modelos` e escolhe o vencedor (escolher_melhor_modelo).
+    Com `busca` (BuscaPodada) a grade é percorrida com podas — triagem numa
+    subamostra, expansão de ordens só enquanto o AIC melhora, filhos de pais
+    que não convergiram pulados — e o vencedor traz em 'poda' quantos
+    ajustes na série inteira foram feitos e evitados. Depois da triagem vão à
+    série inteira os `finalistas` de menor AIC e o melhor de cada vol; a
+    partir do melhor deles a busca ainda sobe um passo por vez (ordem ou
+    distribuição) enquanto o AIC na série inteira melhora.
+    """
+    def semear(i, ajustados):
+        return semente_warm_start(modelos, i, ajustados, sementes) if warm_start else (None, None)
+
+    if busca is None:
+        ajustados, _ = _ajustar_grade(retornos, ticker, modelos, backend, cache_ajustes, semear,
+                                      arch_lm_lags=arch_lm_lags)
+        return escolher_melhor_modelo(list(ajustados.values()))
+
+    def semear_aninhado(i, ajustados):
+        # A busca é aninhada: o pai (já ajustado) sempre semeia o filho; ontem só com warm_start
+        return semente_warm_start(modelos, i, ajustados, sementes if warm_start else None)
+
+    triagem = {}
+    if busca.subamostra and len(retornos) > busca.subamostra:
+        triagem, podados = _ajustar_grade(retornos.iloc[-busca.subamostra:], ticker, modelos, backend,
+                                          cache_ajustes, semear_aninhado, busca)
+        validos = sorted((i for i, r in triagem.items() if r['success']), key=lambda i: triagem[i]['aic'])
+        # A subamostra é curta para separar famílias: o melhor de cada vol também vai à série inteira
+        melhores_vol = {}
+        for i in validos:
+            melhores_vol.setdefault(modelos[i][0], i)
+        finalistas = sorted(set(validos[:busca.finalistas]) | set(melhores_vol.values()))
+
+        def semear_final(i, ajustados):
+            # Parâmetros de ontem do mesmo modelo, senão os da triagem
+            sv, origem = semente_warm_start(modelos, i, {}, sementes) if warm_start else (None, None)
+            if sv is None:
+                vol, p, o, q = modelos[i][:4]
+                sv = [valor_inicial(triagem[i]['params'], n)
+                      for n in nomes_parametros(p, o, q, dist_modelo(modelos[i]))]
+                origem = 'triagem'
+            return sv, origem
+
+        ajustados, _ = _ajustar_grade(retornos, ticker, modelos, backend, cache_ajustes, semear_final,
+                                      indices=finalistas, arch_lm_lags=arch_lm_lags)
+        # Subida na série inteira: extensões do melhor enquanto o AIC cai, olhando
+        # até `paciencia` passos à frente (pelo melhor filho) antes de parar
+        melhorou = True
+        while melhorou:
+            validos = [i for i, r in ajustados.items() if r['success']]
+            if not validos:
+                break
+            atual = min(validos, key=lambda i: ajustados[i]['aic'])
+            fronteira, melhorou = atual, False
+            for _ in range(busca.paciencia):
+                extensoes = _extensoes_diretas(modelos, fronteira)
+                novos = [j for j in extensoes if j not in ajustados]
+                if novos:
+                    ajustados, _ = _ajustar_grade(retornos, ticker, modelos, backend, cache_ajustes,
+                                                  semear_aninhado, indices=novos, arch_lm_lags=arch_lm_lags,
+                                                  base=ajustados)
+                validas = [j for j in extensoes if ajustados[j]['success']]
+                if not validas:
+                    break
+                fronteira = min(validas, key=lambda j: ajustados[j]['aic'])
+                if ajustados[fronteira]['aic'] < ajustados[atual]['aic']:
+                    melhorou = True
+                    break
+        podados = {i: motivo for i, motivo in podados.items() if i not in ajustados}
+        podados.update({i: 'triagem' for i in triagem if i not in ajustados})
+    else:
+        ajustados, podados = _ajustar_grade(retornos, ticker, modelos, backend, cache_ajustes, semear_aninhado,
+                                            busca, arch_lm_lags=arch_lm_lags)
+
+    motivos = {}
+    for motivo in podados.values():
+        motivos[motivo] = motivos.get(motivo, 0) + 1
+    melhor, todos = escolher_melhor_modelo(list(ajustados.values()))
+    melhor['poda'] = {
+        'grade': len(modelos),
+        'triagem': len(triagem),
+        'iteracoes_triagem': sum(r.get('nit', 0) for r in triagem.values()),
+        'completos': len(ajustados),
+        'evitados': len(modelos) - len(ajustados),
+        'motivos': motivos,
+    }
+    return melhor, todos
+
+def escolher_melhor_modelo(resultados):
+    """Escolhe o vencedor entre os modelos já ajustados (LB > 0.05, menor AIC)"""
+    validos = [r for r in resultados if r['success'] and r['lb_p'] > 0.05]
+    if not validos:
+        validos = [r for r in resultados if r['success']]
+    if not validos:
+        return {'model_name': 'FALHA', 'aic': 999}, []
+    
+    melhor = min(validos, key=lambda x: x['aic'])
+    return melhor, resultados
+
+def extrair_parametros(params):
+    if params is None or len(params) == 0:
+        return {'omega': 0, 'alpha_total': 0, 'beta_total': 0, 'gamma': 0}
+    
+    omega = params.get('omega', 0)
+    alpha_total = sum(params.get(f'alpha[{i}]', 0) for i in range(1, 10) if f'alpha[{i}]' in params)
+    beta_total = sum(params.get(f'beta[{i}]', 0) for i in range(1, 10) if f'beta[{i}]' in params)
+    gamma = params.get('gamma[1]', 0)
+    
+    return {
+        'omega': omega,
+        'alpha_total': alpha_total,
+        'beta_total': beta_total,
+        'gamma': gamma
+    }
+
+LARGURA_RELATORIO = 220
+
+def cabecalho_relatorio(inicio, fim, dias_corridos, dias_uteis):
+    """Linhas do relatório antes da tabela de ativos"""
+    width = LARGURA_RELATORIO
+    lines = []
+    
+    lines.append("GARCH ANALYZER PRO 3.9.4 — ANÁLISE COMPLETA + REGRAS POR TIPO DE ATIVO")
+    lines.append(f"Data da análise: {datetime.now():%Y-%m-%d %H:%M:%S}")
+    lines.append(f"Período analisado: {inicio} → {fim}")
+    lines.append(f"Dias corridos: {dias_corridos} | Dias úteis: {dias_uteis} (≈ {dias_uteis/252:.2f} anos)\n")
+    
+    lines.append("RESULTADOS DOS MODELOS VENCEDORES + INTERPRETAÇÃO AUTOMÁTICA")
+    lines.append("=" * width)
+    lines.append(f"{'Ativo':<8} {'Modelo':<16} {'AIC':<8} {'LB':<6} {'Ω':<12} {'α':<10} {'β':<10} {'γ':<10} {'Status':<10} {'Interpretação':<50}\n")
+    lines.append("=" * width)
+    return lines
+
+def linha_relatorio(r):
+    """Linha da tabela do relatório (modelo vencedor + interpretação) para um ativo"""
+    return visao_linhas_relatorio(construir_tabela([r]))[0]
+
+def rodape_relatorio():
+    """Linhas do relatório depois da tabela de ativos (critérios + legenda)"""
+    width = LARGURA_RELATORIO
+    lines = []
+    lines.append("=" * width + "\n")
+    
+    # CRITÉRIOS DE SELEÇÃO
+    lines.append("CRITÉRIOS DE SELEÇÃO DO MELHOR MODELO")
+    lines.append("=" * width)
+    lines.append("AIC (Akaike Information Criterion)")
+    lines.append("    • Quanto MENOR, MELHOR o modelo")
+    lines.append("    • Penaliza complexidade → evita overfitting")
+    lines.append("    • Ex: AIC = -5109 → EXCELENTE")
+    lines.append("    • Ex: AIC = -4000 → modelo pior\n")
+    lines.append("LB p-val (Ljung-Box p-value)")
+    lines.append("    • Testa se resíduos são 'ruído branco'")
+    lines.append("    • p-val > 0.05 → MODELO VÁLIDO")
+    lines.append("    • p-val < 0.05 → resíduos com padrão → MODELO RUIM")
+    lines.append("    • Status 'EXCELENTE' = p-val > 0.05\n")
+    
+    # PARÂMETROS GREGOS
+    lines.append("INTERPRETAÇÃO DOS PARÂMETROS GREGOS")
+    lines.append("=" * width)
+    lines.append("Ω (Omega)   → Volatilidade de longo prazo")
+    lines.append("            • GARCH/GJR: sempre positivo")
+    lines.append("            • EGARCH: pode ser NEGATIVO → quedas aumentam vol mais que subidas")
+    lines.append("            • Ex: Ω = -0.645 → quedas geram PÂNICO de vol\n")
+    lines.append("α (Alpha)   → Impacto total de choques recentes (soma de todos os α[i])")
+    lines.append("            • α alto → volatilidade reage forte a eventos")
+    lines.append("            • Ex: α = 0.341 → 34.1% do choque entra na vol\n")
+    lines.append("β (Beta)    → Persistência total da volatilidade (soma de todos os β[i])")
+    lines.append("            • β próximo de 1 → vol dura MUITO tempo")
+    lines.append("            • Ex: β = 0.991 → vol dura ~30 dias")
+    lines.append("            • α + β ≈ 0.98 → vol de hoje explica 98% da vol amanhã\n")
+    lines.append("γ (Gamma)   → Assimetria (efeito alavancagem)")
+    lines.append("            • Presente em: EGARCH e GJR-GARCH")
+    lines.append("            • γ > 0 → más notícias aumentam vol mais que boas")
+    lines.append("            • γ = 0 → sem assimetria (GARCH)")
+    lines.append("            • Se γ ≠ 0 → use EGARCH ou GJR no EA!\n")
+    lines.append("DICAS PARA MT5:")
+    lines.append("• EGARCH: use log(vol) → exp() no MQL5")
+    lines.append("• GJR: use (retorno < 0) ? (alpha + gamma) : alpha")
+    lines.append("• Para GARCH(p,q): some todos os α[i] e β[i]")
+    lines.append("• Atualize todo dia com novos dados")
+    lines.append("=" * width + "\n")
+    
+    # LEGENDA
+    lines.append("LEGENDA DAS INTERPRETAÇÕES AUTOMÁTICAS (v3.9.4)")
+    lines.append("=" * width)
+    lines.append("FOREX CLÁSSICO     → FOREX + GARCH + α<0.07 + β>0.90")
+    lines.append("VOL TÉCNICA        → FUTUROS + GARCH + α>0.08")
+    lines.append("ACAO MADURA        → AÇÃO + GARCH + α<0.07")
+    lines.append("ACAO VOLÁTIL       → AÇÃO + GARCH + α>0.15")
+    lines.append("QUEDAS EXPLODEM VOL! → EGARCH + Ω < -0.5")
+    lines.append("VOL DURA MUITO     → β > 0.98")
+    lines.append("TECH/PÂNICO        → EGARCH + Ω < -0.3")
+    lines.append("=" * width)
+    return lines
+
+def gerar_relatorio_txt_completo(resultados, inicio, fim, dias_corridos, dias_uteis, tabela=None):
+    """Gera relatório TXT COMPLETO igual ao Jupyter (visão da tabela de candidatos)"""
+    if tabela is None:
+        tabela = construir_tabela(resultados, inicio=inicio, fim=fim)
+    lines = cabecalho_relatorio(inicio, fim, dias_corridos, dias_uteis)
+    lines.extend(visao_linhas_relatorio(tabela))
+    lines.extend(rodape_relatorio())
+    return "\n".join(lines)
+
+def linha_csv_mt5(r, previsao=None):
+    """Linha do CSV do MT5 para um ativo (+ previsões/VaR/ES se `previsao`)"""
+    return visao_csv_mt5(construir_tabela([r], [previsao])).iloc[0].to_dict()
+
+def prever_resultados(resultados, n_caminhos=N_CAMINHOS, seed=SEMENTE_PADRAO):
+    """Previsões de todos os resultados com estado de previsão num único lote (None nos demais)"""
+    com_estado = [i for i, r in enumerate(resultados) if r.get('estado_previsao') is not None]
+    previsoes = [None] * len(resultados)
+    lote = prever_lote([resultados[i]['estado_previsao'] for i in com_estado],
+                       n_caminhos=n_caminhos, seed=seed)
+    for i, previsao in zip(com_estado, lote):
+        previsoes[i] = previsao
+    return previsoes
+
+def tabela_resultados(resultados, inicio=None, fim=None, n_caminhos=N_CAMINHOS, seed=SEMENTE_PADRAO):
+    """Tabela colunar (tabela_candidatos.SCHEMA) de todos os candidatos, com as previsões nos vencedores"""
+    return construir_tabela(resultados, prever_resultados(resultados, n_caminhos, seed), inicio, fim)
+
+def gerar_csv_mt5(resultados, n_caminhos=N_CAMINHOS, seed=SEMENTE_PADRAO, tabela=None):
+    """CSV do MT5 como visão da tabela de candidatos (montada aqui se não for passada)"""
+    if tabela is None:
+        tabela = tabela_resultados(resultados, n_caminhos=n_caminhos, seed=seed)
+    return visao_csv_mt5(tabela)
+
+# ==================== EXECUÇÃO DO ANALYZER (SERIAL / PARALELO) ====================
+def montar_resultado(ticker, melhor, todos=None, retornos=None):
+    """
+    Monta a linha de resultado final do Analyzer para um ticker. Com
+    `retornos`, inclui a volatilidade condicional do vencedor já reduzida
+    para o gráfico (LTTB), sem guardar a série inteira, o estado no fim da
+    amostra para as previsões (previsao.py) e os resíduos padronizados em
+    float32 para o DCC (dcc.py).
+    """
+    ativo_mt5 = TICKER_MAP.get(ticker, ticker.replace('=X', '').replace('=F', ''))
+    resultado = {
+        'ativo': ativo_mt5,
+        'ticker': ticker,
+        'model_name': melhor['model_name'],
+        'aic': melhor['aic'],
+        'lb_p': melhor['lb_p'],
+        'params': melhor['params']
+    }
+    if todos is not None:
+        # Total de iterações do otimizador nos candidatos (mede o ganho do warm start)
+        resultado['iteracoes'] = sum(r.get('nit', 0) for r in todos)
+        resultado['ajustes_do_cache'] = sum(1 for r in todos if r.get('do_cache'))
+        if melhor.get('poda'):
+            resultado['poda'] = melhor['poda']
+        # Cada candidato (painel de performance / instrumentacao.py e tabela_candidatos.py)
+        resultado['candidatos'] = [{
+            'modelo': r.get('nome_exibicao', r['model_name']),
+            'model_name': r['model_name'],
+            'especificacao': r.get('especificacao'),
+            'dist': r.get('dist', 'normal'),
+            'vencedor': r is melhor,
+            'params': r['params'],
+            'aic': r['aic'],
+            'lb_p': r['lb_p'],
+            'tempo_ajuste_s': r.get('tempo_ajuste_s', 0.0),
+            'tempo_lb_s': r.get('tempo_lb_s', 0.0),
+            'nit': r.get('nit', 0),
+            'convergiu': bool(r.get('convergiu')),
+            'sucesso': bool(r['success']),
+            'semente': r.get('semente'),
+            'do_cache': bool(r.get('do_cache'))
+        } for r in todos]
+    if retornos is not None and melhor.get('params') is not None:
+        vol_type = melhor['model_name'].split('(')[0]
+        vol_cond = motor_garch.volatilidade_condicional(retornos, vol_type, melhor['params'])
+        resultado['vol_condicional'] = reduzir_serie(vol_cond)
+        resultado['residuos_padronizados'] = (
+            (retornos - melhor['params']['mu']) / vol_cond).astype(np.float32).rename(ticker)
+        resultado['estado_previsao'] = estado_final(retornos, vol_type, melhor['params'],
+                                                    vol_cond.values ** 2, ticker, melhor.get('dist', 'normal'))
+        resultado['vol_longo_prazo'] = np.sqrt(motor_garch.variancia_longo_prazo(vol_type, melhor['params']))
+    return resultado
+
+def analisar_precos(ticker, precos, backend="arch", warm_start=False, sementes=None,
+                    cache_ajustes=None, modelos=MODELOS_ANALYZER, busca=None):
+    """Retornos + seleção do melhor modelo a partir de preços já baixados"""
+    retornos = calcular_retornos(precos)
+    melhor, todos = selecionar_melhor_modelo(retornos, ticker, backend, warm_start, sementes,
+                                             cache_ajustes, modelos=modelos, busca=busca)
+    return montar_resultado(ticker, melhor, todos, retornos)
+
+def processar_ativo(ticker, inicio, fim, cache=None, backend="arch"):
+    """Download + retornos + seleção do melhor modelo para um único ticker"""
+    return analisar_precos(ticker, baixar_dados(ticker, inicio, fim, cache), backend)
+
+def _ajustar_tarefa(ticker, idx_modelo, modelo, retornos, backend="arch", starting_values=None, semente=None,
+                    loglik_pai=None):
+    """Tarefa do pool: ajusta um único (ticker × modelo) em outro processo"""
+    vol, p, o, q, nome = modelo[:5]
+    res = ajustar_modelo(retornos, vol, p, o, q, backend, starting_values, dist=dist_modelo(modelo),
+                         loglik_pai=loglik_pai)
+    res['nome_exibicao'] = nome
+    res['semente'] = semente
+    return ticker, idx_modelo, res
+
+def _selecionar_tarefa(ticker, retornos, backend, warm_start, sementes, modelos, busca):
+    """Tarefa do pool: busca podada de um ticker inteiro em outro processo"""
+    melhor, todos = selecionar_melhor_modelo(retornos, ticker, backend, warm_start, sementes,
+                                             modelos=modelos, busca=busca)
+    return ticker, melhor, todos
+
+def iterar_analyzer(ativos, inicio, fim, modo="serial", max_workers=None, cache=None,
+                    max_downloads=8, backend="arch", warm_start=False,
+                    arquivo_params=PARAMS_FILE, cache_ajustes=None, relatorio_download=None,
+                    modelos=MODELOS_ANALYZER, busca=None):
+    """
+    Pipeline do Analyzer como gerador: devolve (ticker, resultado, erro) assim
+    que cada ticker termina (erro=None em caso de sucesso). Só os tickers em
+    andamento ficam em memória — o que permite lotes de milhares de ativos.
+
+    Os downloads rodam numa etapa em lote (iterar_downloads, até
+    `max_downloads` simultâneos) e cada ticker segue para o ajuste assim que
+    seus preços chegam:
+    modo="serial"   → ajustes no processo principal, um ticker por vez
+    modo="paralelo" → os ajustes (ticker × modelo) são distribuídos num
+                      ProcessPoolExecutor; no máximo 4 × max_workers tickers
+                      ficam em andamento ao mesmo tempo.
+
+    cache (CachePrecos, opcional) é repassado a baixar_dados.
+    backend ("arch" ou "rapido") escolhe o motor de estimação dos modelos.
+    warm_start=True semeia cada modelo com os parâmetros de ontem (arquivo
+    `arquivo_params`) ou com as estimativas do pai aninhado; no modo paralelo
+    o modelo filho só é enviado ao pool quando o pai termina. Os parâmetros
+    de hoje são gravados quando o gerador se esgota.
+    cache_ajustes (CacheAjustes, opcional) reaproveita ajustes já feitos da
+    mesma série; no modo paralelo é consultado/alimentado no processo
+    principal e só as faltas vão para o pool.
+    relatorio_download (lista, opcional) recebe as estatísticas de download.
+    modelos é a grade (GRADES); com busca (BuscaPodada) a seleção é podada
+    e, no modo paralelo, cada ticker vai inteiro para um processo do pool
+    (a poda depende dos ajustes anteriores; sem cache de ajustes).
+    """
+    relatorio_download = relatorio_download if relatorio_download is not None else []
+    sementes = carregar_params_anteriores(arquivo_params) if warm_start else {}
+    novas_sementes = {}
+    saida = []  # (ticker, resultado, erro) prontos para o consumidor
+
+    def _concluir(ticker, resultado=None, erro=None):
+        saida.append((ticker, resultado, erro))
+
+    downloads = iterar_downloads(ativos, inicio, fim, cache, max_concorrencia=max_downloads)
+
+    if modo == "serial":
+        for ticker, precos, erro, estat in downloads:
+            relatorio_download.append(estat)
+            if erro is not None:
+                yield ticker, None, erro
+                continue
+            try:
+                retornos = calcular_retornos(precos)
+                melhor, todos = selecionar_melhor_modelo(retornos, ticker, backend, warm_start,
+                                                         sementes.get(ticker), cache_ajustes,
+                                                         modelos=modelos, busca=busca)
+                novas_sementes[ticker] = params_para_semente(todos)
+                resultado = montar_resultado(ticker, melhor, todos, retornos)
+            except Exception as e:
+                yield ticker, None, e
+                continue
+            yield ticker, resultado, None
+    else:
+        max_workers = max_workers or os.cpu_count() or 1
+        max_em_andamento = 4 * max_workers
+        # "spawn" evita fork de um processo com threads (servidor Streamlit)
+        ctx = multiprocessing.get_context("spawn")
+        n_modelos = len(modelos)
+        pais = [indice_pai_aninhado(modelos, i) if warm_start else None
+                for i in range(n_modelos)]
+        serie_por_ticker, ajustados, enviados, chaves = {}, {}, {}, {}
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            pendentes = {}
+
+            def _encerrar(ticker, resultado=None, erro=None):
+                # Libera o estado do ticker: só os em andamento ficam em memória
+                for d in (serie_por_ticker, ajustados, enviados):
+                    d.pop(ticker, None)
+                _concluir(ticker, resultado, erro)
+
+            def _registrar(ticker, idx_modelo, res):
+                ajustados[ticker][idx_modelo] = res
+                for filho in range(n_modelos):
+                    if pais[filho] == idx_modelo and filho not in enviados[ticker]:
+                        _submeter(ticker, filho)
+                if len(ajustados[ticker]) == n_modelos:
+                    todos = [ajustados[ticker][i] for i in range(n_modelos)]
+                    melhor, _ = escolher_melhor_modelo(todos)
+                    novas_sementes[ticker] = params_para_semente(todos)
+                    try:
+                        _encerrar(ticker, montar_resultado(ticker, melhor, todos,
+                                                           serie_por_ticker[ticker]))
+                    except Exception as e:
+                        _encerrar(ticker, erro=e)
+
+            def _submeter(ticker, idx_modelo):
+                enviados[ticker].add(idx_modelo)
+                sv, origem = (semente_warm_start(modelos, idx_modelo, ajustados[ticker],
+                                                 sementes.get(ticker))
+                              if warm_start else (None, None))
+                vol, p, o, q, nome = modelos[idx_modelo][:5]
+                chave = chave_cache_modelo(ticker, serie_por_ticker[ticker], vol, p, o, q, backend,
+                                           dist_modelo(modelos[idx_modelo]), sv)
+                if cache_ajustes is not None:
+                    res = cache_ajustes.obter(chave)
+                    if res is not None:
+                        _registrar(ticker, idx_modelo,
+                                   resultado_do_cache(res, nome_exibicao=nome, semente=origem))
+                        return
+                    chaves[(ticker, idx_modelo)] = chave
+                # Mesmo ajuste com a mesma semente já em voo (outra sessão ou o modo serial) → espera o dele
+                fut, _ = VOO_AJUSTES.compartilhar((chave, True), lambda: espelhar(
+                    pool.submit(_ajustar_tarefa, ticker, idx_modelo, modelos[idx_modelo],
+                                serie_por_ticker[ticker], backend, sv, origem,
+                                loglik_semente(modelos, idx_modelo, ajustados[ticker], origem)),
+                    lambda saida: saida[2]))
+                pendentes[espelhar(fut)] = (ticker, idx_modelo, origem)
+
+            def _colher(timeout=None):
+                prontos, _ = wait(list(pendentes), timeout=timeout, return_when=FIRST_COMPLETED)
+                for fut in prontos:
+                    ticker, idx_modelo, origem = pendentes.pop(fut)
+                    if ticker not in ajustados:
+                        continue  # ticker já encerrado com erro
+                    try:
+                        if busca is not None:
+                            _, melhor, todos = fut.result()
+                            novas_sementes[ticker] = params_para_semente(todos)
+                            _encerrar(ticker, montar_resultado(ticker, melhor, todos, serie_por_ticker[ticker]))
+                            continue
+                        # Cópia própria: o resultado pode ter sido compartilhado com outra sessão
+                        res = dict(fut.result(), nome_exibicao=modelos[idx_modelo][4], semente=origem)
+                    except CancelledError:
+                        if idx_modelo is None:
+                            raise
+                        # A sessão dona do ajuste compartilhado cancelou: refaz neste pool
+                        _submeter(ticker, idx_modelo)
+                        continue
+                    except Exception as e:
+                        # Falha do worker afeta só este ticker
+                        _encerrar(ticker, erro=e)
+                        continue
+                    if (ticker, idx_modelo) in chaves:
+                        cache_ajustes.guardar(chaves.pop((ticker, idx_modelo)),
+                                              {k: v for k, v in res.items()
+                                               if k not in ('nome_exibicao', 'semente')})
+                    _registrar(ticker, idx_modelo, res)
+
+            try:
+                for ticker, precos, erro, estat in downloads:
+                    relatorio_download.append(estat)
+                    try:
+                        if erro is not None:
+                            raise erro
+                        serie_por_ticker[ticker] = calcular_retornos(precos)
+                    except Exception as e:
+                        _concluir(ticker, erro=e)
+                    else:
+                        ajustados[ticker], enviados[ticker] = {}, set()
+                        ontem = sementes.get(ticker, {})
+                        if busca is not None:
+                            fut = pool.submit(_selecionar_tarefa, ticker, serie_por_ticker[ticker], backend,
+                                              warm_start, ontem, modelos, busca)
+                            pendentes[fut] = (ticker, None, None)
+                        for idx_modelo in range(n_modelos):
+                            # Sem pai aninhado (ou com semente de ontem) → pode ir já
+                            # (um acerto do cache de ajustes já pode ter enviado o filho)
+                            if busca is not None or ticker not in enviados or idx_modelo in enviados[ticker]:
+                                continue
+                            if pais[idx_modelo] is None or modelos[idx_modelo][4] in ontem:
+                                _submeter(ticker, idx_modelo)
+
+                    # Colhe o que já terminou; com muitos tickers em andamento, espera
+                    # (contrapressão: o download do próximo só é pedido depois)
+                    if pendentes:
+                        _colher(timeout=0)
+                    while pendentes and len(ajustados) >= max_em_andamento:
+                        _colher()
+                    while saida:
+                        yield saida.pop(0)
+
+                while pendentes:
+                    _colher()
+                    while saida:
+                        yield saida.pop(0)
+            except GeneratorExit:
+                # Consumidor desistiu (ex.: tarefa cancelada): só os ajustes já
+                # em execução terminam antes de o pool fechar
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+        while saida:
+            yield saida.pop(0)
+
+    if warm_start and novas_sementes:
+        sementes.update({t: v for t, v in novas_sementes.items() if v})
+        salvar_params_anteriores(sementes, arquivo_params)
+
+def executar_analyzer(ativos, inicio, fim, modo="serial", max_workers=None, ao_progredir=None,
+                      cache=None, max_downloads=8, backend="arch", warm_start=False,
+                      arquivo_params=PARAMS_FILE, cache_ajustes=None, cancelado=None,
+                      modelos=MODELOS_ANALYZER, busca=None):
+    """
+    Executa o Analyzer Pro para todos os ativos (ver iterar_analyzer).
+
+    ao_progredir(ticker, concluidos, total, erro) é chamado a cada ticker
+    finalizado (erro=None em caso de sucesso).
+    cancelado (threading.Event, opcional): quando setado, o pipeline é
+    encerrado depois do ticker atual e o retorno traz só os já concluídos.
+    Retorna (resultados_finais na ordem de `ativos`, {ticker: erro},
+    [estatísticas de download por ticker]).
+    """
+    total = len(ativos)
+    resultados = {}
+    erros = {}
+    relatorio_download = []
+    pipeline = iterar_analyzer(ativos, inicio, fim, modo, max_workers, cache, max_downloads, backend,
+                               warm_start, arquivo_params, cache_ajustes, relatorio_download,
+                               modelos, busca)
+    for ticker, resultado, erro in pipeline:
+        if erro is None:
+            resultados[ticker] = resultado
+        else:
+            erros[ticker] = erro
+        if ao_progredir:
+            ao_progredir(ticker, len(resultados) + len(erros), total, erro)
+        if cancelado is not None and cancelado.is_set():
+            pipeline.close()  # cancela os ajustes ainda na fila do pool
+            break
+
+    relatorio_download.sort(key=lambda e: ativos.index(e['ticker']))
+    return [resultados[t] for t in ativos if t in resultados], erros, relatorio_download
@@ -0,0 +1,366 @@
+"""
+ASUS GARCH PRO 2025 - ANALYZER EM LOTE (LINHA DE COMANDO)
+Roda o pipeline do Analyzer Pro sem Streamlit (ex.: cron noturno com milhares
+de tickers). Cada ticker é gravado no CSV do MT5 e no relatório assim que
+termina; o checkpoint permite retomar um lote interrompido. Todos os
+candidatos ajustados vão para GARCH_CANDIDATOS.parquet (tabela_candidatos.py),
+do qual o CSV e o relatório são visões.
+
+Com --incremental, o universo salvo em <saida>/estado_incremental.json só
+é reajustado onde os testes de deriva pedem (atualizacao_incremental.py);
+os demais tickers apenas avançam a recursão com os dias novos.
+
+Com --publicar, cada vencedor também vai para o snapshot do feed local do
+MT5 (publicador_mt5.py) assim que o ticker termina.
+
+Com --bootstrap B, no fim do lote cada vencedor é reajustado em B séries
+reamostradas (bootstrap_parametros.py): ICs e probabilidade de cada regra
+da interpretação em GARCH_BOOTSTRAP.csv e no fim do relatório.
+
+Uso:
+    python analyzer_lote.py tickers.txt --inicio 2020-01-01 --fim 2025-01-01 --saida lote/
+    python analyzer_lote.py tickers.txt --inicio 2020-01-01 --saida lote/ --incremental
+    python analyzer_lote.py tickers.txt --inicio 2020-01-01 --saida lote/ --grade estendida --podar
+    python analyzer_lote.py tickers.txt --inicio 2020-01-01 --saida lote/ --incremental --publicar
+    python analyzer_lote.py tickers.txt --inicio 2020-01-01 --saida lote/ --paralelo --bootstrap 200 --bootstrap-parada
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from analyzer import (
+    iterar_analyzer, cabecalho_relatorio, rodape_relatorio, prever_resultados, tabela_resultados,
+    gerar_relatorio_txt_completo, gerar_csv_mt5, BACKENDS_AJUSTE, PARAMS_FILE, GRADES, MODELOS_ANALYZER,
+    BuscaPodada
+)
+from atualizacao_incremental import (
+    atualizar_universo, resumo_atualizacao, ESTADO_INCREMENTAL_FILE, MAX_DIAS_SEM_REAJUSTE
+)
+from cache_precos import CachePrecos
+from cache_ajustes import CacheAjustes, FIT_CACHE_DIR
+from previsao import COLUNAS_PREVISAO
+from tabela_candidatos import construir_tabela, tabela_de_linhas, gravar_parquet, visao_csv_mt5, \
+    visao_linhas_relatorio, ler_tabela, vencedores
+from instrumentacao import registros_download, registros_ajustes, exportar_jsonl
+from publicador_mt5 import PublicadorParametros, ARQ_SNAPSHOT
+from bootstrap_parametros import (
+    especificacoes, retornos_dos_tickers, executar_bootstrap, linhas_relatorio_bootstrap, tabela_bootstrap,
+    METODOS, B_PADRAO
+)
+
+ARQ_CSV = "GARCH_MT5.csv"
+ARQ_RELATORIO = "GARCH_RELATORIO.txt"
+ARQ_CHECKPOINT = "checkpoint.jsonl"
+ARQ_CANDIDATOS = "GARCH_CANDIDATOS.parquet"
+ARQ_CANDIDATOS_PARCIAL = "candidatos.jsonl"  # linhas da tabela até o fim do lote (truncável como o CSV)
+ARQ_ATUALIZACAO = "ATUALIZACAO.csv"
+ARQ_BOOTSTRAP = "GARCH_BOOTSTRAP.csv"
+COLUNAS_CSV = ['Ativo', 'Modelo', 'Omega', 'Alpha_Total', 'Beta_Total', 'Gamma', 'AIC', 'LB_pval'] + COLUNAS_PREVISAO
+
+# ==================== LISTA DE TICKERS ====================
+def ler_tickers(arquivo):
+    """Um ticker por linha; linhas vazias e comentários (#) são ignorados"""
+    tickers = []
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        for linha in f:
+            t = linha.split('#', 1)[0].strip().upper()
+            if t and t not in tickers:
+                tickers.append(t)
+    return tickers
+
+# ==================== CHECKPOINT ====================
+class Checkpoint:
+    """
+    Registro append-only (JSON lines) dos tickers concluídos. Cada registro
+    guarda o tamanho do CSV, do relatório e das linhas de candidatos logo
+    após a gravação do ticker:
+    ao retomar, os arquivos são truncados no último registro, descartando
+    linhas órfãs de uma interrupção no meio da escrita.
+    """
+
+    def __init__(self, diretorio):
+        self.caminho = os.path.join(diretorio, ARQ_CHECKPOINT)
+        self.registros = []
+        if os.path.exists(self.caminho):
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        self.registros.append(json.loads(linha))
+                    except ValueError:
+                        break  # última linha incompleta
+
+    def concluidos(self):
+        """Tickers já gravados com sucesso (falhas são tentadas de novo)"""
+        return {r['ticker'] for r in self.registros if r.get('ok')}
+
+    def tamanhos(self):
+        """(bytes do CSV, do relatório, dos candidatos) no último registro, ou None"""
+        for r in reversed(self.registros):
+            if 'csv_bytes' in r:
+                return r['csv_bytes'], r['txt_bytes'], r.get('cand_bytes', 0)
+        return None
+
+    def registrar(self, **registro):
+        with open(self.caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.registros.append(registro)
+
+# ==================== GRAVAÇÃO INCREMENTAL ====================
+def _gravar(arquivo, texto):
+    arquivo.write(texto)
+    arquivo.flush()
+    os.fsync(arquivo.fileno())
+
+def _tabela_ticker(r, inicio, fim):
+    # Mesmo gerador por ticker do app: os números não dependem do lote
+    return construir_tabela([r], prever_resultados([r]), inicio, fim)
+
+def _linha_csv(tabela):
+    buf = io.StringIO()
+    linha = visao_csv_mt5(tabela).iloc[0].to_dict()
+    csv.writer(buf, delimiter=';', lineterminator='\n').writerow(
+        [float(linha[c]) if isinstance(linha.get(c), (float, np.floating)) else linha.get(c, '')
+         for c in COLUNAS_CSV])
+    return buf.getvalue()
+
+def executar_lote(tickers, inicio, fim, saida, modo="serial", max_workers=None, backend="arch",
+                  warm_start=False, usar_cache=True, offline=False, max_downloads=8,
+                  reiniciar=False, arquivo_metricas=None, log=print, modelos=MODELOS_ANALYZER, busca=None,
+                  publicador=None):
+    """
+    Processa `tickers` em fluxo, gravando em `saida`:
+      GARCH_MT5.csv       → uma linha por ticker (mesmo formato do botão do app)
+      GARCH_RELATORIO.txt → cabeçalho, uma linha por ticker e rodapé no final
+      GARCH_CANDIDATOS.parquet → todos os candidatos (refeito no fim de cada
+                            execução a partir de candidatos.jsonl)
+      checkpoint.jsonl    → progresso, para retomar com o mesmo comando
+    arquivo_metricas (opcional) recebe, em JSON lines, o tempo de download e
+    de cada ajuste/Ljung-Box por ticker (ver instrumentacao.py).
+    modelos (grade) e busca (BuscaPodada) vão para a seleção de cada ticker.
+    publicador (PublicadorParametros) recebe cada vencedor ao fim do ticker.
+    Retorna (n_ok, {ticker: erro}).
+    """
+    os.makedirs(saida, exist_ok=True)
+    caminho_csv = os.path.join(saida, ARQ_CSV)
+    caminho_txt = os.path.join(saida, ARQ_RELATORIO)
+    caminho_cand = os.path.join(saida, ARQ_CANDIDATOS_PARCIAL)
+    if reiniciar:
+        for nome in (ARQ_CSV, ARQ_RELATORIO, ARQ_CANDIDATOS_PARCIAL, ARQ_CANDIDATOS, ARQ_CHECKPOINT):
+            if os.path.exists(os.path.join(saida, nome)):
+                os.remove(os.path.join(saida, nome))
+
+    ckpt = Checkpoint(saida)
+    tamanhos = ckpt.tamanhos()
+    if tamanhos is not None:
+        # Volta ao fim do último ticker gravado (descarta o rodapé e linhas órfãs)
+        for caminho, n in zip((caminho_csv, caminho_txt, caminho_cand), tamanhos):
+            with open(caminho, 'a+b') as f:
+                f.truncate(n)
+    else:
+        # Lote novo: cabeçalhos dos dois arquivos
+        dias_corridos = (datetime.strptime(fim, '%Y-%m-%d') - datetime.strptime(inicio, '%Y-%m-%d')).days
+        dias_uteis = int(np.busday_count(inicio, fim))
+        with open(caminho_csv, 'w', encoding='utf-8-sig', newline='') as f:
+            f.write(";".join(COLUNAS_CSV) + "\n")
+        with open(caminho_txt, 'w', encoding='utf-8', newline='') as f:
+            f.write("\n".join(cabecalho_relatorio(inicio, fim, dias_corridos, dias_uteis)) + "\n")
+        open(caminho_cand, 'w').close()
+        ckpt.registrar(ticker=None, ok=False, csv_bytes=os.path.getsize(caminho_csv),
+                       txt_bytes=os.path.getsize(caminho_txt), cand_bytes=0)
+
+    feitos = ckpt.concluidos()
+    pendentes = [t for t in tickers if t not in feitos]
+    log(f"{len(tickers)} tickers | {len(feitos & set(tickers))} já concluídos | {len(pendentes)} a processar")
+
+    n_ok, erros = 0, {}
+    relatorio_download = []
+    with open(caminho_csv, 'a', encoding='utf-8', newline='') as f_csv, \
+         open(caminho_txt, 'a', encoding='utf-8', newline='') as f_txt, \
+         open(caminho_cand, 'a', encoding='utf-8', newline='') as f_cand:
+        for i, (ticker, resultado, erro) in enumerate(iterar_analyzer(
+                pendentes, inicio, fim, modo, max_workers,
+                cache=CachePrecos(offline=offline) if usar_cache else None,
+                max_downloads=max_downloads, backend=backend, warm_start=warm_start,
+                arquivo_params=PARAMS_FILE,
+                cache_ajustes=CacheAjustes(diretorio=FIT_CACHE_DIR) if usar_cache else None,
+                relatorio_download=relatorio_download, modelos=modelos, busca=busca), 1):
+            if arquivo_metricas:
+                exportar_jsonl(registros_download(relatorio_download)
+                               + (registros_ajustes(resultado) if resultado else []), arquivo_metricas)
+                relatorio_download.clear()
+            if erro is None:
+                tabela = _tabela_ticker(resultado, inicio, fim)
+                _gravar(f_csv, _linha_csv(tabela))
+                _gravar(f_txt, visao_linhas_relatorio(tabela)[0] + "\n")
+                _gravar(f_cand, "".join(json.dumps(l, ensure_ascii=False, default=str) + "\n"
+                                        for l in tabela.to_pylist()))
+                if publicador is not None:
+                    publicador.publicar_tabela(tabela)
+                n_ok += 1
+                ckpt.registrar(ticker=ticker, ok=True, modelo=resultado['model_name'],
+                               csv_bytes=f_csv.tell(), txt_bytes=f_txt.tell(), cand_bytes=f_cand.tell())
+                poda = resultado.get('poda')
+                log(f"[{i}/{len(pendentes)}] {ticker}: {resultado['model_name']}"
+                    + (f" ({poda['completos']}/{poda['grade']} ajustes, {poda['evitados']} evitados)" if poda else ""))
+            else:
+                erros[ticker] = erro
+                ckpt.registrar(ticker=ticker, ok=False, erro=str(erro))
+                log(f"[{i}/{len(pendentes)}] {ticker}: ERRO {erro}")
+
+        # O rodapé não entra no checkpoint: é refeito no fim de cada execução
+        _gravar(f_txt, "\n".join(rodape_relatorio()) + "\n")
+
+    # Parquet tipado com os candidatos de todos os tickers gravados até aqui
+    with open(caminho_cand, 'r', encoding='utf-8') as f:
+        gravar_parquet(tabela_de_linhas([json.loads(l) for l in f]), os.path.join(saida, ARQ_CANDIDATOS))
+
+    return n_ok, erros
+
+# ==================== ATUALIZAÇÃO INCREMENTAL ====================
+def executar_incremental(tickers, inicio, fim, saida, backend="arch", usar_cache=True, offline=False,
+                         max_downloads=8, max_dias=MAX_DIAS_SEM_REAJUSTE, forcar=False, log=print,
+                         modelos=MODELOS_ANALYZER, busca=None, publicador=None):
+    """
+    Atualização diária do universo salvo em `saida` (ver atualizacao_incremental.py).
+    Regrava GARCH_MT5.csv e GARCH_RELATORIO.txt com todos os tickers e
+    ATUALIZACAO.csv com a ação de cada ticker (atualizado/reajustado/erro)
+    e o motivo do reajuste. Com `publicador`, todos os vencedores vão para o
+    feed do MT5 numa única versão. Retorna (n_ok, {ticker: erro}).
+    """
+    os.makedirs(saida, exist_ok=True)
+
+    def _progresso(ticker, concluidos, total, erro):
+        log(f"[{concluidos}/{total}] {ticker}" + (f": ERRO {erro}" if erro is not None else ""))
+
+    resultados, erros, relatorio = atualizar_universo(
+        tickers, inicio, fim, cache=CachePrecos(offline=offline) if usar_cache else None,
+        arquivo=os.path.join(saida, ESTADO_INCREMENTAL_FILE), backend=backend,
+        cache_ajustes=CacheAjustes(diretorio=FIT_CACHE_DIR) if usar_cache else None,
+        max_dias=max_dias, forcar=forcar, max_downloads=max_downloads, ao_progredir=_progresso,
+        modelos=modelos, busca=busca
+    )
+    pd.DataFrame(relatorio).to_csv(os.path.join(saida, ARQ_ATUALIZACAO), sep=';', index=False,
+                                   encoding='utf-8-sig', float_format='%.4f')
+    if resultados:
+        dias_corridos = (datetime.strptime(fim, '%Y-%m-%d') - datetime.strptime(inicio, '%Y-%m-%d')).days
+        dias_uteis = int(np.busday_count(inicio, fim))
+        tabela = tabela_resultados(resultados, inicio, fim)
+        gerar_csv_mt5(resultados, tabela=tabela)[COLUNAS_CSV].to_csv(
+            os.path.join(saida, ARQ_CSV), sep=';', index=False, encoding='utf-8-sig')
+        with open(os.path.join(saida, ARQ_RELATORIO), 'w', encoding='utf-8', newline='') as f:
+            f.write(gerar_relatorio_txt_completo(resultados, inicio, fim, dias_corridos, dias_uteis,
+                                                 tabela=tabela) + "\n")
+        gravar_parquet(tabela, os.path.join(saida, ARQ_CANDIDATOS))
+        if publicador is not None:
+            log(f"Feed do MT5: versão {publicador.publicar_tabela(tabela)} → {publicador.arquivo}")
+    acoes, motivos = resumo_atualizacao(relatorio)
+    log(f"Atualizados: {acoes.get('atualizado', 0)} | reajustados: {acoes.get('reajustado', 0)} "
+        f"({', '.join(f'{m}: {n}' for m, n in motivos.items()) or '-'}) | erros: {acoes.get('erro', 0)}")
+    return len(resultados), erros
+
+# ==================== BOOTSTRAP DOS PARÂMETROS ====================
+def executar_bootstrap_lote(saida, inicio, fim, B=B_PADRAO, metodo='parametrico', modo="serial", max_workers=None,
+                            parada_antecipada=False, usar_cache=True, offline=False, max_downloads=8, log=print,
+                            backend="arch"):
+    """
+    Bootstrap dos vencedores de <saida>/GARCH_CANDIDATOS.parquet (do lote ou
+    do --incremental): grava GARCH_BOOTSTRAP.csv e acrescenta a seção de
+    incerteza ao fim de GARCH_RELATORIO.txt. Os retornos vêm do cache de
+    preços; as réplicas são ajustadas no mesmo `backend` da seleção.
+    Retorna (n_ok, {ticker: erro}).
+    """
+    tabela = ler_tabela(os.path.join(saida, ARQ_CANDIDATOS))
+    tickers = vencedores(tabela)['ticker'].astype(str).tolist()
+    retornos, erros = retornos_dos_tickers(tickers, inicio, fim, CachePrecos(offline=offline) if usar_cache else None,
+                                           max_downloads)
+    especs = especificacoes(tabela, retornos)
+
+    def _progresso(ticker, concluidos, total, erro):
+        log(f"[bootstrap {concluidos}/{total}] {ticker}" + (f": ERRO {erro}" if erro is not None else ""))
+
+    resumos, erros_bootstrap = executar_bootstrap(
+        especs, ao_progredir=_progresso, B=B, metodo=metodo, modo=modo, max_workers=max_workers,
+        parada_antecipada=parada_antecipada, backend=backend
+    )
+    erros.update(erros_bootstrap)
+    tabela_bootstrap(resumos).to_csv(os.path.join(saida, ARQ_BOOTSTRAP), sep=';', index=False,
+                                     encoding='utf-8-sig', float_format='%.6g')
+    # Depois do rodapé: um lote retomado trunca o relatório antes dele e a seção é refeita
+    with open(os.path.join(saida, ARQ_RELATORIO), 'a', encoding='utf-8', newline='') as f:
+        f.write("\n" + "\n".join(linhas_relatorio_bootstrap(resumos)) + "\n")
+    return len(resumos), erros
+
+# ==================== LINHA DE COMANDO ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GARCH Analyzer Pro em lote (sem Streamlit)")
+    parser.add_argument("tickers", help="arquivo com um ticker por linha")
+    parser.add_argument("--inicio", required=True, help="AAAA-MM-DD")
+    parser.add_argument("--fim", default=datetime.today().strftime('%Y-%m-%d'), help="AAAA-MM-DD (padrão: hoje)")
+    parser.add_argument("--saida", default="lote_analyzer", help="diretório de saída")
+    parser.add_argument("--paralelo", action="store_true", help="distribui os ajustes entre processos")
+    parser.add_argument("--workers", type=int, default=None, help="processos no modo paralelo")
+    parser.add_argument("--backend", choices=BACKENDS_AJUSTE, default="arch")
+    parser.add_argument("--warm-start", action="store_true")
+    parser.add_argument("--sem-cache", action="store_true", help="não usa os caches de preços/ajustes")
+    parser.add_argument("--offline", action="store_true", help="só dados do cache local de preços")
+    parser.add_argument("--max-downloads", type=int, default=8)
+    parser.add_argument("--reiniciar", action="store_true", help="ignora o checkpoint e começa do zero")
+    parser.add_argument("--metricas", help="arquivo JSON lines com tempos por ticker/modelo")
+    parser.add_argument("--incremental", action="store_true",
+                        help="só avança o universo salvo; reajusta quando há deriva ou idade máxima")
+    parser.add_argument("--max-dias", type=int, default=MAX_DIAS_SEM_REAJUSTE,
+                        help="pregões sem reajuste antes de forçar a seleção completa (--incremental)")
+    parser.add_argument("--reajustar-todos", action="store_true", help="--incremental com seleção completa em todos")
+    parser.add_argument("--grade", choices=sorted(GRADES), default="padrao",
+                        help="padrao = 6 modelos normais; estendida = t/skew-t e ordens até (3,3)")
+    parser.add_argument("--podar", action="store_true",
+                        help="busca podada (triagem em subamostra, para de expandir sem ganho de AIC)")
+    parser.add_argument("--subamostra", type=int, default=750, help="retornos da triagem da busca podada (0 = sem)")
+    parser.add_argument("--publicar", nargs="?", const=ARQ_SNAPSHOT, metavar="ARQUIVO",
+                        help=f"publica os vencedores no snapshot do feed do MT5 (padrão: {ARQ_SNAPSHOT})")
+    parser.add_argument("--bootstrap", type=int, default=0, metavar="B",
+                        help="réplicas do bootstrap dos parâmetros dos vencedores (0 = sem)")
+    parser.add_argument("--bootstrap-metodo", choices=METODOS, default="parametrico")
+    parser.add_argument("--bootstrap-parada", action="store_true",
+                        help="para o bootstrap de um ticker quando as larguras dos ICs estabilizam")
+    args = parser.parse_args(argv)
+    publicador = PublicadorParametros(args.publicar) if args.publicar else None
+    modelos = GRADES[args.grade]
+    busca = BuscaPodada(subamostra=args.subamostra or None) if args.podar else None
+
+    if args.incremental:
+        n_ok, erros = executar_incremental(
+            ler_tickers(args.tickers), args.inicio, args.fim, args.saida, backend=args.backend,
+            usar_cache=not args.sem_cache, offline=args.offline, max_downloads=args.max_downloads,
+            max_dias=args.max_dias, forcar=args.reajustar_todos, modelos=modelos, busca=busca,
+            publicador=publicador
+        )
+    else:
+        n_ok, erros = executar_lote(
+            ler_tickers(args.tickers), args.inicio, args.fim, args.saida,
+            modo="paralelo" if args.paralelo else "serial", max_workers=args.workers,
+            backend=args.backend, warm_start=args.warm_start, usar_cache=not args.sem_cache,
+            offline=args.offline, max_downloads=args.max_downloads, reiniciar=args.reiniciar,
+            arquivo_metricas=args.metricas, modelos=modelos, busca=busca, publicador=publicador
+        )
+    print(f"Concluído: {n_ok} ok, {len(erros)} com erro → {args.saida}")
+    if args.bootstrap > 0 and os.path.exists(os.path.join(args.saida, ARQ_CANDIDATOS)):
+        n_boot, erros_boot = executar_bootstrap_lote(
+            args.saida, args.inicio, args.fim, B=args.bootstrap, metodo=args.bootstrap_metodo,
+            modo="paralelo" if args.paralelo else "serial", max_workers=args.workers,
+            parada_antecipada=args.bootstrap_parada, usar_cache=not args.sem_cache, offline=args.offline,
+            max_downloads=args.max_downloads, backend=args.backend
+        )
+        print(f"Bootstrap: {n_boot} ok, {len(erros_boot)} com erro → {ARQ_BOOTSTRAP}")
+    return 0 if n_ok or not erros else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,273 +1,154 @@
 """
 ASUS GARCH PRO 2025 - VERSÃO COMPLETA
 Login + Cálculo Simples + Analyzer Pro Multi-Ativos
-+ PERSISTÊNCIA DE USUÁRIOS (salva em arquivo JSON)
++ PERSISTÊNCIA DE USUÁRIOS (banco SQLite)
++ ANÁLISES EM SEGUNDO PLANO (tarefas.py: fila, progresso, cancelamento)
+
+Login/admin sobem só com Streamlit + stdlib: arch, yfinance, matplotlib,
+NumPy/pandas e o analyzer são importados dentro das páginas que os usam
+(ver benchmark_garch.py --so-inicializacao).
 """
 
 import streamlit as st
-import pandas as pd
-import yfinance as yf
-import numpy as np
-from arch import arch_model
-from statsmodels.stats.diagnostic import acorr_ljungbox
-import matplotlib.pyplot as plt
 import hashlib
-import time
-import json
+import io
 import os
 from datetime import datetime, timedelta
+from functools import partial
+from usuarios_db import RepositorioUsuarios
 
 st.set_page_config(page_title="ASUS GARCH PRO", page_icon="📊", layout="wide")
 
 # ==================== PERSISTÊNCIA DE USUÁRIOS ====================
-USERS_FILE = "users_database.json"
+USERS_FILE = "users_database.json"  # formato antigo, migrado uma vez para o SQLite
+
+@st.cache_resource
+def obter_repositorio_usuarios():
+    """Banco SQLite (WAL) compartilhado por todas as sessões"""
+    return RepositorioUsuarios(arquivo_json=USERS_FILE)
 
 def carregar_usuarios():
-    """Carrega usuários do arquivo JSON"""
-    if os.path.exists(USERS_FILE):
-        try:
-            with open(USERS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+    """Carrega todos os usuários do banco"""
+    return obter_repositorio_usuarios().carregar()
 
 def salvar_usuarios(users_dict):
-    """Salva usuários no arquivo JSON"""
-    with open(USERS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(users_dict, f, indent=2, ensure_ascii=False)
-
-# Inicializa usuários (carrega do arquivo se existir)
-if "users" not in st.session_state:
-    st.session_state.users = carregar_usuarios()
-
-if "logado" not in st.session_state:
-    st.session_state.logado = None
-# ==================== CONFIGURAÇÕES GLOBAIS ====================
-MODELOS_ANALYZER = [
-    ('GARCH', 1, 0, 1, 'GARCH(1,1)'),
-    ('GARCH', 1, 0, 2, 'GARCH(1,2)'),
-    ('GARCH', 2, 0, 1, 'GARCH(2,1)'),
-    ('EGARCH', 1, 1, 1, 'EGARCH(1,1)'),
-    ('EGARCH', 1, 1, 2, 'EGARCH(1,2)'),
-    ('GJR', 1, 1, 1, 'GJR-GARCH(1,1,1)')
-]
+    """Grava os usuários no banco (upsert por linha, uma transação)"""
+    obter_repositorio_usuarios().salvar(users_dict)
 
-TICKER_MAP = {
-    'MES=F': 'ES', 'MNQ=F': 'NQ', 'M2K=F': 'RTY', 'MYM=F': 'YM',
-    'EURUSD=X': 'EURUSD', 'BRL=X': 'USDBRL'
-}
-
-# ==================== FUNÇÕES DO ANALYZER ====================
-def baixar_dados(ticker, inicio, fim):
-    for _ in range(5):
-        try:
-            df = yf.download(ticker, start=inicio, end=fim, progress=False, auto_adjust=True)
-            close = df['Close'].dropna()
-            if len(close) < 500:
-                raise ValueError("Menos de 500 pontos")
-            return close
-        except:
-            time.sleep(3)
-    raise ValueError(f"Falha ao baixar {ticker}")
-
-def calcular_retornos(precos):
-    ret = np.log(precos / precos.shift(1)).dropna()
-    return ret.replace([np.inf, -np.inf], np.nan).dropna()
+# ==================== CACHE DE AJUSTES ====================
+@st.cache_resource
+def obter_cache_ajustes():
+    """Uma instância por servidor: sobrevive aos reruns e é compartilhada entre sessões"""
+    from cache_ajustes import CacheAjustes, FIT_CACHE_DIR
+    return CacheAjustes(diretorio=FIT_CACHE_DIR)
 
-def ljung_box_test(residuals_sq, lags=20):
-    if len(residuals_sq) < lags * 2:
-        lags = max(1, len(residuals_sq) // 4)
+# ==================== FEED LOCAL DO MT5 ====================
+@st.cache_resource
+def obter_feed_mt5():
+    """Snapshot mapeado em memória + endpoint HTTP em localhost (um por servidor)"""
+    from publicador_mt5 import PublicadorParametros, ServidorParametros
+    publicador = PublicadorParametros()
     try:
-        lb = acorr_ljungbox(residuals_sq, lags=[lags], return_df=True)
-        return lb.iloc[0]['lb_pvalue']
-    except:
-        return 0.0
+        servidor = ServidorParametros(publicador.arquivo).iniciar()
+    except OSError:
+        servidor = None  # porta ocupada (ex.: publicador_mt5.py --servir já atende o arquivo)
+    return publicador, servidor
 
-def ajustar_modelo(retornos, vol_type, p, o, q):
-    try:
-        model = arch_model(retornos, vol=vol_type, p=p, o=o, q=q, dist='normal')
-        res = model.fit(disp="off", options={'maxiter': 1000})
-        Z2 = (res.resid / res.conditional_volatility).dropna() ** 2
-        lb_p = ljung_box_test(Z2)
-        return {
-            'params': res.params,
-            'aic': res.aic,
-            'lb_p': lb_p,
-            'success': True,
-            'model_name': f"{vol_type}({p},{o},{q})" if o else f"{vol_type}({p},{q})"
-        }
-    except:
-        return {'params': None, 'aic': np.inf, 'lb_p': 0.0, 'success': False, 'model_name': vol_type}
-
-def selecionar_melhor_modelo(retornos, ticker):
-    resultados = []
-    for vol, p, o, q, nome in MODELOS_ANALYZER:
-        res = ajustar_modelo(retornos, vol, p, o, q)
-        res['nome_exibicao'] = nome
-        resultados.append(res)
-    
-    validos = [r for r in resultados if r['success'] and r['lb_p'] > 0.05]
-    if not validos:
-        validos = [r for r in resultados if r['success']]
-    if not validos:
-        return {'model_name': 'FALHA', 'aic': 999}, []
-    
-    melhor = min(validos, key=lambda x: x['aic'])
-    return melhor, resultados
+# ==================== GRÁFICOS ====================
+@st.cache_data(max_entries=128, show_spinner=False)
+def grafico_vol_png(ticker, modelo, janela, series, nivel, titulo, ylabel="Volatilidade", tamanho=(12, 6)):
+    """PNG (LTTB + Figure avulsa) em cache por (ticker, modelo, janela) e pelos dados"""
+    from graficos import renderizar_png
+    return renderizar_png(series, titulo, nivel, ylabel=ylabel, tamanho=tamanho)
 
-def extrair_parametros(params):
-    if params is None or len(params) == 0:
-        return {'omega': 0, 'alpha_total': 0, 'beta_total': 0, 'gamma': 0}
-    
-    omega = params.get('omega', 0)
-    alpha_total = sum(params.get(f'alpha[{i}]', 0) for i in range(1, 10) if f'alpha[{i}]' in params)
-    beta_total = sum(params.get(f'beta[{i}]', 0) for i in range(1, 10) if f'beta[{i}]' in params)
-    gamma = params.get('gamma[1]', 0)
-    
-    return {
-        'omega': omega,
-        'alpha_total': alpha_total,
-        'beta_total': beta_total,
-        'gamma': gamma
-    }
+# ==================== INTRADIÁRIO ====================
+INTERVALOS_INTRADIARIOS = {"1 min": "1m", "5 min": "5m"}
+GARCH_INTRADIARIO = {"GARCH(1,1)": ('GARCH', 1, 0, 1), "EGARCH(1,1)": ('EGARCH', 1, 1, 1),
+                     "GJR-GARCH": ('GJR', 1, 1, 1)}
 
-def gerar_relatorio_txt_completo(resultados, inicio, fim, dias_corridos, dias_uteis):
-    """Gera relatório TXT COMPLETO igual ao Jupyter"""
-    width = 220
-    lines = []
-    
-    lines.append("GARCH ANALYZER PRO 3.9.4 — ANÁLISE COMPLETA + REGRAS POR TIPO DE ATIVO")
-    lines.append(f"Data da análise: {datetime.now():%Y-%m-%d %H:%M:%S}")
-    lines.append(f"Período analisado: {inicio} → {fim}")
-    lines.append(f"Dias corridos: {dias_corridos} | Dias úteis: {dias_uteis} (≈ {dias_uteis/252:.2f} anos)\n")
-    
-    lines.append("RESULTADOS DOS MODELOS VENCEDORES + INTERPRETAÇÃO AUTOMÁTICA")
-    lines.append("=" * width)
-    lines.append(f"{'Ativo':<8} {'Modelo':<16} {'AIC':<8} {'LB':<6} {'Ω':<12} {'α':<10} {'β':<10} {'γ':<10} {'Status':<10} {'Interpretação':<50}\n")
-    lines.append("=" * width)
-    
-    for r in resultados:
-        p = r['params']
-        status = "EXCELENTE" if r['lb_p'] > 0.05 else "BOM"
-        ativo, ticker = r['ativo'], r['ticker']
-        
-        omega = p.get('omega', p.get('mu', 0))
-        alpha_total = sum(p.get(f'alpha[{i}]', 0) for i in range(1, 10) if f'alpha[{i}]' in p)
-        beta_total = sum(p.get(f'beta[{i}]', 0) for i in range(1, 10) if f'beta[{i}]' in p)
-        gamma = p.get('gamma[1]', 0.0)
-        
-        # Determina tipo de ativo
-        tipo = "ACAO"
-        if ativo in ['EURUSD', 'USDBRL'] or 'USD' in ticker or '=X' in ticker:
-            tipo = "FOREX"
-        elif '=F' in ticker or ativo in ['ES', 'NQ', 'RTY', 'YM']:
-            tipo = "FUTUROS"
-        elif ativo.startswith('^') or ativo in ['SPX', 'NDX', 'RUT']:
-            tipo = "INDICE"
-        
-        # Regras de interpretação
-        regras = []
-        if r['model_name'].startswith('EGARCH'):
-            if omega < -0.5: regras.append("QUEDAS EXPLODEM VOL!")
-            elif omega < -0.2: regras.append("Quedas aumentam vol")
-            elif omega < 0: regras.append("Leve alavancagem")
-        if beta_total > 0.98: regras.append("VOL DURA MUITO (CRISES)")
-        elif beta_total > 0.95: regras.append("Vol persistente")
-        if alpha_total > 0.20: regras.append("REAÇÃO FORTE A NOTÍCIAS")
-        elif alpha_total > 0.10: regras.append("Choques moderados")
-        
-        if tipo == "FOREX" and r['model_name'].startswith('GARCH') and alpha_total < 0.07 and beta_total > 0.90:
-            regras.append("FOREX CLÁSSICO")
-        elif tipo == "FUTUROS" and r['model_name'].startswith('GARCH') and alpha_total > 0.08:
-            regras.append("VOL TÉCNICA (FUTUROS)")
-        elif tipo == "ACAO" and r['model_name'].startswith('GARCH'):
-            if alpha_total < 0.07: regras.append("ACAO MADURA")
-            elif alpha_total > 0.15: regras.append("ACAO VOLÁTIL")
-        
-        if r['model_name'].startswith('EGARCH') and omega < -0.3:
-            regras.append("TECH/PÂNICO")
-        
-        interp_str = " | ".join(regras) if regras else "Estável"
-        
-        lines.append(f"{ativo:<8} {r['model_name']:<16} {r['aic']:<8.1f} {r['lb_p']:<6.3f} "
-                    f"{omega:<12.6f} {alpha_total:<10.6f} {beta_total:<10.6f} {gamma:<10.6f} {status:<10} {interp_str:<50}")
-    
-    lines.append("=" * width + "\n")
+def mostrar_intradiario(ativo, intervalo, modelo, periodo):
+    """Cálculo Simples com barras intradiárias: RV diária em fluxo, HAR-RV e GARCH intradiário"""
+    import numpy as np
+    from intradiario import ArmazemIntradiario, atualizar_do_provedor, analisar_intradiario, DIAS_ANO
     
-    # CRITÉRIOS DE SELEÇÃO
-    lines.append("CRITÉRIOS DE SELEÇÃO DO MELHOR MODELO")
-    lines.append("=" * width)
-    lines.append("AIC (Akaike Information Criterion)")
-    lines.append("    • Quanto MENOR, MELHOR o modelo")
-    lines.append("    • Penaliza complexidade → evita overfitting")
-    lines.append("    • Ex: AIC = -5109 → EXCELENTE")
-    lines.append("    • Ex: AIC = -4000 → modelo pior\n")
-    lines.append("LB p-val (Ljung-Box p-value)")
-    lines.append("    • Testa se resíduos são 'ruído branco'")
-    lines.append("    • p-val > 0.05 → MODELO VÁLIDO")
-    lines.append("    • p-val < 0.05 → resíduos com padrão → MODELO RUIM")
-    lines.append("    • Status 'EXCELENTE' = p-val > 0.05\n")
-    
-    # PARÂMETROS GREGOS
-    lines.append("INTERPRETAÇÃO DOS PARÂMETROS GREGOS")
-    lines.append("=" * width)
-    lines.append("Ω (Omega)   → Volatilidade de longo prazo")
-    lines.append("            • GARCH/GJR: sempre positivo")
-    lines.append("            • EGARCH: pode ser NEGATIVO → quedas aumentam vol mais que subidas")
-    lines.append("            • Ex: Ω = -0.645 → quedas geram PÂNICO de vol\n")
-    lines.append("α (Alpha)   → Impacto total de choques recentes (soma de todos os α[i])")
-    lines.append("            • α alto → volatilidade reage forte a eventos")
-    lines.append("            • Ex: α = 0.341 → 34.1% do choque entra na vol\n")
-    lines.append("β (Beta)    → Persistência total da volatilidade (soma de todos os β[i])")
-    lines.append("            • β próximo de 1 → vol dura MUITO tempo")
-    lines.append("            • Ex: β = 0.991 → vol dura ~30 dias")
-    lines.append("            • α + β ≈ 0.98 → vol de hoje explica 98% da vol amanhã\n")
-    lines.append("γ (Gamma)   → Assimetria (efeito alavancagem)")
-    lines.append("            • Presente em: EGARCH e GJR-GARCH")
-    lines.append("            • γ > 0 → más notícias aumentam vol mais que boas")
-    lines.append("            • γ = 0 → sem assimetria (GARCH)")
-    lines.append("            • Se γ ≠ 0 → use EGARCH ou GJR no EA!\n")
-    lines.append("DICAS PARA MT5:")
-    lines.append("• EGARCH: use log(vol) → exp() no MQL5")
-    lines.append("• GJR: use (retorno < 0) ? (alpha + gamma) : alpha")
-    lines.append("• Para GARCH(p,q): some todos os α[i] e β[i]")
-    lines.append("• Atualize todo dia com novos dados")
-    lines.append("=" * width + "\n")
+    with st.spinner("📊 Baixando barras intradiárias..."):
+        try:
+            armazem = ArmazemIntradiario()
+            novas = atualizar_do_provedor(armazem, ativo, intervalo)
+            inicio = (datetime.today() - timedelta(days=periodo)).strftime('%Y-%m-%d')
+            res = analisar_intradiario(armazem, ativo, intervalo, inicio=inicio, garch=GARCH_INTRADIARIO.get(modelo))
+        except Exception as e:
+            st.error(f"❌ Erro: {e}")
+            return
+    rv = res['rv']
+    if rv.empty:
+        st.warning(f"⚠️ Nenhuma barra de {intervalo} gravada para {ativo}")
+        return
     
-    # LEGENDA
-    lines.append("LEGENDA DAS INTERPRETAÇÕES AUTOMÁTICAS (v3.9.4)")
-    lines.append("=" * width)
-    lines.append("FOREX CLÁSSICO     → FOREX + GARCH + α<0.07 + β>0.90")
-    lines.append("VOL TÉCNICA        → FUTUROS + GARCH + α>0.08")
-    lines.append("ACAO MADURA        → AÇÃO + GARCH + α<0.07")
-    lines.append("ACAO VOLÁTIL       → AÇÃO + GARCH + α>0.15")
-    lines.append("QUEDAS EXPLODEM VOL! → EGARCH + Ω < -0.5")
-    lines.append("VOL DURA MUITO     → β > 0.98")
-    lines.append("TECH/PÂNICO        → EGARCH + Ω < -0.3")
-    lines.append("=" * width)
+    st.caption(f"{res['linhas']:,} barras ({novas:,} novas) · {len(rv)} dias · "
+               + " · ".join(f"{etapa} {s:.2f}s" for etapa, s in res['tempos'].items()))
+    har = res['har']
+    vol_long = float(np.sqrt(DIAS_ANO * rv['rv'].mean()))
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📈 Vol Realizada Média", f"{vol_long:.2%}")
+    with col2:
+        st.metric("📊 Vol Realizada (último dia)", f"{rv['vol_anual'].iloc[-1]:.2%}")
+    with col3:
+        if har is not None:
+            st.metric("🔮 HAR-RV próximo dia", f"{har.vol_prevista(1):.2%}",
+                      f"{(har.vol_prevista(1) / vol_long - 1) * 100:+.2f}%")
+    for nome, erro in res['erros'].items():
+        st.warning(f"⚠️ {nome}: {erro}")
+    if res['garch'] is not None:
+        g = res['garch']
+        st.caption(f"{g['model_name']} intradiário (retornos dessazonalizados, {g['nobs']:,} barras): "
+                   f"persistência {g['persistencia']:.4f} · AIC {g['aic']:.1f}")
     
-    return "\n".join(lines)
+    series = {"Vol Realizada": rv['vol_anual']}
+    if har is not None:
+        series["HAR-RV"] = np.sqrt(DIAS_ANO * har.ajustado.clip(lower=0))
+    st.image(grafico_vol_png(ativo, f"RV-{intervalo}", periodo, series, vol_long,
+                             f"Volatilidade realizada ({intervalo}) - {ativo}", ylabel="Vol anualizada"))
+    st.download_button("💾 Baixar RV Diária CSV", rv.to_csv(), f"{ativo}_rv_{intervalo}.csv")
+
+# ==================== TAREFAS EM SEGUNDO PLANO ====================
+ROTULOS_STATUS = {
+    "na_fila": "⏳ Na fila", "executando": "🔄 Executando", "concluida": "✅ Concluída",
+    "cancelada": "⛔ Cancelada", "falhou": "❌ Falhou", "interrompida": "⚠️ Interrompida"
+}
+
+@st.cache_resource
+def obter_gerenciador_tarefas():
+    """Fila de análises do servidor: sobrevive aos reruns e é compartilhada entre sessões"""
+    from tarefas import GerenciadorTarefas
+    return GerenciadorTarefas()
 
-def gerar_csv_mt5(resultados):
-    dados = []
-    for r in resultados:
-        params = extrair_parametros(r['params'])
-        dados.append({
-            'Ativo': r['ativo'],
-            'Modelo': r['model_name'],
-            'Omega': params['omega'],
-            'Alpha_Total': params['alpha_total'],
-            'Beta_Total': params['beta_total'],
-            'Gamma': params['gamma'],
-            'AIC': r['aic'],
-            'LB_pval': r['lb_p']
-        })
-    return pd.DataFrame(dados)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def resultado_tarefa(id_tarefa):
+    """Resultado de uma análise concluída (lido do disco uma vez, somente leitura)"""
+    return obter_gerenciador_tarefas().resultado(id_tarefa)
+
+@st.fragment(run_every=1.0)
+def acompanhar_tarefa(id_tarefa):
+    """Progresso da análise em andamento: só este trecho é refeito a cada segundo"""
+    gerenciador = obter_gerenciador_tarefas()
+    estado = gerenciador.estado(id_tarefa)
+    if estado is None or estado['status'] not in ("na_fila", "executando"):
+        st.rerun()  # terminou: a página inteira mostra o resultado
+    if estado['status'] == "na_fila":
+        st.progress(0.0, text=f"⏳ Na fila (posição {estado['posicao_fila']})")
+    else:
+        total = estado['total'] or 1
+        st.progress(min(estado['concluidos'] / total, 1.0),
+                    text=f"🔄 {estado['mensagem']} ({estado['concluidos']}/{estado['total']})")
+    if st.button("⛔ Cancelar análise", key=f"cancelar_{id_tarefa}"):
+        gerenciador.cancelar(id_tarefa, dono=st.session_state.logado)
+
+# Usuários ficam no banco (consultados por linha); a sessão guarda só o login
+usuarios = obter_repositorio_usuarios()
 
 # ==================== SISTEMA DE LOGIN ====================
-if "users" not in st.session_state:
-    st.session_state.users = {}
 if "logado" not in st.session_state:
     st.session_state.logado = None
 
@@ -286,14 +167,12 @@ if not st.session_state.logado:
             if st.form_submit_button("Cadastrar"):
                 if convite not in ["king2025", "petr4god", "asuspro"]:
                     st.error("❌ Convite inválido!")
-                elif email in st.session_state.users:
-                    st.error("❌ E-mail já usado!")
-                else:
-                    st.session_state.users[email] = {
+                elif not usuarios.cadastrar(email, {
                         "senha": hashlib.sha256(senha.encode()).hexdigest(),
                         "aprovado": False
-                    }
-                    salvar_usuarios(st.session_state.users)  # ← SALVA NO ARQUIVO
+                    }):  # ← INSERE UMA LINHA (falha se o e-mail já existe)
+                    st.error("❌ E-mail já usado!")
+                else:
                     st.success("✅ Cadastro enviado! Aguarde aprovação.")
     
     with col2:
@@ -302,8 +181,9 @@ if not st.session_state.logado:
             email_l = st.text_input("E-mail")
             senha_l = st.text_input("Senha", type="password")
             if st.form_submit_button("Entrar"):
-                if email_l in st.session_state.users and st.session_state.users[email_l]["aprovado"]:
-                    if st.session_state.users[email_l]["senha"] == hashlib.sha256(senha_l.encode()).hexdigest():
+                usuario = usuarios.obter(email_l)
+                if usuario and usuario["aprovado"]:
+                    if usuario["senha"] == hashlib.sha256(senha_l.encode()).hexdigest():
                         st.session_state.logado = email_l
                         st.rerun()
                     else:
@@ -317,7 +197,7 @@ if not st.session_state.logado:
         if st.text_input("Senha Admin", type="password", key="admin_pwd") == "asus2025":
             st.success("✅ ADMIN LOGADO!")
             st.subheader("📋 Usuários Pendentes:")
-            pendentes = {e: d for e, d in st.session_state.users.items() if not d["aprovado"]}
+            pendentes = usuarios.pendentes()
             
             if not pendentes:
                 st.info("Nenhum usuário pendente.")
@@ -328,8 +208,7 @@ if not st.session_state.logado:
                         st.write(f"📧 {email}")
                     with c2:
                         if st.button("✅ APROVAR", key=email):
-                            st.session_state.users[email]["aprovado"] = True
-                            salvar_usuarios(st.session_state.users)  # ← SALVA NO ARQUIVO
+                            usuarios.aprovar(email)  # ← ATUALIZA SÓ ESTA LINHA
                             st.success(f"Aprovado: {email}")
                             st.rerun()
 
@@ -353,15 +232,27 @@ else:
         st.title("🎯 ASUS GARCH - Cálculo Simples")
         st.markdown("**Análise rápida de volatilidade para 1 ativo**")
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
             ativo = st.text_input("Ativo", "PETR4.SA").upper()
         with col2:
             modelo = st.selectbox("Modelo", ["GARCH(1,1)", "EGARCH(1,1)", "GJR-GARCH", "T-Student"])
         with col3:
             periodo = st.slider("Dias", 100, 2000, 500)
+        with col4:
+            frequencia = st.selectbox("Frequência", ["Diário"] + list(INTERVALOS_INTRADIARIOS),
+                                      help="Intradiário: variância realizada diária, HAR-RV e GARCH nas barras")
 
-        if st.button("🚀 CALCULAR VOLATILIDADE", type="primary"):
+        calcular = st.button("🚀 CALCULAR VOLATILIDADE", type="primary")
+        if calcular and frequencia in INTERVALOS_INTRADIARIOS:
+            mostrar_intradiario(ativo, INTERVALOS_INTRADIARIOS[frequencia], modelo, periodo)
+        if calcular and frequencia == "Diário":
+            # Imports pesados só no clique (ficam em sys.modules nos reruns seguintes)
+            import numpy as np
+            import yfinance as yf
+            from arch import arch_model
+            from cache_ajustes import chave_ajuste
+            
             with st.spinner("📊 Baixando dados..."):
                 try:
                     data = yf.download(ativo, period=f"{periodo}d", progress=False)
@@ -375,15 +266,19 @@ else:
                         res = None
                     else:
                         vol_type = "Garch" if "GARCH" in modelo else "EGarch" if "EGARCH" in modelo else "GJR"
+                        o = 1 if "GJR" in modelo else 0
                         am = arch_model(
                             scaled, 
                             dist="normal", 
                             vol=vol_type, 
                             p=1, 
-                            o=1 if "GJR" in modelo else 0, 
+                            o=o, 
                             q=1
                         )
-                        res = am.fit(disp="off")
+                        res = obter_cache_ajustes().obter_ou_calcular(
+                            chave_ajuste(ativo, scaled, vol_type, 1, o, 1, "normal", "simples"),
+                            lambda: am.fit(disp="off")
+                        )
                         unconditional = res.params["omega"] / (
                             1 - res.params["alpha[1]"] - res.params["beta[1]"] - res.params.get("gamma[1]", 0) / 2
                         )
@@ -400,18 +295,12 @@ else:
                         delta = (vol_atual / vol_long - 1) * 100
                         st.metric("📉 Diferença", f"{delta:+.2f}%")
 
-                    # GRÁFICO
-                    fig, ax = plt.subplots(figsize=(12, 6))
+                    # GRÁFICO (janela inteira, reduzida com LTTB; PNG em cache)
                     if res is not None:
-                        (np.sqrt(res.conditional_volatility.iloc[-200:]) / 100).plot(ax=ax, label="Vol Condicional")
+                        series = {"Vol Condicional": np.sqrt(res.conditional_volatility) / 100}
                     else:
-                        (vol.iloc[-200:] / 100).plot(ax=ax, label="Vol Rolling")
-                    ax.axhline(vol_long, color="red", linestyle="--", label="Vol Longo Prazo")
-                    ax.set_title(f"{modelo} - {ativo}", fontsize=14, fontweight='bold')
-                    ax.set_ylabel("Volatilidade")
-                    ax.legend()
-                    ax.grid(alpha=0.3)
-                    st.pyplot(fig)
+                        series = {"Vol Rolling": vol / 100}
+                    st.image(grafico_vol_png(ativo, modelo, periodo, series, vol_long, f"{modelo} - {ativo}"))
 
                     # DOWNLOAD CSV
                     csv = data[["Close"]].pct_change().to_csv()
@@ -422,6 +311,21 @@ else:
     
     # ==================== PÁGINA 2: ANALYZER PRO ====================
     else:
+        import numpy as np
+        import pandas as pd
+        from analyzer import (
+            extrair_parametros, gerar_relatorio_txt_completo, gerar_csv_mt5, tabela_resultados,
+            executar_analyzer, BACKENDS_AJUSTE, GRADES, BuscaPodada
+        )
+        from tabela_candidatos import gravar_parquet
+        from tarefas import FilaCheia, ATIVAS, CONCLUIDA, FALHOU
+        from cache_precos import CachePrecos
+        from instrumentacao import registros_execucao, cronometro, resumo_por_etapa, para_jsonl, perfilar
+        from bootstrap_parametros import (
+            especificacoes, retornos_dos_tickers, executar_bootstrap, linhas_relatorio_bootstrap,
+            tabela_bootstrap, visao_bootstrap, METODOS, B_PADRAO
+        )
+        
         st.title("🔬 GARCH ANALYZER PRO - Multi-Ativos")
         st.markdown("**Análise comparativa de múltiplos ativos com seleção automática do melhor modelo**")
         
@@ -469,8 +373,91 @@ else:
                     value=hoje.date(),
                     max_value=hoje.date()
                 )
+            
+            st.divider()
+            
+            # Execução
+            st.subheader("⚡ Execução")
+            paralelo = st.checkbox("Paralelizar ajustes entre núcleos", value=False)
+            modo_execucao = "paralelo" if paralelo else "serial"
+            n_workers = None
+            if paralelo:
+                n_workers = st.slider("Processos:", 1, os.cpu_count() or 1, os.cpu_count() or 1)
+            
+            backend = st.selectbox("🧮 Motor de estimação:", BACKENDS_AJUSTE,
+                                   help="rapido = GARCH/GJR vetorizado em NumPy (conferido contra o arch)")
+            
+            warm_start = st.checkbox("🔥 Warm start", value=False,
+                                     help="Semeia cada modelo com os parâmetros de ontem ou do modelo aninhado menor")
+            
+            grade = st.selectbox("🧩 Grade de modelos:", list(GRADES),
+                                 format_func=lambda g: {'padrao': "Padrão (6 modelos, erros normais)",
+                                                        'estendida': "Estendida (t/skew-t, ordens até 3,3)"}.get(g, g))
+            busca_podada = st.checkbox("✂️ Busca podada", value=grade != 'padrao',
+                                       help="Triagem numa subamostra e expansão de ordens só enquanto o AIC melhora")
+            
+            # Cache local de preços
+            usar_cache = st.checkbox("💽 Cache local de preços", value=True,
+                                     help="Guarda o histórico em disco e baixa só as datas que faltam")
+            modo_offline = st.checkbox("📴 Modo offline (só cache)", value=False, disabled=not usar_cache)
+            
+            reusar_ajustes = st.checkbox("🧠 Reaproveitar ajustes já calculados", value=True,
+                                         help="Mesma série + mesmo modelo → resultado do cache, sem reajustar")
+            if st.button("🧹 Limpar cache de ajustes"):
+                obter_cache_ajustes().limpar()
+            
+            # Downloads/ajustes idênticos em voo são feitos uma vez para todas as sessões
+            with st.expander("🤝 Coordenação entre sessões"):
+                from coordenacao import estatisticas_coordenacao
+                coord = estatisticas_coordenacao()
+                st.dataframe(pd.DataFrame([
+                    {'Etapa': "Downloads", 'Executados': coord['downloads']['execucoes'],
+                     'Compartilhados': coord['downloads']['compartilhados'],
+                     'Espera (s)': f"{coord['downloads']['espera_s']:.1f}", 'Em voo': coord['downloads']['em_voo']},
+                    {'Etapa': "Ajustes", 'Executados': coord['ajustes']['execucoes'],
+                     'Compartilhados': coord['ajustes']['compartilhados'],
+                     'Espera (s)': f"{coord['ajustes']['espera_s']:.1f}", 'Em voo': coord['ajustes']['em_voo']},
+                ]), hide_index=True, use_container_width=True)
+                st.caption(f"Provedor: {coord['provedor']['em_uso']}/{coord['provedor']['maximo']} em uso · "
+                           f"pico {coord['provedor']['pico']} · {coord['provedor']['esperas']} esperas por vaga "
+                           f"({coord['provedor']['espera_s']:.1f}s)")
+            
+            # Instrumentação
+            painel_performance = st.checkbox("⏱️ Painel de performance", value=False,
+                                             help="Tempo por etapa, iterações, convergência e tentativas")
+            capturar_perfil = st.checkbox("🧪 Capturar cProfile desta execução", value=False,
+                                          disabled=not painel_performance)
+            
+            # Correlação entre os ativos
+            calcular_dcc = st.checkbox("🔗 Correlação dinâmica (DCC)", value=False,
+                                       help="DCC(1,1) sobre os resíduos padronizados dos vencedores")
+            
+            # Incerteza das estimativas (as regras da interpretação mudam com ruído pequeno)
+            calcular_bootstrap = st.checkbox("🎲 Bootstrap dos parâmetros", value=False,
+                                             help="Reajusta cada vencedor em B séries reamostradas: ICs de "
+                                                  "Ω/α/β/γ e a chance de cada regra da interpretação disparar")
+            n_bootstrap, metodo_bootstrap, parada_bootstrap = B_PADRAO, METODOS[0], True
+            if calcular_bootstrap:
+                n_bootstrap = st.slider("Réplicas (B):", 50, 500, B_PADRAO, step=50)
+                metodo_bootstrap = st.selectbox("Reamostragem:", METODOS,
+                                                format_func=lambda m: {'parametrico': "Paramétrica (simula o vencedor)",
+                                                                       'blocos': "Blocos dos retornos"}.get(m, m))
+                parada_bootstrap = st.checkbox("Parada antecipada", value=True,
+                                               help="Para um ativo quando as larguras dos ICs estabilizam")
+            
+            # Parâmetros direto para o Expert Advisor, sem baixar o CSV
+            publicar_mt5 = st.checkbox("📡 Publicar no feed local do MT5", value=False,
+                                       help="Ao fim da análise, os vencedores vão para o snapshot mapeado em "
+                                            "memória e para o endpoint HTTP em localhost")
+            if publicar_mt5:
+                publicador_mt5, servidor_mt5 = obter_feed_mt5()
+                st.caption(f"Versão {publicador_mt5.versao} · {len(publicador_mt5.simbolos())} símbolos · "
+                           f"{publicador_mt5.arquivo}"
+                           + (f" · http://127.0.0.1:{servidor_mt5.server_address[1]}/parametros"
+                              if servidor_mt5 is not None else " · endpoint HTTP em outro processo"))
         
         # Área principal
+        gerenciador = obter_gerenciador_tarefas()
         if not ativos_selecionados:
             st.warning("⚠️ Selecione pelo menos um ativo na barra lateral")
         else:
@@ -481,139 +468,343 @@ else:
                 inicio_str = inicio.strftime('%Y-%m-%d')
                 fim_str = fim.strftime('%Y-%m-%d')
                 dias_corridos = (fim - inicio).days
-                dias_uteis = np.busday_count(inicio_str, fim_str)
-                
-                st.success(f"⏳ Analisando {len(ativos_selecionados)} ativos de {inicio_str} a {fim_str} ({dias_uteis} dias úteis)")
+                dias_uteis = int(np.busday_count(inicio_str, fim_str))
+                ativos = list(ativos_selecionados)
                 
-                resultados_finais = []
-                progress_bar = st.progress(0)
-                status_text = st.empty()
+                # Processar cada ativo (serial ou em paralelo entre núcleos)
+                cache_precos = CachePrecos(offline=modo_offline) if usar_cache else None
+                rodar_analyzer = partial(
+                    executar_analyzer,
+                    ativos, inicio_str, fim_str,
+                    modo=modo_execucao, max_workers=n_workers,
+                    cache=cache_precos,
+                    backend=backend,
+                    warm_start=warm_start,
+                    cache_ajustes=obter_cache_ajustes() if reusar_ajustes else None,
+                    modelos=GRADES[grade],
+                    busca=BuscaPodada() if busca_podada else None
+                )
+                perfil = painel_performance and capturar_perfil
+                com_dcc = calcular_dcc
+                rodar_bootstrap = partial(executar_bootstrap, B=n_bootstrap, metodo=metodo_bootstrap,
+                                          modo=modo_execucao, max_workers=n_workers, backend=backend,
+                                          parada_antecipada=parada_bootstrap) if calcular_bootstrap else None
+                publicador = obter_feed_mt5()[0] if publicar_mt5 else None
                 
-                # Processar cada ativo
-                for idx, ticker in enumerate(ativos_selecionados):
-                    status_text.text(f"🔄 Processando {ticker}... ({idx + 1}/{len(ativos_selecionados)})")
-                    progress_bar.progress((idx + 1) / len(ativos_selecionados))
+                def _analise(progresso, cancelado):
+                    """Roda numa thread do GerenciadorTarefas (nada de st.* aqui)"""
+                    def _atualizar_progresso(ticker, concluidos, total, erro):
+                        progresso(concluidos, total, f"{ticker} concluído" if erro is None else f"{ticker}: erro")
                     
-                    try:
-                        precos = baixar_dados(ticker, inicio_str, fim_str)
-                        retornos = calcular_retornos(precos)
-                        melhor, todos = selecionar_melhor_modelo(retornos, ticker)
-                        
-                        ativo_mt5 = TICKER_MAP.get(ticker, ticker.replace('=X', '').replace('=F', ''))
-                        
-                        resultados_finais.append({
-                            'ativo': ativo_mt5,
-                            'ticker': ticker,
-                            'model_name': melhor['model_name'],
-                            'aic': melhor['aic'],
-                            'lb_p': melhor['lb_p'],
-                            'params': melhor['params']
-                        })
+                    progresso(0, len(ativos), f"Processando {len(ativos)} ativos...")
+                    executar = partial(rodar_analyzer, ao_progredir=_atualizar_progresso, cancelado=cancelado)
+                    tempos_gerais = []
+                    texto_perfil = None
+                    with cronometro('analyzer_total', tempos_gerais):
+                        if perfil:
+                            (resultados_finais, erros, relatorio_download), texto_perfil = perfilar(executar)
+                        else:
+                            resultados_finais, erros, relatorio_download = executar()
+                    if cancelado.is_set():
+                        return None
+                    
+                    progresso(len(ativos), len(ativos), "Gerando relatórios...")
+                    res = {
+                        'inicio': inicio_str, 'fim': fim_str, 'resultados': resultados_finais,
+                        'erros': {t: str(e) for t, e in erros.items()}, 'relatorio_download': relatorio_download,
+                        'tempos_gerais': tempos_gerais, 'texto_perfil': texto_perfil, 'dcc': None, 'dcc_erro': None
+                    }
+                    if not resultados_finais:
+                        return res
+                    if com_dcc and len(resultados_finais) >= 2:
+                        from dcc import ajustar_dcc_resultados
+                        try:
+                            with cronometro('dcc', tempos_gerais):
+                                res['dcc'] = ajustar_dcc_resultados(resultados_finais)
+                        except ValueError as e:
+                            res['dcc_erro'] = str(e)
+                    # Tabela de todos os candidatos: o TXT e o CSV são visões dela
+                    with cronometro('tabela_candidatos', tempos_gerais):
+                        tabela = tabela_resultados(resultados_finais, inicio_str, fim_str)
+                    if rodar_bootstrap is not None:
+                        def _progresso_bootstrap(ticker, concluidos, total, erro):
+                            progresso(concluidos, total, f"Bootstrap: {ticker}" + (": erro" if erro else ""))
                         
-                    except Exception as e:
-                        st.error(f"❌ Erro ao processar {ticker}: {e}")
+                        progresso(0, len(resultados_finais), "Bootstrap dos parâmetros...")
+                        with cronometro('bootstrap', tempos_gerais):
+                            retornos, _ = retornos_dos_tickers([r['ticker'] for r in resultados_finais],
+                                                               inicio_str, fim_str, cache_precos)
+                            res['bootstrap'], erros_bootstrap = rodar_bootstrap(
+                                especificacoes(tabela, retornos), ao_progredir=_progresso_bootstrap,
+                                cancelado=cancelado)
+                        if cancelado.is_set():
+                            return None
+                        res['erros'].update({t: f"bootstrap: {e}" for t, e in erros_bootstrap.items()})
+                    with cronometro('relatorio_txt', tempos_gerais):
+                        res['txt'] = gerar_relatorio_txt_completo(resultados_finais, inicio_str, fim_str,
+                                                                  dias_corridos, dias_uteis, tabela=tabela)
+                        if res.get('bootstrap'):
+                            res['txt'] += "\n\n" + "\n".join(linhas_relatorio_bootstrap(res['bootstrap']))
+                    with cronometro('csv_mt5', tempos_gerais):
+                        res['csv'] = gerar_csv_mt5(resultados_finais, tabela=tabela).to_csv(
+                            index=False, sep=';', encoding='utf-8-sig')
+                    with cronometro('parquet_candidatos', tempos_gerais):
+                        res['parquet'] = gravar_parquet(tabela, io.BytesIO()).getvalue()
+                    if publicador is not None:
+                        with cronometro('feed_mt5', tempos_gerais):
+                            res['versao_feed'] = publicador.publicar_tabela(tabela)
+                    return res
+                
+                try:
+                    st.session_state.tarefa_atual = gerenciador.submeter(
+                        st.session_state.logado, _analise,
+                        descricao=f"{len(ativos)} ativos · {inicio_str} → {fim_str}",
+                        parametros={'ativos': ativos, 'inicio': inicio_str, 'fim': fim_str,
+                                    'modo': modo_execucao, 'backend': backend, 'grade': grade,
+                                    'busca_podada': busca_podada,
+                                    'bootstrap': n_bootstrap if calcular_bootstrap else 0}
+                    )
+                    st.success(f"⏳ Analisando {len(ativos)} ativos de {inicio_str} a {fim_str} "
+                               f"({dias_uteis} dias úteis) em segundo plano")
+                except FilaCheia as e:
+                    st.error(f"🚦 {e}. Tente novamente quando uma análise terminar.")
+        
+        # ANÁLISES EM SEGUNDO PLANO (sobrevivem a reruns e reconexões)
+        res = None
+        minhas = gerenciador.listar(st.session_state.logado)
+        if minhas:
+            ids = [t['id'] for t in minhas]
+            atual = st.session_state.get('tarefa_atual')
+            escolhida = st.sidebar.selectbox(
+                "📂 Minhas análises", ids, index=ids.index(atual) if atual in ids else 0,
+                format_func=lambda i: next(f"{t['criada_em'][5:16].replace('T', ' ')} · {t['descricao']} · "
+                                           f"{ROTULOS_STATUS[t['status']]}" for t in minhas if t['id'] == i)
+            )
+            st.session_state.tarefa_atual = escolhida
+            estado = gerenciador.estado(escolhida)
+            if estado['status'] in ATIVAS:
+                acompanhar_tarefa(escolhida)
+            elif estado['status'] == CONCLUIDA:
+                res = resultado_tarefa(escolhida)
+                if res is None:
+                    st.warning("⚠️ Resultado desta análise não está mais disponível.")
+            elif estado['status'] == FALHOU:
+                st.error(f"❌ Análise falhou: {estado['erro']}")
+            else:
+                st.warning(f"{ROTULOS_STATUS[estado['status']]}: {estado['mensagem']}")
+        
+        if res is not None:
+            resultados_finais, relatorio_download = res['resultados'], res['relatorio_download']
+            tempos_gerais, texto_perfil = res['tempos_gerais'], res['texto_perfil']
+            inicio_str, fim_str = res['inicio'], res['fim']
+            for ticker, erro in res['erros'].items():
+                st.error(f"❌ Erro ao processar {ticker}: {erro}")
+            
+            with st.expander("📡 Downloads (latência e falhas por ativo)"):
+                st.dataframe(pd.DataFrame([{
+                    'Ticker': e['ticker'],
+                    'OK': "✅" if e['ok'] else "❌",
+                    'Latência (s)': f"{e['latencia_s']:.2f}",
+                    'Tentativas': e['tentativas'],
+                    'Falhas': e['falhas'],
+                    'Compartilhado': "🤝" if e.get('compartilhado') else "",
+                    'Erro': e['erro'] or ""
+                } for e in relatorio_download]), use_container_width=True)
+            
+            if not resultados_finais:
+                st.error("❌ Nenhum resultado válido")
+            else:
+                # RESULTADOS
+                st.success(f"✅ Análise concluída com sucesso! {len(resultados_finais)} ativos processados.")
+                st.caption(f"🔁 Iterações do otimizador (todos os candidatos): "
+                           f"{sum(r.get('iteracoes', 0) for r in resultados_finais)} · "
+                           f"ajustes reaproveitados do cache: "
+                           f"{sum(r.get('ajustes_do_cache', 0) for r in resultados_finais)}")
+                podas = [r['poda'] for r in resultados_finais if r.get('poda')]
+                if podas:
+                    st.caption(f"✂️ Busca podada: {sum(p['completos'] for p in podas)} ajustes completos e "
+                               f"{sum(p['triagem'] for p in podas)} de triagem · "
+                               f"{sum(p['evitados'] for p in podas)} de {sum(p['grade'] for p in podas)} "
+                               f"ajustes completos evitados")
                 
-                status_text.text("✅ Análise concluída!")
-                progress_bar.empty()
+                st.subheader("📊 Resultados dos Modelos")
                 
-                if not resultados_finais:
-                    st.error("❌ Nenhum resultado válido")
-                else:
-                    # RESULTADOS
-                    st.success(f"✅ Análise concluída com sucesso! {len(resultados_finais)} ativos processados.")
-                    
-                    st.subheader("📊 Resultados dos Modelos")
-                    
-                    df_resultados = []
-                    for r in resultados_finais:
-                        params = extrair_parametros(r['params'])
-                        status = "✅ EXCELENTE" if r['lb_p'] > 0.05 else "⚠️ BOM"
-                        
-                        # Interpretação
-                        regras = []
-                        if r['model_name'].startswith('EGARCH'):
-                            if params['omega'] < -0.5:
-                                regras.append("QUEDAS EXPLODEM VOL")
-                        if params['beta_total'] > 0.98:
-                            regras.append("VOL PERSISTENTE")
-                        if params['alpha_total'] > 0.20:
-                            regras.append("REAÇÃO FORTE")
-                        
-                        interp = " | ".join(regras) if regras else "Estável"
-                        
-                        df_resultados.append({
-                            'Ativo': r['ativo'],
-                            'Modelo': r['model_name'],
-                            'AIC': f"{r['aic']:.1f}",
-                            'LB p-val': f"{r['lb_p']:.3f}",
-                            'Ω (Omega)': f"{params['omega']:.6f}",
-                            'α (Alpha)': f"{params['alpha_total']:.6f}",
-                            'β (Beta)': f"{params['beta_total']:.6f}",
-                            'γ (Gamma)': f"{params['gamma']:.6f}",
-                            'Status': status,
-                            'Interpretação': interp
-                        })
-                    
-                    st.dataframe(pd.DataFrame(df_resultados), use_container_width=True)
+                df_resultados = []
+                for r in resultados_finais:
+                    params = extrair_parametros(r['params'])
+                    status = "✅ EXCELENTE" if r['lb_p'] > 0.05 else "⚠️ BOM"
                     
-                    # DOWNLOADS
-                    st.subheader("💾 Exportar Resultados")
+                    # Interpretação
+                    regras = []
+                    if r['model_name'].startswith('EGARCH'):
+                        if params['omega'] < -0.5:
+                            regras.append("QUEDAS EXPLODEM VOL")
+                    if params['beta_total'] > 0.98:
+                        regras.append("VOL PERSISTENTE")
+                    if params['alpha_total'] > 0.20:
+                        regras.append("REAÇÃO FORTE")
                     
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # TXT COMPLETO (IGUAL AO JUPYTER)
-                        txt_completo = gerar_relatorio_txt_completo(resultados_finais, inicio_str, fim_str, dias_corridos, dias_uteis)
-                        st.download_button(
-                            label="📄 Download Relatório TXT COMPLETO",
-                            data=txt_completo,
-                            file_name=f"ANALISE_GARCH_PRO_{datetime.now().strftime('%Y-%m-%d')}.txt",
-                            mime="text/plain",
-                            use_container_width=True
-                        )
+                    interp = " | ".join(regras) if regras else "Estável"
                     
-                    with col2:
-                        # CSV MT5
-                        df_csv = gerar_csv_mt5(resultados_finais)
+                    df_resultados.append({
+                        'Ativo': r['ativo'],
+                        'Modelo': r['model_name'],
+                        'AIC': f"{r['aic']:.1f}",
+                        'LB p-val': f"{r['lb_p']:.3f}",
+                        'Ω (Omega)': f"{params['omega']:.6f}",
+                        'α (Alpha)': f"{params['alpha_total']:.6f}",
+                        'β (Beta)': f"{params['beta_total']:.6f}",
+                        'γ (Gamma)': f"{params['gamma']:.6f}",
+                        'Status': status,
+                        'Interpretação': interp
+                    })
+                
+                st.dataframe(pd.DataFrame(df_resultados), use_container_width=True)
+                
+                # INCERTEZA DOS PARÂMETROS (BOOTSTRAP)
+                if res.get('bootstrap'):
+                    r0 = res['bootstrap'][0]
+                    st.subheader("🎲 Incerteza dos Parâmetros (bootstrap)")
+                    st.caption(f"{'Paramétrico' if r0['metodo'] == 'parametrico' else 'Em blocos'} · "
+                               f"B = {r0['B_pedido']} · IC {r0['nivel']:.0%} · P = fração das réplicas em que a "
+                               f"regra dispara (* = dispara na estimativa pontual; ↓ = parada antecipada)")
+                    st.dataframe(visao_bootstrap(res['bootstrap']), hide_index=True, use_container_width=True)
+                    st.download_button(
+                        label="🎲 Download ICs do bootstrap (CSV)",
+                        data=tabela_bootstrap(res['bootstrap']).to_csv(index=False, sep=';', encoding='utf-8-sig',
+                                                                       float_format='%.6g'),
+                        file_name=f"BOOTSTRAP-GARCH-{datetime.now().strftime('%Y-%m-%d')}.csv",
+                        mime="text/csv"
+                    )
+                
+                # GRÁFICOS (vencedor de cada ativo, séries já reduzidas no analyzer)
+                with st.expander("📈 Volatilidade Condicional (modelo vencedor)"):
+                    com_grafico = [r for r in resultados_finais if 'vol_condicional' in r]
+                    colunas = st.columns(2)
+                    for i, r in enumerate(com_grafico):
+                        with colunas[i % 2]:
+                            st.image(grafico_vol_png(
+                                r['ticker'], r['model_name'], f"{inicio_str}→{fim_str}",
+                                {"Vol Condicional": r['vol_condicional'] * np.sqrt(252)},
+                                r['vol_longo_prazo'] * np.sqrt(252), f"{r['model_name']} - {r['ticker']}",
+                                ylabel="Volatilidade anualizada", tamanho=(8, 4)
+                            ))
+                
+                # CORRELAÇÃO DINÂMICA (DCC)
+                dcc = res['dcc']
+                if res['dcc_erro']:
+                    st.warning(f"⚠️ DCC não calculado: {res['dcc_erro']}")
+                if dcc is not None:
+                    from dcc import exportar_correlacao
+                    st.subheader("🔗 Correlação Dinâmica (DCC)")
+                    st.caption(f"a = {dcc.a:.4f} · b = {dcc.b:.4f} · {len(dcc.ativos)} ativos · "
+                               f"matriz prevista para o próximo pregão")
+                    st.dataframe(dcc.correlacao_df().style.format("{:.3f}"), use_container_width=True)
+                
+                # DOWNLOADS
+                st.subheader("💾 Exportar Resultados")
+                
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    # TXT COMPLETO (IGUAL AO JUPYTER)
+                    st.download_button(
+                        label="📄 Download Relatório TXT COMPLETO",
+                        data=res['txt'],
+                        file_name=f"ANALISE_GARCH_PRO_{datetime.now().strftime('%Y-%m-%d')}.txt",
+                        mime="text/plain",
+                        use_container_width=True
+                    )
+                
+                with col2:
+                    # CSV MT5
+                    st.download_button(
+                        label="📊 Download CSV para MT5",
+                        data=res['csv'],
+                        file_name=f"PARAMETROS-MT5-{datetime.now().strftime('%Y-%m-%d')}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
+                
+                with col3:
+                    # MATRIZ DE CORRELAÇÃO (ao lado do CSV do MT5)
+                    if dcc is not None:
                         st.download_button(
-                            label="📊 Download CSV para MT5",
-                            data=df_csv.to_csv(index=False, sep=';', encoding='utf-8-sig'),
-                            file_name=f"PARAMETROS-MT5-{datetime.now().strftime('%Y-%m-%d')}.csv",
+                            label="🔗 Download Correlação DCC",
+                            data=exportar_correlacao(dcc),
+                            file_name=f"CORRELACAO-MT5-{datetime.now().strftime('%Y-%m-%d')}.csv",
                             mime="text/csv",
                             use_container_width=True
                         )
+                
+                with col4:
+                    # PARQUET (todos os candidatos, não só os vencedores)
+                    st.download_button(
+                        label="📦 Parquet (todos os candidatos)",
+                        data=res['parquet'],
+                        file_name=f"CANDIDATOS-GARCH-{datetime.now().strftime('%Y-%m-%d')}.parquet",
+                        mime="application/octet-stream",
+                        use_container_width=True
+                    )
+                if res.get('versao_feed'):
+                    st.caption(f"📡 Vencedores publicados no feed local do MT5 (versão {res['versao_feed']})")
+                
+                # EXPLICAÇÃO
+                with st.expander("📖 Entenda os Parâmetros"):
+                    st.markdown("""
+                    ### 📐 Parâmetros do Modelo
                     
-                    # EXPLICAÇÃO
-                    with st.expander("📖 Entenda os Parâmetros"):
-                        st.markdown("""
-                        ### 📐 Parâmetros do Modelo
-                        
-                        **Ω (Omega)** - Volatilidade de longo prazo
-                        - GARCH/GJR: sempre positivo
-                        - EGARCH: pode ser negativo → quedas aumentam vol mais que subidas
-                        
-                        **α (Alpha)** - Impacto de choques recentes
-                        - α alto → volatilidade reage forte a eventos
-                        - Ex: α = 0.341 → 34.1% do choque entra na vol
-                        
-                        **β (Beta)** - Persistência da volatilidade
-                        - β próximo de 1 → vol dura muito tempo
-                        - Ex: β = 0.991 → vol persiste por semanas
-                        
-                        **γ (Gamma)** - Assimetria (efeito alavancagem)
-                        - γ > 0 → más notícias aumentam vol mais que boas
-                        - Presente em: EGARCH e GJR-GARCH
-                        
-                        ### 📊 Critérios de Seleção
-                        
-                        **AIC** (Akaike Information Criterion)
-                        - Quanto MENOR, MELHOR o modelo
-                        - Penaliza complexidade para evitar overfitting
-                        
-                        **LB p-val** (Ljung-Box p-value)
-                        - p-val > 0.05 → modelo válido ✅
-                        - p-val < 0.05 → resíduos com padrão ❌
-                        """)
+                    **Ω (Omega)** - Volatilidade de longo prazo
+                    - GARCH/GJR: sempre positivo
+                    - EGARCH: pode ser negativo → quedas aumentam vol mais que subidas
+                    
+                    **α (Alpha)** - Impacto de choques recentes
+                    - α alto → volatilidade reage forte a eventos
+                    - Ex: α = 0.341 → 34.1% do choque entra na vol
+                    
+                    **β (Beta)** - Persistência da volatilidade
+                    - β próximo de 1 → vol dura muito tempo
+                    - Ex: β = 0.991 → vol persiste por semanas
+                    
+                    **γ (Gamma)** - Assimetria (efeito alavancagem)
+                    - γ > 0 → más notícias aumentam vol mais que boas
+                    - Presente em: EGARCH e GJR-GARCH
+                    
+                    ### 📊 Critérios de Seleção
+                    
+                    **AIC** (Akaike Information Criterion)
+                    - Quanto MENOR, MELHOR o modelo
+                    - Penaliza complexidade para evitar overfitting
+                    
+                    **LB p-val** (Ljung-Box p-value)
+                    - p-val > 0.05 → modelo válido ✅
+                    - p-val < 0.05 → resíduos com padrão ❌
+                    """)
+            
+            # PERFORMANCE
+            if painel_performance:
+                registros_perf = registros_execucao(resultados_finais, relatorio_download, tempos_gerais)
+                with st.expander("⏱️ Performance", expanded=True):
+                    st.markdown("**Tempo por etapa** (ajustes somados entre tickers; no modo paralelo rodam ao mesmo tempo)")
+                    st.dataframe(resumo_por_etapa(registros_perf), use_container_width=True)
+                    df_perf = pd.DataFrame(registros_perf)
+                    por_ticker = df_perf[df_perf['ticker'].notna()].pivot_table(
+                        index='ticker', columns='etapa', values='segundos', aggfunc='sum', fill_value=0.0)
+                    if not por_ticker.empty:
+                        st.markdown("**Por ticker (s)**")
+                        st.dataframe(por_ticker, use_container_width=True)
+                    st.markdown("**Registros**")
+                    st.dataframe(df_perf, use_container_width=True)
+                    st.download_button(
+                        label="📥 Exportar métricas (JSON lines)",
+                        data=para_jsonl(registros_perf),
+                        file_name=f"PERFORMANCE-{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.jsonl",
+                        mime="application/jsonl"
+                    )
+                    if texto_perfil:
+                        st.markdown("**cProfile** (processo principal, ordenado por tempo acumulado)")
+                        st.code(texto_perfil)
+                        st.download_button("📥 Baixar cProfile", texto_perfil, "perfil_analyzer.txt")
     
     # FOOTER
     st.divider()
@@ -0,0 +1,237 @@
+"""
+ASUS GARCH PRO 2025 - ATUALIZAÇÃO INCREMENTAL DIÁRIA
+Para o feed diário do MT5: em vez de reajustar os seis modelos de
+MODELOS_ANALYZER na janela inteira a cada novo retorno, o estado de cada
+ticker do universo (parâmetros do vencedor + fim da recursão) fica salvo e
+só os dias novos passam pela recursão (previsao.atualizar_estado). A
+seleção completa (selecionar_melhor_modelo) roda apenas quando:
+  - novo               → ticker sem estado salvo;
+  - historico_alterado → retornos já vistos (os últimos do ajuste e todos os
+                         posteriores) mudaram na série atual (ajuste de
+                         proventos, correção de dados);
+  - deriva_loglik      → a log-verossimilhança dos dias desde o ajuste caiu
+                         mais de LIMIAR_Z_LOGLIK desvios abaixo da média
+                         dentro da amostra;
+  - instabilidade      → CUSUM de z² - 1 desde o ajuste, normalizado pela
+                         variância de z² dentro da amostra, fora da banda
+                         LIMIAR_CUSUM: os parâmetros não descrevem mais a
+                         variância observada. Com os padrões (teste do 5º ao
+                         20º dia), a taxa de alarme falso é ≈1,3-2% por
+                         dia e ≈4,5% por ciclo de ajuste (simulado com
+                         erros normais);
+  - idade_maxima       → MAX_DIAS_SEM_REAJUSTE pregões desde o último ajuste;
+  - forcado            → pedido explícito.
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import motor_garch
+from analyzer import (
+    iterar_downloads, calcular_retornos, selecionar_melhor_modelo, montar_resultado, TICKER_MAP,
+    MODELOS_ANALYZER
+)
+from grade_modelos import PARAMS_DIST
+from previsao import atualizar_estado, dist_parametros
+
+ESTADO_INCREMENTAL_FILE = "estado_incremental.json"
+LIMIAR_Z_LOGLIK = -3.0
+LIMIAR_CUSUM = 2.81        # P(sup|W| > 2.81) ≈ 1% assintótico; repetido a cada dia → ≈4,5% por ciclo
+VAR_Z2_NORMAL = 2.0        # variância de z² com erros normais (registros sem 'z2_var')
+MIN_DIAS_TESTE = 5         # dias novos mínimos para os testes de deriva
+MAX_DIAS_SEM_REAJUSTE = 21
+N_CONFERENCIA = 5          # retornos do fim da janela de ajuste conferidos a cada atualização
+LOG_2PI = np.log(2 * np.pi)
+
+MOTIVOS = {
+    'novo': "sem estado salvo",
+    'historico_alterado': "histórico de preços mudou",
+    'deriva_loglik': "log-verossimilhança caiu",
+    'instabilidade': "CUSUM de z² fora da banda",
+    'idade_maxima': "idade máxima do ajuste",
+    'forcado': "reajuste forçado",
+}
+
+# ==================== ESTADO SALVO ====================
+def carregar_estado(arquivo=ESTADO_INCREMENTAL_FILE):
+    """{ticker: registro} do universo salvo ({} se não existe)"""
+    if os.path.exists(arquivo):
+        try:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+def salvar_estado(estado, arquivo=ESTADO_INCREMENTAL_FILE):
+    tmp = arquivo + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, arquivo)
+
+def _loglik_por_dia(eps, sigma2):
+    return -0.5 * (LOG_2PI + np.log(sigma2) + eps ** 2 / sigma2)
+
+def registro_ajuste(resultado, retornos):
+    """Registro JSON de um ajuste completo (saída de montar_resultado com retornos)"""
+    params = resultado['params']
+    e = resultado['estado_previsao']
+    sigma2 = motor_garch.volatilidade_condicional(retornos, e['vol'], params).values ** 2
+    eps = retornos.values - params['mu']
+    ll = _loglik_por_dia(eps, sigma2)
+    return {
+        'model_name': resultado['model_name'],
+        'aic': float(resultado['aic']),
+        'lb_p': float(resultado['lb_p']),
+        'params': {k: float(v) for k, v in params.items()},
+        'estado': {'vol': e['vol'], 'p': e['p'], 'o': e['o'], 'q': e['q'], 'theta': e['theta'].tolist(),
+                   'dist': e['dist'], 'params_dist': e['params_dist'].tolist(),
+                   'eps': e['eps'].tolist(), 'sigma2': e['sigma2'].tolist()},
+        'ultima_data': retornos.index[-1].strftime('%Y-%m-%d'),
+        'conferencia': _conferencia(retornos.iloc[-N_CONFERENCIA:]),
+        'data_ajuste': retornos.index[-1].strftime('%Y-%m-%d'),
+        'll_media': float(np.mean(ll)),
+        'll_dp': float(np.std(ll)),
+        'z2_var': float(np.var(eps ** 2 / sigma2)),
+        'z_desde_ajuste': [],
+        'll_desde_ajuste': [],
+    }
+
+def _conferencia(retornos):
+    return [[d.strftime('%Y-%m-%d'), float(v)] for d, v in retornos.items()]
+
+def _estado_previsao(registro, ticker):
+    e = registro['estado']
+    if 'dist' not in e:  # registro anterior à distribuição no estado
+        dist = dist_parametros(pd.Series(registro['params']))
+        e = dict(e, dist=dist, params_dist=[registro['params'][n] for n in PARAMS_DIST[dist]])
+    return dict(e, ticker=ticker, theta=np.array(e['theta']), params_dist=np.array(e['params_dist'], dtype=float),
+                eps=np.array(e['eps']), sigma2=np.array(e['sigma2']))
+
+def resultado_do_registro(ticker, registro):
+    """Resultado no formato de montar_resultado (sem candidatos) a partir do estado salvo"""
+    params = pd.Series(registro['params'])
+    vol = registro['estado']['vol']
+    return {
+        'ativo': TICKER_MAP.get(ticker, ticker.replace('=X', '').replace('=F', '')),
+        'ticker': ticker,
+        'model_name': registro['model_name'],
+        'aic': registro['aic'],
+        'lb_p': registro['lb_p'],
+        'params': params,
+        'estado_previsao': _estado_previsao(registro, ticker),
+        'vol_longo_prazo': np.sqrt(motor_garch.variancia_longo_prazo(vol, params)),
+    }
+
+# ==================== TESTES DE DERIVA ====================
+def testar_deriva(registro, max_dias=MAX_DIAS_SEM_REAJUSTE):
+    """(motivo ou None, z da log-verossimilhança, estatística CUSUM) dos dias desde o ajuste"""
+    z = np.asarray(registro['z_desde_ajuste'], dtype=float)
+    ll = np.asarray(registro['ll_desde_ajuste'], dtype=float)
+    n = len(z)
+    if n < MIN_DIAS_TESTE:
+        z_ll = cusum = np.nan
+    else:
+        z_ll = (ll.sum() - n * registro['ll_media']) / (np.sqrt(n) * registro['ll_dp'])
+        # Sob o modelo, z² - 1 tem média 0; a variância é a de z² na amostra do ajuste
+        # (2 só com erros normais; maior com caudas pesadas)
+        cusum = np.max(np.abs(np.cumsum(z ** 2 - 1))) / np.sqrt(registro.get('z2_var', VAR_Z2_NORMAL) * n)
+    if n >= max_dias:
+        return 'idade_maxima', z_ll, cusum
+    if z_ll < LIMIAR_Z_LOGLIK:
+        return 'deriva_loglik', z_ll, cusum
+    if cusum > LIMIAR_CUSUM:
+        return 'instabilidade', z_ll, cusum
+    return None, z_ll, cusum
+
+def avancar_registro(registro, retornos):
+    """
+    Passa os retornos posteriores a 'ultima_data' pela recursão do vencedor.
+    Retorna (registro novo, nº de dias novos) ou (None, 0) se algum retorno
+    da conferência mudou ou sumiu da série.
+    """
+    datas = pd.DatetimeIndex([d for d, _ in registro['conferencia']])
+    if not datas.isin(retornos.index).all() or not np.allclose(
+            retornos.loc[datas].values, [v for _, v in registro['conferencia']], rtol=1e-9, atol=1e-12):
+        return None, 0
+    ultima = pd.Timestamp(registro['ultima_data'])
+    novos = retornos[retornos.index > ultima]
+    if novos.empty:
+        return registro, 0
+    estado, s2, z = atualizar_estado(_estado_previsao(registro, ""), novos.values)
+    eps = z * np.sqrt(s2)
+    novo = dict(registro,
+                estado=dict(registro['estado'], eps=estado['eps'].tolist(), sigma2=estado['sigma2'].tolist()),
+                ultima_data=novos.index[-1].strftime('%Y-%m-%d'),
+                conferencia=registro['conferencia'] + _conferencia(novos),
+                z_desde_ajuste=registro['z_desde_ajuste'] + z.tolist(),
+                ll_desde_ajuste=registro['ll_desde_ajuste'] + _loglik_por_dia(eps, s2).tolist())
+    return novo, len(novos)
+
+# ==================== UNIVERSO ====================
+def atualizar_universo(tickers, inicio, fim, cache=None, arquivo=ESTADO_INCREMENTAL_FILE, backend="arch",
+                       cache_ajustes=None, max_dias=MAX_DIAS_SEM_REAJUSTE, forcar=False,
+                       max_downloads=8, ao_progredir=None, modelos=MODELOS_ANALYZER, busca=None):
+    """
+    Atualização diária de `tickers`. Com `cache` (CachePrecos), só as datas
+    novas são baixadas. Retorna (resultados na ordem de `tickers`,
+    {ticker: erro}, relatório [{ticker, acao, motivo, dias_novos,
+    dias_desde_ajuste, z_loglik, cusum, modelo_anterior, modelo}]).
+    O estado de `arquivo` é regravado no fim. modelos/busca são repassados a
+    selecionar_melhor_modelo nos reajustes.
+    """
+    estado = carregar_estado(arquivo)
+    resultados, erros, relatorio = {}, {}, []
+    for i, (ticker, precos, erro, _) in enumerate(
+            iterar_downloads(tickers, inicio, fim, cache, max_concorrencia=max_downloads), 1):
+        try:
+            if erro is not None:
+                raise erro
+            retornos = calcular_retornos(precos)
+            anterior = estado.get(ticker)
+            registro, dias_novos = (avancar_registro(anterior, retornos) if anterior else (None, 0))
+            z_ll = cusum = np.nan
+            if forcar:
+                motivo = 'forcado'
+            elif anterior is None:
+                motivo = 'novo'
+            elif registro is None:
+                motivo = 'historico_alterado'
+            else:
+                motivo, z_ll, cusum = testar_deriva(registro, max_dias)
+            linha = {'ticker': ticker, 'dias_novos': dias_novos,
+                     'dias_desde_ajuste': len(registro['z_desde_ajuste']) if registro else 0,
+                     'z_loglik': z_ll, 'cusum': cusum,
+                     'modelo_anterior': anterior['model_name'] if anterior else ""}
+            if motivo is None:
+                estado[ticker] = registro
+                resultados[ticker] = resultado_do_registro(ticker, registro)
+                linha.update(acao='atualizado', motivo="")
+            else:
+                melhor, todos = selecionar_melhor_modelo(retornos, ticker, backend, cache_ajustes=cache_ajustes,
+                                                         modelos=modelos, busca=busca)
+                resultados[ticker] = montar_resultado(ticker, melhor, todos, retornos)
+                estado[ticker] = registro_ajuste(resultados[ticker], retornos)
+                linha.update(acao='reajustado', motivo=motivo)
+            linha['modelo'] = resultados[ticker]['model_name']
+            relatorio.append(linha)
+        except Exception as e:
+            erros[ticker] = e
+            relatorio.append({'ticker': ticker, 'acao': 'erro', 'motivo': str(e)})
+        if ao_progredir:
+            ao_progredir(ticker, i, len(tickers), erros.get(ticker))
+
+    salvar_estado(estado, arquivo)
+    ordem = {t: k for k, t in enumerate(tickers)}
+    relatorio.sort(key=lambda l: ordem[l['ticker']])
+    return [resultados[t] for t in tickers if t in resultados], erros, relatorio
+
+def resumo_atualizacao(relatorio):
+    """{'atualizado': n, 'reajustado': n, 'erro': n} e {motivo: n} dos reajustes"""
+    acoes, motivos = {}, {}
+    for linha in relatorio:
+        acoes[linha['acao']] = acoes.get(linha['acao'], 0) + 1
+        if linha['acao'] == 'reajustado':
+            motivos[linha['motivo']] = motivos.get(linha['motivo'], 0) + 1
+    return acoes, motivos
@@ -0,0 +1,259 @@
+"""
+ASUS GARCH PRO 2025 - BACKTEST WALK-FORWARD DE VOLATILIDADE
+Reajusta os modelos da grade numa janela móvel só a cada N dias (ou quando
+os resíduos padronizados indicam deriva) e, entre reajustes, só filtra a
+variância condicional com os parâmetros fixos — O(1) por dia. Mede a perda
+das previsões de 1 passo e a economia frente a reajustar todo dia.
+"""
+
+import argparse
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+from analyzer import (
+    ajustar_modelo, calcular_retornos, baixar_dados, MODELOS_ANALYZER, BACKENDS_AJUSTE
+)
+from cache_precos import CachePrecos
+from grade_modelos import dist_modelo, PARAMS_DIST
+from previsao import quantil_padronizado
+
+Z_VAR95 = 1.6448536269514722  # quantil normal de 95%
+ABS_Z_NORMAL = np.sqrt(2 / np.pi)  # E|z| para z ~ N(0, 1)
+
+# ==================== FILTRO DE VARIÂNCIA (PARÂMETROS FIXOS) ====================
+def backcast(resid):
+    """Variância inicial como no arch: média exponencial (0.94) dos primeiros 75 resíduos²"""
+    e2 = np.asarray(resid[:75], dtype=float) ** 2
+    w = 0.94 ** np.arange(len(e2))
+    return float(np.sum(w * e2) / np.sum(w))
+
+class FiltroVariancia:
+    """
+    Recursão GARCH/GJR/EGARCH(p,o,q) com parâmetros fixos (layout do arch).
+    `s2` é a variância prevista para o próximo retorno; atualizar(r) custa
+    O(p + o + q) e não depende do tamanho do histórico.
+    """
+
+    def __init__(self, params, vol_type, p, o, q):
+        self.egarch = vol_type.upper() == 'EGARCH'
+        self.mu = float(params.get('mu', 0.0))
+        self.omega = float(params['omega'])
+        self.alpha = np.array([params[f'alpha[{i}]'] for i in range(1, p + 1)], dtype=float)
+        self.gamma = np.array([params[f'gamma[{i}]'] for i in range(1, o + 1)], dtype=float)
+        self.beta = np.array([params[f'beta[{i}]'] for i in range(1, q + 1)], dtype=float)
+        self.s2 = None
+
+    def iniciar(self, retornos):
+        """Roda o filtro sobre a janela de ajuste (uma vez por reajuste)"""
+        r = np.asarray(retornos, dtype=float)
+        bc = backcast(r - self.mu)
+        n_e = max(len(self.alpha), len(self.gamma), 1)
+        n_s = max(len(self.beta), 1)
+        if self.egarch:
+            # Histórico "neutro": |z| = E|z|, z = 0, ln σ² = ln backcast
+            self._abs_z = deque([ABS_Z_NORMAL] * n_e, maxlen=n_e)
+            self._z = deque([0.0] * n_e, maxlen=n_e)
+            self._ln_s2 = deque([np.log(bc)] * n_s, maxlen=n_s)
+        else:
+            # e² = backcast e metade dos choques negativos (como o arch)
+            self._e2 = deque([bc] * n_e, maxlen=n_e)
+            self._neg = deque([0.5 * bc] * n_e, maxlen=n_e)
+            self._hist_s2 = deque([bc] * n_s, maxlen=n_s)
+        self.s2 = self._proxima()
+        for x in r:
+            self.atualizar(x)
+        return self.s2
+
+    def _soma(self, coef, hist):
+        return sum(c * h for c, h in zip(coef, hist))
+
+    def _proxima(self):
+        if self.egarch:
+            ln_s2 = (self.omega + self._soma(self.alpha, (a - ABS_Z_NORMAL for a in self._abs_z))
+                     + self._soma(self.gamma, self._z) + self._soma(self.beta, self._ln_s2))
+            return float(np.exp(min(ln_s2, 700.0)))
+        return float(self.omega + self._soma(self.alpha, self._e2)
+                     + self._soma(self.gamma, self._neg) + self._soma(self.beta, self._hist_s2))
+
+    def atualizar(self, r):
+        """Incorpora o retorno observado e devolve a variância prevista para o seguinte"""
+        e = r - self.mu
+        if self.egarch:
+            z = e / np.sqrt(self.s2)
+            self._abs_z.appendleft(abs(z))
+            self._z.appendleft(z)
+            self._ln_s2.appendleft(np.log(self.s2))
+        else:
+            self._e2.appendleft(e * e)
+            self._neg.appendleft(e * e if e < 0 else 0.0)
+            self._hist_s2.appendleft(self.s2)
+        self.s2 = self._proxima()
+        return self.s2
+
+# ==================== WALK-FORWARD ====================
+def _perdas(r, s2, quantil5=-Z_VAR95):
+    """
+    QLIKE, MSE da variância, MAE da vol (proxy |r|) e violações do VaR 95%.
+    `quantil5` é o quantil de 5% dos erros padronizados (por dia ou um só).
+    """
+    r, s2, quantil5 = np.asarray(r), np.asarray(s2), np.asarray(quantil5)
+    return {
+        'qlike': float(np.mean(np.log(s2) + r ** 2 / s2)),
+        'mse_var': float(np.mean((r ** 2 - s2) ** 2)),
+        'mae_vol': float(np.mean(np.abs(np.abs(r) - np.sqrt(s2)))),
+        'viol_var95': float(np.mean(r < quantil5 * np.sqrt(s2))),
+    }
+
+def backtest_modelo(retornos, vol, p, o, q, janela=1000, refit_a_cada=20, limiar_deriva=None,
+                    janela_deriva=20, backend="arch", warm_start=True, dist='normal'):
+    """
+    Walk-forward de um modelo. No dia t a previsão usa só dados até t-1.
+    Reajusta na janela [t-janela, t) a cada `refit_a_cada` dias (None = só
+    por deriva) ou quando a média de z² nos últimos `janela_deriva` dias se
+    afasta de 1 mais que `limiar_deriva`. `dist` é a distribuição dos erros
+    no ajuste; o VaR 95% usa o quantil dela com os parâmetros do último
+    ajuste. Depois de um ajuste que falha, a próxima tentativa espera
+    `refit_a_cada` dias (só deriva: `janela_deriva`). Retorna (métricas,
+    pd.Series de variâncias previstas).
+    """
+    r = np.asarray(retornos, dtype=float)
+    index = getattr(retornos, 'index', None)
+    n = len(r)
+    if n <= janela:
+        raise ValueError(f"Série com {n} pontos não cobre a janela de {janela}")
+
+    previsoes = np.full(n, np.nan)
+    quantis5 = np.full(n, np.nan)
+    quantil5 = -Z_VAR95
+    espera_falha = refit_a_cada or janela_deriva
+    filtro, params = None, None
+    refits = refits_deriva = falhas = 0
+    tempo_ajustes = tempo_filtro = 0.0
+    desde_refit = 0
+    z2_recentes, soma_z2 = deque(), 0.0
+    variacao_params = []
+
+    for t in range(janela, n):
+        motivo = None
+        if filtro is None:
+            if not falhas or desde_refit >= espera_falha:
+                motivo = 'agenda'
+        elif refit_a_cada and desde_refit >= refit_a_cada:
+            motivo = 'agenda'
+        elif (limiar_deriva is not None and len(z2_recentes) == janela_deriva
+              and abs(soma_z2 / janela_deriva - 1) > limiar_deriva):
+            motivo = 'deriva'
+
+        if motivo:
+            t0 = time.perf_counter()
+            amostra = pd.Series(r[t - janela:t])
+            sv = params.values if (warm_start and params is not None) else None
+            res = ajustar_modelo(amostra, vol, p, o, q, backend, sv, dist=dist)
+            tempo_ajustes += time.perf_counter() - t0
+            if res['success']:
+                if params is not None:
+                    variacao_params.append(float(np.max(np.abs(res['params'].values - params.values))))
+                params = res['params']
+                if dist != 'normal':
+                    quantil5 = float(quantil_padronizado(0.05, dist, params[PARAMS_DIST[dist]].values))
+                t0 = time.perf_counter()
+                filtro = FiltroVariancia(params, vol, p, o, q)
+                filtro.iniciar(amostra.values)
+                tempo_ajustes += time.perf_counter() - t0
+                refits += 1
+                refits_deriva += motivo == 'deriva'
+                desde_refit = 0
+                z2_recentes.clear()
+                soma_z2 = 0.0
+            else:
+                falhas += 1
+                # Espera a próxima agenda (ou uma janela de deriva nova) antes de tentar de novo
+                desde_refit = 0
+                z2_recentes.clear()
+                soma_z2 = 0.0
+        desde_refit += 1
+        if filtro is None:
+            continue
+
+        t0 = time.perf_counter()
+        s2 = filtro.s2
+        previsoes[t] = s2
+        quantis5[t] = quantil5
+        z2 = (r[t] - filtro.mu) ** 2 / s2
+        z2_recentes.append(z2)
+        soma_z2 += z2
+        if len(z2_recentes) > janela_deriva:
+            soma_z2 -= z2_recentes.popleft()
+        filtro.atualizar(r[t])
+        tempo_filtro += time.perf_counter() - t0
+
+    validos = ~np.isnan(previsoes)
+    dias = int(validos.sum())
+    metricas = _perdas(r[validos], previsoes[validos], quantis5[validos]) if dias else {}
+    tentativas = refits + falhas
+    tempo_medio = tempo_ajustes / tentativas if tentativas else 0.0
+    # Reajuste diário = uma estimação por dia fora da amostra
+    metricas.update({
+        'dias': dias,
+        'refits': refits,
+        'refits_deriva': refits_deriva,
+        'falhas_ajuste': falhas,
+        'ajustes_evitados': (n - janela) - tentativas,
+        'ajustes_evitados_pct': 100.0 * (1 - tentativas / (n - janela)),
+        'tempo_ajustes_s': tempo_ajustes,
+        'tempo_filtro_s': tempo_filtro,
+        'tempo_diario_estimado_s': tempo_medio * (n - janela),
+        'economia_estimada_s': tempo_medio * (n - janela) - tempo_ajustes - tempo_filtro,
+        'variacao_params_media': float(np.mean(variacao_params)) if variacao_params else np.nan,
+    })
+    return metricas, pd.Series(previsoes, index=index, name='variancia_prevista')
+
+def backtest_walk_forward(retornos, modelos=MODELOS_ANALYZER, janela=1000, refit_a_cada=20,
+                          limiar_deriva=None, janela_deriva=20, backend="arch", warm_start=True):
+    """Walk-forward de toda a grade; retorna (DataFrame de métricas por modelo, {modelo: previsões})"""
+    linhas, previsoes = [], {}
+    for modelo in modelos:
+        vol, p, o, q, nome = modelo[:5]
+        metricas, prev = backtest_modelo(retornos, vol, p, o, q, janela, refit_a_cada,
+                                         limiar_deriva, janela_deriva, backend, warm_start,
+                                         dist=dist_modelo(modelo))
+        linhas.append(dict({'modelo': nome}, **metricas))
+        previsoes[nome] = prev
+    return pd.DataFrame(linhas).sort_values('qlike').reset_index(drop=True), previsoes
+
+def backtest_ativo(ticker, inicio, fim, cache=None, **kwargs):
+    """Download + retornos + walk-forward de um ticker"""
+    retornos = calcular_retornos(baixar_dados(ticker, inicio, fim, cache))
+    return backtest_walk_forward(retornos, **kwargs)
+
+# ==================== LINHA DE COMANDO ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest walk-forward de volatilidade")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--inicio", required=True)
+    parser.add_argument("--fim", required=True)
+    parser.add_argument("--janela", type=int, default=1000, help="dias na janela de ajuste")
+    parser.add_argument("--refit", type=int, default=20, help="reajusta a cada N dias (0 = só deriva)")
+    parser.add_argument("--deriva", type=float, default=None,
+                        help="limiar |média(z²) - 1| que força reajuste")
+    parser.add_argument("--janela-deriva", type=int, default=20)
+    parser.add_argument("--backend", choices=BACKENDS_AJUSTE, default="arch")
+    parser.add_argument("--sem-cache", action="store_true")
+    parser.add_argument("--saida", help="CSV com as métricas de todos os tickers")
+    args = parser.parse_args(argv)
+
+    cache = None if args.sem_cache else CachePrecos()
+    tabelas = []
+    for ticker in args.tickers:
+        metricas, _ = backtest_ativo(ticker, args.inicio, args.fim, cache, janela=args.janela,
+                                     refit_a_cada=args.refit or None, limiar_deriva=args.deriva,
+                                     janela_deriva=args.janela_deriva, backend=args.backend)
+        metricas.insert(0, 'ticker', ticker)
+        tabelas.append(metricas)
+        print(metricas.to_string(index=False))
+    if args.saida:
+        pd.concat(tabelas).to_csv(args.saida, index=False, sep=';')
+
+if __name__ == "__main__":
+    main()
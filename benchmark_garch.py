@@ -0,0 +1,513 @@
+"""
+ASUS GARCH PRO 2025 - BENCHMARK
+Mede o tempo de cada etapa do Analyzer com séries GARCH/GJR/EGARCH sintéticas
+(parâmetros conhecidos, 500 a 50k pontos) e do Analyzer completo para N
+tickers — tudo offline. Mede também o início a frio: tempo de import de cada
+dependência pesada e a tela de login do app (que não pode carregá-las).
+Grava um JSON com os tempos e falha (código 1) se algum limite configurado
+for ultrapassado.
+
+Uso:
+    python benchmark_garch.py --saida bench.json
+    python benchmark_garch.py --baseline bench_anterior.json --tolerancia 1.3
+    python benchmark_garch.py --limites bench_limites.json --rapido
+    python benchmark_garch.py --so-inicializacao
+"""
+
+import argparse
+import fnmatch
+import http.client
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+import zlib
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import arch
+import scipy
+import statsmodels
+import motor_garch
+from analyzer import (
+    ajustar_modelo, ljung_box_test, ljung_box_candidatos, selecionar_melhor_modelo, gerar_relatorio_txt_completo,
+    executar_analyzer, montar_resultado, BACKENDS_AJUSTE, GRADES, BuscaPodada
+)
+from cache_precos import CachePrecos
+from dcc import simular_dcc, ajustar_dcc
+from tabela_candidatos import construir_tabela, visao_linhas_relatorio, gravar_parquet
+from publicador_mt5 import PublicadorParametros, LeitorSnapshot, ServidorParametros
+from intradiario import ArmazemIntradiario, simular_intradiario, analisar_intradiario
+from bootstrap_parametros import especificacoes, executar_bootstrap
+
+TAMANHOS_PADRAO = (500, 2000, 10000, 50000)
+TOLERANCIA_AIC_WARM = 1e-2  # warm start não pode terminar com AIC pior que a partida fria (pontos de AIC)
+
+# Não podem aparecer em sys.modules depois de renderizar a tela de login
+MODULOS_PESADOS = ('numpy', 'pandas', 'scipy', 'pyarrow', 'arch', 'statsmodels', 'matplotlib', 'yfinance')
+# Import isolado (interpretador novo) de cada um, com -X importtime
+IMPORTS_MEDIDOS = ('streamlit', 'numpy', 'pandas', 'scipy.optimize', 'pyarrow.parquet', 'yfinance',
+                   'arch', 'statsmodels.stats.diagnostic', 'matplotlib.pyplot', 'analyzer')
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Processo gerador → (simulador, parâmetros verdadeiros, modelo da grade que o reproduz)
+PROCESSOS = {
+    'garch': (lambda n, seed: motor_garch.simular_garch(n, seed=seed),
+              {'omega': 0.02, 'alpha[1]': 0.08, 'beta[1]': 0.9}, ('GARCH', 1, 0, 1)),
+    'gjr': (lambda n, seed: motor_garch.simular_garch(n, alpha=0.04, gamma=0.1, beta=0.88, seed=seed),
+            {'omega': 0.02, 'alpha[1]': 0.04, 'gamma[1]': 0.1, 'beta[1]': 0.88}, ('GJR', 1, 1, 1)),
+    'egarch': (lambda n, seed: motor_garch.simular_egarch(n, seed=seed),
+               {'omega': -0.01, 'alpha[1]': 0.12, 'gamma[1]': -0.06, 'beta[1]': 0.97}, ('EGARCH', 1, 1, 1)),
+}
+
+# ==================== DADOS SINTÉTICOS ====================
+class ProvedorSintetico:
+    """Provedor de preços para o CachePrecos: GJR-GARCH simulado, semente pelo ticker"""
+
+    def __init__(self, n=1500):
+        self.n = n
+
+    def baixar(self, ticker, inicio, fim):
+        r = motor_garch.simular_garch(self.n, alpha=0.05, gamma=0.05, seed=zlib.crc32(ticker.encode())) / 100
+        precos = 100 * np.exp(r.cumsum())
+        precos = precos[(precos.index >= pd.Timestamp(inicio)) & (precos.index < pd.Timestamp(fim))]
+        return precos.rename('Close')
+
+# ==================== CRONÔMETRO ====================
+def cronometrar(funcao, repeticoes):
+    """Executa `funcao` `repeticoes` vezes; retorna (tempos, último retorno)"""
+    tempos, saida = [], None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        saida = funcao()
+        tempos.append(time.perf_counter() - t0)
+    return tempos, saida
+
+def _registro(etapa, tempos, **extras):
+    return dict({'etapa': etapa, 'mediana_s': float(np.median(tempos)), 'min_s': float(np.min(tempos)),
+                 'repeticoes': len(tempos)}, **extras)
+
+# ==================== ETAPAS ====================
+def bench_ajustes(tamanhos, backends, repeticoes, log=print):
+    """ajustar_modelo (modelo verdadeiro de cada processo) + ljung_box_test + seleção completa"""
+    registros = []
+    for n in tamanhos:
+        for nome, (simular, verdadeiros, (vol, p, o, q)) in PROCESSOS.items():
+            # Escala de fração (como os log-retornos do Analyzer); ω escala por 1e-4
+            retornos = simular(n, 7) / 100
+            for backend in backends:
+                tempos, res = cronometrar(lambda: ajustar_modelo(retornos, vol, p, o, q, backend), repeticoes)
+                erro = None
+                if res['success']:
+                    est = dict(res['params'])
+                    est['omega'] = est['omega'] * (1e4 if vol != 'EGARCH' else 1)
+                    if vol == 'EGARCH':
+                        est['omega'] = est['omega'] + 2 * np.log(100) * (1 - est['beta[1]'])
+                    erro = max(abs(est[k] - v) for k, v in verdadeiros.items())
+                registros.append(_registro(f"ajustar_modelo/{backend}/{nome}/{n}", tempos,
+                                           nit=res['nit'], convergiu=bool(res['convergiu']),
+                                           erro_max_params=erro))
+                log(f"  {registros[-1]['etapa']:<40} {registros[-1]['mediana_s']:8.4f}s")
+        z2 = np.random.default_rng(n).standard_normal(n) ** 2
+        tempos, _ = cronometrar(lambda: ljung_box_test(pd.Series(z2)), repeticoes)
+        registros.append(_registro(f"ljung_box_test/{n}", tempos))
+        log(f"  {registros[-1]['etapa']:<40} {registros[-1]['mediana_s']:8.4f}s")
+        Z2 = np.random.default_rng(n).standard_normal((6, n)) ** 2
+        tempos, _ = cronometrar(lambda: ljung_box_candidatos(list(Z2)), repeticoes)
+        registros.append(_registro(f"ljung_box_candidatos/6x{n}", tempos))
+        log(f"  {registros[-1]['etapa']:<40} {registros[-1]['mediana_s']:8.4f}s")
+        retornos = PROCESSOS['gjr'][0](n, 11) / 100
+        for backend in backends:
+            tempos, (melhor, _) = cronometrar(
+                lambda: selecionar_melhor_modelo(retornos, "SINT", backend), repeticoes)
+            registros.append(_registro(f"selecionar_melhor_modelo/{backend}/{n}", tempos,
+                                       vencedor=melhor['model_name']))
+            log(f"  {registros[-1]['etapa']:<40} {registros[-1]['mediana_s']:8.4f}s")
+    return registros
+
+def bench_warm_start(tamanhos, backends, repeticoes, log=print):
+    """
+    selecionar_melhor_modelo frio × semeado pelos pais aninhados: tempo,
+    iterações e o pior AIC semeado - frio por modelo (não pode passar de
+    TOLERANCIA_AIC_WARM)
+    """
+    registros = []
+    for n in tamanhos:
+        for nome, (simular, _, _) in PROCESSOS.items():
+            retornos = simular(n, 17) / 100
+            for backend in backends:
+                _, (_, frios) = cronometrar(lambda: selecionar_melhor_modelo(retornos, "SINT", backend), 1)
+                tempos, (melhor, semeados) = cronometrar(
+                    lambda: selecionar_melhor_modelo(retornos, "SINT", backend, warm_start=True), repeticoes)
+                aic_frio = {r['nome_exibicao']: r['aic'] for r in frios}
+                pior = max(r['aic'] - aic_frio[r['nome_exibicao']] for r in semeados)
+                registros.append(_registro(f"warm_start/{backend}/{nome}/{n}", tempos,
+                                           vencedor=melhor['model_name'],
+                                           nit_frio=sum(r['nit'] for r in frios),
+                                           nit_warm=sum(r['nit'] for r in semeados),
+                                           pior_aic_warm_menos_frio=float(pior),
+                                           warm_pior_que_frio=bool(pior > TOLERANCIA_AIC_WARM)))
+                log(f"  {registros[-1]['etapa']:<40} {registros[-1]['mediana_s']:8.4f}s  "
+                    f"nit {registros[-1]['nit_frio']} → {registros[-1]['nit_warm']}  ΔAIC máx {pior:+.4f}")
+    return registros
+
+def bench_grade(n, backends, repeticoes, log=print):
+    """Seleção na grade estendida (t/skew-t, até (3,3)): exaustiva × busca podada"""
+    registros = []
+    retornos = PROCESSOS['gjr'][0](n, 13) / 100
+    grade = GRADES['estendida']
+    for backend in backends:
+        tempos, (exaustivo, _) = cronometrar(
+            lambda: selecionar_melhor_modelo(retornos, "SINT", backend, modelos=grade), repeticoes)
+        registros.append(_registro(f"grade_estendida/exaustiva/{backend}/{n}", tempos,
+                                   vencedor=exaustivo['model_name'], ajustes=len(grade)))
+        tempos, (podado, _) = cronometrar(
+            lambda: selecionar_melhor_modelo(retornos, "SINT", backend, modelos=grade, busca=BuscaPodada()),
+            repeticoes)
+        registros.append(_registro(f"grade_estendida/podada/{backend}/{n}", tempos,
+                                   vencedor=podado['model_name'],
+                                   mesmo_vencedor=podado['model_name'] == exaustivo['model_name'],
+                                   ajustes=podado['poda']['completos'], ajustes_triagem=podado['poda']['triagem'],
+                                   evitados=podado['poda']['evitados']))
+        for registro in registros[-2:]:
+            log(f"  {registro['etapa']:<40} {registro['mediana_s']:8.4f}s  ajustes={registro['ajustes']}")
+    return registros
+
+def bench_relatorio(n_ativos, repeticoes, log=print):
+    """
+    gerar_relatorio_txt_completo com `n_ativos` linhas (tabela de candidatos +
+    visão) e, separados, a montagem da tabela, a visão e a gravação em Parquet
+    """
+    retornos = PROCESSOS['garch'][0](1000, 3) / 100
+    melhor, todos = selecionar_melhor_modelo(retornos, "SINT")
+    resultados = [montar_resultado(f"T{i:05d}", melhor, todos) for i in range(n_ativos)]
+    tempos, txt = cronometrar(
+        lambda: gerar_relatorio_txt_completo(resultados, "2000-01-03", "2005-12-30", 2188, 1564), repeticoes)
+    registros = [_registro(f"gerar_relatorio_txt_completo/{n_ativos}", tempos, bytes=len(txt))]
+    tempos, tabela = cronometrar(lambda: construir_tabela(resultados), repeticoes)
+    registros.append(_registro(f"construir_tabela/{n_ativos}", tempos, linhas=tabela.num_rows))
+    tempos, _ = cronometrar(lambda: visao_linhas_relatorio(tabela), repeticoes)
+    registros.append(_registro(f"visao_linhas_relatorio/{n_ativos}", tempos))
+    tempos, buf = cronometrar(lambda: gravar_parquet(tabela, io.BytesIO()), repeticoes)
+    registros.append(_registro(f"gravar_parquet/{n_ativos}", tempos, bytes=buf.getbuffer().nbytes))
+    for registro in registros:
+        log(f"  {registro['etapa']:<40} {registro['mediana_s']:8.4f}s")
+    return registros
+
+def bench_dcc(n_ativos, repeticoes, n_dias=1500, log=print):
+    """ajustar_dcc com `n_ativos` (blocos independentes de 100 ativos DCC a=0.04, b=0.93)"""
+    Z = np.hstack([simular_dcc(n_dias, min(100, n_ativos - k), seed=k) for k in range(0, n_ativos, 100)])
+    residuos = pd.DataFrame(Z, columns=[f"A{i:03d}" for i in range(n_ativos)])
+    tempos, res = cronometrar(lambda: ajustar_dcc(residuos), repeticoes)
+    registro = _registro(f"ajustar_dcc/{n_ativos}x{n_dias}", tempos, a=res.a, b=res.b,
+                         erro_max_params=max(abs(res.a - 0.04), abs(res.b - 0.93)),
+                         caminho_mb=res.caminho.nbytes / 2**20)
+    log(f"  {registro['etapa']:<40} {registro['mediana_s']:8.4f}s")
+    return [registro]
+
+def _latencias(funcao, n):
+    tempos = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    return tempos
+
+def bench_feed_mt5(n_simbolos, repeticoes, n_consultas=2000, log=print):
+    """
+    Feed local do MT5 com `n_simbolos`: publicação no snapshot e latência de
+    uma consulta do EA (versão e snapshot pelo mmap, /versao e um símbolo
+    por HTTP com keep-alive)
+    """
+    retornos = PROCESSOS['gjr'][0](1000, 5) / 100
+    melhor, todos = selecionar_melhor_modelo(retornos, "SINT")
+    tabela = construir_tabela([montar_resultado(f"T{i:05d}", melhor, todos) for i in range(n_simbolos)])
+    with tempfile.TemporaryDirectory() as d:
+        publicador = PublicadorParametros(os.path.join(d, "feed.bin"))
+        tempos, _ = cronometrar(lambda: publicador.publicar_tabela(tabela), repeticoes)
+        registros = [_registro(f"feed_mt5/publicar/{n_simbolos}", tempos)]
+        leitor = LeitorSnapshot(publicador.arquivo)
+        registros.append(_registro(f"feed_mt5/versao_mmap/{n_simbolos}", _latencias(leitor.versao, n_consultas)))
+        registros.append(_registro(f"feed_mt5/ler_mmap/{n_simbolos}", _latencias(leitor.ler, n_consultas)))
+        servidor = ServidorParametros(publicador.arquivo, porta=0).iniciar()
+        conexao = http.client.HTTPConnection("127.0.0.1", servidor.server_address[1])
+        for caminho in ("/versao", "/parametros/T00000"):
+            def _consultar():
+                conexao.request("GET", caminho)
+                conexao.getresponse().read()
+            _consultar()  # monta as respostas da versão
+            tempos = _latencias(_consultar, n_consultas)
+            registros.append(_registro(f"feed_mt5/http{caminho.split('/T')[0]}/{n_simbolos}", tempos,
+                                       p99_s=float(np.percentile(tempos, 99))))
+        conexao.close()
+        servidor.parar()
+        leitor.fechar()
+        publicador.fechar()
+    for registro in registros:
+        log(f"  {registro['etapa']:<40} {registro['mediana_s'] * 1e6:8.1f}µs")
+    return registros
+
+def bench_intradiario(n_linhas, repeticoes, log=print):
+    """
+    Caminho intradiário com `n_linhas` barras sintéticas de 1 minuto:
+    ingestão em blocos no armazém float32 (simulação incluída), RV diária em
+    fluxo + HAR-RV + GARCH intradiário, e o pico de memória da análise
+    """
+    with tempfile.TemporaryDirectory() as d:
+        def _ingerir():
+            armazem = ArmazemIntradiario(tempfile.mkdtemp(dir=d))
+            armazem.ingerir("SINT", "1m", simular_intradiario(n_linhas, seed=3))
+            return armazem
+        tempos, armazem = cronometrar(_ingerir, repeticoes)
+        registros = [_registro(f"intradiario/ingerir/{n_linhas}", tempos,
+                               linhas_por_s=n_linhas / float(np.median(tempos)),
+                               mb_disco=armazem.bytes_em_disco("SINT", "1m") / 2**20)]
+        tempos, res = cronometrar(lambda: analisar_intradiario(armazem, "SINT", "1m"), repeticoes)
+        tracemalloc.start()
+        analisar_intradiario(armazem, "SINT", "1m")
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        registros.append(_registro(f"intradiario/analisar/{n_linhas}", tempos, dias=len(res['rv']),
+                                   pico_mb=pico / 2**20, r2_har=res['har'].r2 if res['har'] else None,
+                                   **{f"{etapa}_s": s for etapa, s in res['tempos'].items()}))
+    for registro in registros:
+        log(f"  {registro['etapa']:<40} {registro['mediana_s']:8.4f}s")
+    log(f"  pico de memória da análise: {registros[-1]['pico_mb']:.0f} MB · "
+        f"{registros[0]['mb_disco']:.0f} MB em disco")
+    return registros
+
+def bench_bootstrap(n_tickers, B, modos, repeticoes, max_workers=None, n=1250, log=print):
+    """
+    Bootstrap paramétrico de `n_tickers` vencedores (GARCH/GJR/EGARCH
+    alternados, `n` retornos) com B réplicas, sem e com parada antecipada;
+    extrapola o tempo do lote noturno de referência (50 tickers × 200)
+    """
+    resultados, retornos = [], {}
+    for i in range(n_tickers):
+        nome = list(PROCESSOS)[i % len(PROCESSOS)]
+        simular, _, (vol, p, o, q) = PROCESSOS[nome]
+        ticker = f"SINT{i:03d}"
+        retornos[ticker] = simular(n, 100 + i) / 100
+        melhor = ajustar_modelo(retornos[ticker], vol, p, o, q, "rapido")
+        resultados.append(montar_resultado(ticker, melhor, [melhor]))
+    especs = especificacoes(construir_tabela(resultados), retornos)
+    registros = []
+    for modo in modos:
+        for parada in (False, True):
+            tempos, (resumos, erros) = cronometrar(
+                lambda: executar_bootstrap(especs, B=B, modo=modo, max_workers=max_workers,
+                                           parada_antecipada=parada), repeticoes)
+            replicas = sum(r['B'] for r in resumos)
+            mediana = float(np.median(tempos))
+            registros.append(_registro(f"bootstrap/{modo}{'/parada' if parada else ''}/{n_tickers}x{B}", tempos,
+                                       replicas=replicas, replicas_por_s=replicas / mediana, erros=len(erros),
+                                       estimativa_50x200_s=mediana * 50 * 200 / (n_tickers * B)))
+            log(f"  {registros[-1]['etapa']:<40} {mediana:8.4f}s "
+                f"({replicas} réplicas, 50×200 ≈ {registros[-1]['estimativa_50x200_s']:.0f}s)")
+    return registros
+
+def bench_analyzer(n_tickers, backends, modos, repeticoes, max_workers=None, log=print):
+    """executar_analyzer de ponta a ponta com preços sintéticos (cache de preços novo a cada rodada)"""
+    registros = []
+    tickers = [f"SINT{i:03d}" for i in range(n_tickers)]
+    for backend in backends:
+        for modo in modos:
+            def _rodar():
+                with tempfile.TemporaryDirectory() as d:
+                    cache = CachePrecos(d, provedor=ProvedorSintetico())
+                    return executar_analyzer(tickers, "2000-01-03", "2005-12-30", modo=modo,
+                                             max_workers=max_workers, cache=cache, backend=backend)
+            tempos, (resultados, erros, _) = cronometrar(_rodar, repeticoes)
+            registros.append(_registro(f"executar_analyzer/{backend}/{modo}/{n_tickers}", tempos,
+                                       ok=len(resultados), erros=len(erros)))
+            log(f"  {registros[-1]['etapa']:<40} {registros[-1]['mediana_s']:8.4f}s")
+    return registros
+
+# ==================== INÍCIO A FRIO ====================
+def _importtime(stderr):
+    """Linhas do -X importtime → lista de (módulo, self_s, cumulativo_s)"""
+    linhas = []
+    for linha in stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        auto, cumul, nome = linha[len('import time:'):].split('|')
+        linhas.append((nome.strip(), int(auto) / 1e6, int(cumul) / 1e6))
+    return linhas
+
+def _por_pacote(linhas, top=10):
+    """Tempo próprio somado por pacote de topo (maiores `top`)"""
+    pacotes = {}
+    for nome, auto, _ in linhas:
+        raiz = nome.split('.')[0]
+        pacotes[raiz] = pacotes.get(raiz, 0.0) + auto
+    return dict(sorted(pacotes.items(), key=lambda kv: -kv[1])[:top])
+
+_SCRIPT_LOGIN = """
+import json, os, sys, tempfile, time
+sys.path.insert(0, {raiz!r})
+os.chdir(tempfile.mkdtemp())  # users.db descartável
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=60).run()
+segundos = time.perf_counter() - t0
+print(json.dumps({{'segundos': segundos, 'excecoes': [str(e.value) for e in at.exception],
+                  'pesados': [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+def bench_inicializacao(repeticoes, log=print):
+    """
+    Cada import de IMPORTS_MEDIDOS num interpretador novo (cumulativo do
+    -X importtime) e a tela de login do app.py via AppTest: tempo, pacotes que
+    mais custaram e quais MODULOS_PESADOS foram carregados (deve ser nenhum).
+    """
+    registros = []
+    for modulo in IMPORTS_MEDIDOS:
+        tempos = []
+        for _ in range(repeticoes):
+            proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                                  cwd=RAIZ, capture_output=True, text=True)
+            linhas = _importtime(proc.stderr)
+            tempos.append(max((c for _, _, c in linhas), default=0.0))
+        registros.append(_registro(f"importacao/{modulo}", tempos, pacotes=_por_pacote(linhas, 5)))
+        log(f"  {registros[-1]['etapa']:<40} {registros[-1]['mediana_s']:8.4f}s")
+
+    script = _SCRIPT_LOGIN.format(raiz=RAIZ, app=os.path.join(RAIZ, 'app.py'), pesados=MODULOS_PESADOS)
+    tempos = []
+    for _ in range(repeticoes):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                              cwd=RAIZ, capture_output=True, text=True)
+        saida = json.loads(proc.stdout.strip().splitlines()[-1])
+        tempos.append(saida['segundos'])
+    registros.append(_registro("inicializacao/login", tempos, pesados_carregados=saida['pesados'],
+                               excecoes=saida['excecoes'], pacotes=_por_pacote(_importtime(proc.stderr))))
+    log(f"  {registros[-1]['etapa']:<40} {registros[-1]['mediana_s']:8.4f}s"
+        f"  pesados: {', '.join(saida['pesados']) or 'nenhum'}")
+    return registros
+
+# ==================== LIMITES DE REGRESSÃO ====================
+def verificar_limites(registros, baseline=None, tolerancia=1.5, limites=None):
+    """
+    Lista de violações: mediana acima de `tolerancia` × a do baseline (mesma
+    etapa) e/ou acima do limite absoluto em segundos de `limites`
+    ({padrão fnmatch da etapa: segundos}); módulo pesado na tela de login;
+    warm start com AIC pior que a partida fria.
+    """
+    violacoes = []
+    anteriores = {r['etapa']: r for r in (baseline or {}).get('resultados', [])}
+    for r in registros:
+        if r.get('pesados_carregados') or r.get('excecoes'):
+            violacoes.append(f"{r['etapa']}: carregou {r.get('pesados_carregados')} "
+                             f"exceções {r.get('excecoes')}")
+        if r.get('warm_pior_que_frio'):
+            violacoes.append(f"{r['etapa']}: AIC semeado {r['pior_aic_warm_menos_frio']:+.4f} "
+                             f"acima da partida fria (tolerância {TOLERANCIA_AIC_WARM:g})")
+        ant = anteriores.get(r['etapa'])
+        if ant and r['mediana_s'] > tolerancia * ant['mediana_s']:
+            violacoes.append(f"{r['etapa']}: {r['mediana_s']:.4f}s > {tolerancia:g} × {ant['mediana_s']:.4f}s (baseline)")
+        for padrao, max_s in (limites or {}).items():
+            if fnmatch.fnmatch(r['etapa'], padrao) and r['mediana_s'] > max_s:
+                violacoes.append(f"{r['etapa']}: {r['mediana_s']:.4f}s > {max_s:g}s (limite '{padrao}')")
+    return violacoes
+
+def _metadados():
+    return {
+        'data': f"{datetime.now():%Y-%m-%d %H:%M:%S}",
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'numpy': np.__version__, 'pandas': pd.__version__, 'scipy': scipy.__version__,
+        'arch': arch.__version__, 'statsmodels': statsmodels.__version__,
+    }
+
+# ==================== LINHA DE COMANDO ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline do GARCH Analyzer")
+    parser.add_argument("--saida", default="bench_resultados.json")
+    parser.add_argument("--tamanhos", default=",".join(map(str, TAMANHOS_PADRAO)),
+                        help="tamanhos das séries, separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--backends", default=",".join(BACKENDS_AJUSTE))
+    parser.add_argument("--n-tickers", type=int, default=8, help="tickers no Analyzer de ponta a ponta")
+    parser.add_argument("--n-relatorio", type=int, default=2000, help="linhas no relatório TXT")
+    parser.add_argument("--n-dcc", default="100,500", help="números de ativos no DCC, separados por vírgula")
+    parser.add_argument("--n-grade", type=int, default=2000, help="pontos na grade estendida (0 = não mede)")
+    parser.add_argument("--n-feed", type=int, default=500, help="símbolos no feed local do MT5 (0 = não mede)")
+    parser.add_argument("--n-intradiario", type=int, default=10_000_000,
+                        help="barras de 1 minuto no caminho intradiário (0 = não mede)")
+    parser.add_argument("--n-bootstrap", type=int, default=6, help="tickers no bootstrap dos parâmetros (0 = não mede)")
+    parser.add_argument("--b-bootstrap", type=int, default=200, help="réplicas por ticker no bootstrap")
+    parser.add_argument("--workers", type=int, default=None, help="processos no modo paralelo")
+    parser.add_argument("--sem-paralelo", action="store_true", help="não mede o modo paralelo")
+    parser.add_argument("--rapido", action="store_true", help="só 500/2000 pontos e 1 repetição")
+    parser.add_argument("--sem-inicializacao", action="store_true", help="não mede o início a frio")
+    parser.add_argument("--so-inicializacao", action="store_true", help="mede só o início a frio")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=1.5,
+                        help="razão máxima mediana_atual / mediana_baseline")
+    parser.add_argument("--limites", help="JSON {padrão da etapa: segundos máximos}")
+    args = parser.parse_args(argv)
+    # Avisos de escala/convergência do arch poluem a saída e não mudam os tempos
+    warnings.simplefilter("ignore")
+
+    tamanhos = [int(t) for t in args.tamanhos.split(',')]
+    repeticoes = args.repeticoes
+    if args.rapido:
+        tamanhos, repeticoes = [t for t in tamanhos if t <= 2000] or [500], 1
+        args.n_intradiario = min(args.n_intradiario, 1_000_000)
+        args.b_bootstrap = min(args.b_bootstrap, 50)
+    backends = [b for b in args.backends.split(',') if b in BACKENDS_AJUSTE]
+    modos = ["serial"] if args.sem_paralelo else ["serial", "paralelo"]
+
+    registros = []
+    if not args.sem_inicializacao:
+        print("Início a frio (imports e tela de login):")
+        registros += bench_inicializacao(repeticoes)
+    if not args.so_inicializacao:
+        print("Ajustes por tamanho de série:")
+        registros += bench_ajustes(tamanhos, backends, repeticoes)
+        print("Warm start (frio × semeado pelos pais aninhados):")
+        registros += bench_warm_start([t for t in tamanhos if t <= 10000] or tamanhos[:1], backends, repeticoes)
+        if args.n_grade:
+            print("Grade estendida (exaustiva × podada):")
+            registros += bench_grade(args.n_grade, backends, repeticoes)
+        print("Relatório:")
+        registros += bench_relatorio(args.n_relatorio, repeticoes)
+        print("Correlação dinâmica (DCC):")
+        for n in (int(x) for x in args.n_dcc.split(',') if x):
+            registros += bench_dcc(n, repeticoes)
+        if args.n_feed:
+            print(f"Feed local do MT5 ({args.n_feed} símbolos):")
+            registros += bench_feed_mt5(args.n_feed, repeticoes)
+        if args.n_intradiario:
+            print(f"Intradiário ({args.n_intradiario} barras):")
+            registros += bench_intradiario(args.n_intradiario, repeticoes)
+        if args.n_bootstrap:
+            print(f"Bootstrap dos parâmetros ({args.n_bootstrap} tickers × {args.b_bootstrap} réplicas):")
+            registros += bench_bootstrap(args.n_bootstrap, args.b_bootstrap, modos, repeticoes, args.workers)
+        print(f"Analyzer completo ({args.n_tickers} tickers):")
+        registros += bench_analyzer(args.n_tickers, backends, modos, repeticoes, args.workers)
+
+    saida = {'meta': _metadados(), 'resultados': registros}
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(saida, f, indent=2, ensure_ascii=False)
+    print(f"Resultados → {args.saida}")
+
+    baseline = limites = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    if args.limites:
+        with open(args.limites, 'r', encoding='utf-8') as f:
+            limites = json.load(f)
+    violacoes = verificar_limites(registros, baseline, args.tolerancia, limites)
+    for v in violacoes:
+        print(f"REGRESSÃO: {v}")
+    return 1 if violacoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
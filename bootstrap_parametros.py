@@ -0,0 +1,395 @@
+"""
+ASUS GARCH PRO 2025 - INCERTEZA DOS PARÂMETROS (BOOTSTRAP)
+Reajusta o modelo vencedor de cada ticker em B séries reamostradas e mede a
+incerteza de Ω/α/β/γ: intervalos de confiança por quantis e a probabilidade
+de cada regra da interpretação automática disparar (ex.: "VOL DURA MUITO"
+com β > 0.98) — regras que ficam perto de 50% estão na fronteira do limiar.
+  - paramétrico: séries simuladas do próprio vencedor (erros normal/t/skew-t),
+    a partir da variância incondicional e com burn-in;
+  - blocos: reamostragem circular de blocos dos retornos observados.
+As réplicas vão em lotes para um ProcessPoolExecutor; cada lote tem o próprio
+gerador (semente + ticker + lote), então o resultado não depende do modo nem
+do número de processos. Com parada antecipada, um ticker para quando as
+larguras dos ICs variam menos que `tol` de um lote para o seguinte.
+"""
+
+import multiprocessing
+import os
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+import motor_garch
+from analyzer import (
+    ajustar_modelo, extrair_parametros, calcular_retornos, iterar_downloads, LARGURA_RELATORIO
+)
+from grade_modelos import nomes_parametros, PARAMS_DIST
+from previsao import choques, simular_retornos, SEMENTE_PADRAO
+from tabela_candidatos import vencedores, regras_interpretacao, ROTULOS_REGRAS, ROTULO_ESTAVEL
+
+METODOS = ('parametrico', 'blocos')
+PARAMETROS = ('omega', 'alpha_total', 'beta_total', 'gamma')  # como em extrair_parametros
+COLUNAS_PARAMETROS = {'omega': 'Omega', 'alpha_total': 'Alpha_Total', 'beta_total': 'Beta_Total', 'gamma': 'Gamma'}
+B_PADRAO = 200
+NIVEL_IC = 0.90
+LOTE_REPLICAS = 25      # réplicas por tarefa do pool (e intervalo entre checagens da parada antecipada)
+MIN_REPLICAS = 50       # a parada antecipada só é avaliada a partir daqui
+TOL_ESTABILIDADE = 0.05  # variação relativa máxima das larguras dos ICs entre dois lotes
+BURN_IN = 500           # passos simulados descartados antes de cada série paramétrica
+BACKEND_REPLICAS = "rapido"  # padrão sem backend explícito (app e CLI passam o da seleção)
+
+# ==================== ESPECIFICAÇÃO DOS VENCEDORES ====================
+def _params_da_linha(linha, p, o, q, dist):
+    """Parâmetros (layout do arch) a partir das colunas da tabela de candidatos"""
+    nomes = nomes_parametros(p, o, q, dist)
+    return pd.Series([float(linha[n.replace('[', '_').rstrip(']')]) for n in nomes], index=nomes)
+
+def especificacoes(tabela, retornos):
+    """
+    Um dict por vencedor da tabela (tabela_candidatos.SCHEMA) com a série em
+    `retornos` ({ticker: pd.Series}): especificação, parâmetros estimados e
+    o necessário para as réplicas. Tickers sem retornos ficam de fora.
+    """
+    especs = []
+    for linha in vencedores(tabela).to_dict('records'):
+        ticker = str(linha['ticker'])
+        if not linha['sucesso'] or ticker not in retornos or pd.isna(linha['p']):
+            continue
+        vol, dist = str(linha['vol']), str(linha['dist'])
+        p, o, q = int(linha['p']), int(linha['o']), int(linha['q'])
+        params = _params_da_linha(linha, p, o, q, dist)
+        r = np.asarray(retornos[ticker], dtype=float)
+        variancia = motor_garch.variancia_longo_prazo(vol, params)
+        especs.append({
+            'ticker': ticker, 'ativo': str(linha['ativo']), 'model_name': linha['model_name'],
+            'vol': vol, 'p': p, 'o': o, 'q': q, 'dist': dist, 'params': params,
+            'retornos': r, 'n': len(r),
+            # Processo não estacionário: a simulação parte da variância amostral
+            'variancia_inicial': variancia if np.isfinite(variancia) else float(np.var(r)),
+        })
+    return especs
+
+def retornos_dos_tickers(tickers, inicio, fim, cache=None, max_downloads=8):
+    """
+    ({ticker: retornos}, {ticker: erro}) pela etapa de download do Analyzer
+    — depois da análise, com o cache de preços, sem ir à rede.
+    """
+    retornos, erros = {}, {}
+    for ticker, precos, erro, _ in iterar_downloads(tickers, inicio, fim, cache, max_concorrencia=max_downloads):
+        if erro is None:
+            retornos[ticker] = calcular_retornos(precos)
+        else:
+            erros[ticker] = erro
+    return retornos, erros
+
+# ==================== RÉPLICAS ====================
+def _estado_inicial(espec):
+    """Estado (formato de previsao.estado_final) na variância incondicional, sem choques"""
+    p, o, q = espec['p'], espec['o'], espec['q']
+    m, n_s = max(p, o, 1), max(q, 1)
+    return {
+        'ticker': espec['ticker'],
+        'vol': 'EGARCH' if espec['vol'].upper() == 'EGARCH' else 'GARCH',
+        'p': p, 'o': o, 'q': q,
+        'theta': espec['params'][motor_garch.nomes_parametros(p, o, q)].to_numpy(dtype=float),
+        'eps': np.zeros(m),
+        'sigma2': np.full(max(m, n_s), espec['variancia_inicial']),
+    }
+
+def _choques(rng, forma, dist, params):
+    """Choques padronizados (média 0, variância 1) da distribuição dos erros"""
+    return choques(rng, forma, dist, [params[n] for n in PARAMS_DIST[dist]])
+
+def _blocos(rng, r, quantidade, tamanho):
+    """Reamostragem circular de blocos de `tamanho` retornos (quantidade × len(r))"""
+    n = len(r)
+    inicios = rng.integers(0, n, (quantidade, -(-n // tamanho)))
+    idx = (inicios[:, :, None] + np.arange(tamanho)).reshape(quantidade, -1)[:, :n] % n
+    return r[idx]
+
+def tamanho_bloco_padrao(n):
+    """√n retornos: blocos longos o bastante para preservar os clusters de volatilidade"""
+    return max(5, int(round(np.sqrt(n))))
+
+def _replicas(espec, metodo, k, quantidade, seed, backend, tamanho_bloco=None):
+    """
+    Tarefa do pool: lote k de réplicas de um vencedor. Retorna (ticker, k,
+    amostras quantidade × PARAMETROS), com NaN nas réplicas que não convergiram.
+    """
+    rng = np.random.default_rng([seed, zlib.crc32(espec['ticker'].encode()), k])
+    if metodo == 'parametrico':
+        Z = _choques(rng, (quantidade, BURN_IN + espec['n']), espec['dist'], espec['params'])
+        series = simular_retornos(_estado_inicial(espec), Z, BURN_IN)
+    else:
+        series = _blocos(rng, espec['retornos'], quantidade,
+                         tamanho_bloco or tamanho_bloco_padrao(espec['n']))
+    indice = pd.RangeIndex(espec['n'])
+    sv = espec['params'].values  # a estimativa original é a semente de cada réplica
+    amostras = np.full((quantidade, len(PARAMETROS)), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # réplica que não converge só vira NaN
+        for i, serie in enumerate(series):
+            res = ajustar_modelo(pd.Series(serie, index=indice), espec['vol'], espec['p'], espec['o'], espec['q'],
+                                 backend, sv, calcular_lb=False, dist=espec['dist'])
+            if res['success'] and res['convergiu']:
+                totais = extrair_parametros(res['params'])
+                amostras[i] = [totais[c] for c in PARAMETROS]
+    return espec['ticker'], k, amostras
+
+# ==================== RESUMO ====================
+def _quantis(amostras, nivel):
+    return np.quantile(amostras, [(1 - nivel) / 2, (1 + nivel) / 2], axis=0)
+
+def larguras_ic(amostras, nivel=NIVEL_IC):
+    """Largura do IC de cada parâmetro (réplicas válidas)"""
+    validas = amostras[~np.isnan(amostras).any(axis=1)]
+    if len(validas) == 0:
+        return np.full(amostras.shape[1], np.nan)
+    lo, hi = _quantis(validas, nivel)
+    return hi - lo
+
+def estabilizou(antes, agora, tol=TOL_ESTABILIDADE):
+    """Larguras dos ICs variaram menos que `tol` (relativo) entre duas checagens"""
+    if np.isnan(antes).any() or np.isnan(agora).any():
+        return False
+    return bool(np.all(np.abs(agora - antes) <= tol * np.maximum(np.abs(antes), 1e-12)))
+
+def _rotulos(espec, totais):
+    """Rótulo de cada regra para cada linha de `totais` (PARAMETROS)"""
+    n = len(totais)
+    coluna = lambda v: pd.Series([v] * n, dtype=object)
+    return regras_interpretacao(coluna(espec['ativo']), coluna(espec['ticker']), coluna(espec['model_name']),
+                                totais[:, 0], totais[:, 1], totais[:, 2])
+
+def resumir(espec, amostras, metodo, B, nivel=NIVEL_IC, parou_cedo=False):
+    """
+    Resumo das réplicas de um vencedor: estimativa pontual, IC, erro-padrão
+    e a fração das réplicas em que cada regra dispara ('prob_regras', na
+    ordem de ROTULOS_REGRAS + "Estável").
+    """
+    validas = amostras[~np.isnan(amostras).any(axis=1)]
+    totais = extrair_parametros(espec['params'])
+    pontual = np.array([[totais[c] for c in PARAMETROS]])
+    prob = {}
+    if len(validas):
+        lo, hi = _quantis(validas, nivel)
+        erro_padrao = validas.std(axis=0, ddof=1) if len(validas) > 1 else np.full(len(PARAMETROS), np.nan)
+        regras = _rotulos(espec, validas)
+        for rotulos, regra in zip(ROTULOS_REGRAS, regras):
+            for rotulo in rotulos:
+                prob[rotulo] = float(np.mean(regra == rotulo))
+        prob[ROTULO_ESTAVEL] = float(np.mean(np.all([regra == '' for regra in regras], axis=0)))
+    else:
+        lo = hi = erro_padrao = np.full(len(PARAMETROS), np.nan)
+    disparadas = [str(regra[0]) for regra in _rotulos(espec, pontual) if regra[0] != '']
+    return {
+        'ticker': espec['ticker'], 'ativo': espec['ativo'], 'model_name': espec['model_name'],
+        'metodo': metodo, 'nivel': nivel, 'B_pedido': B, 'B': len(amostras), 'validas': len(validas),
+        'parou_cedo': parou_cedo,
+        'pontual': {c: float(totais[c]) for c in PARAMETROS},
+        'ic': {c: (float(lo[j]), float(hi[j])) for j, c in enumerate(PARAMETROS)},
+        'erro_padrao': {c: float(erro_padrao[j]) for j, c in enumerate(PARAMETROS)},
+        'prob_regras': prob,
+        'regras_pontuais': disparadas or [ROTULO_ESTAVEL],
+        'amostras': amostras,
+    }
+
+class _Acumulador:
+    """
+    Lotes de réplicas de um ticker. Os lotes são consumidos em ordem (0, 1,
+    2, ...) mesmo que cheguem fora dela, e a parada antecipada é avaliada a
+    cada lote consumido — a decisão não depende da ordem de chegada.
+    """
+
+    def __init__(self, n_lotes):
+        self.n_lotes = n_lotes
+        self.recebidos = {}
+        self.consumidos = []
+        self.larguras = None
+        self.parou_cedo = False
+
+    @property
+    def terminou(self):
+        return self.parou_cedo or len(self.consumidos) == self.n_lotes
+
+    def receber(self, k, amostras, nivel, parada_antecipada, tol):
+        """Guarda o lote k; retorna True quando o ticker terminou"""
+        self.recebidos[k] = amostras
+        while not self.terminou and len(self.consumidos) in self.recebidos:
+            self.consumidos.append(self.recebidos.pop(len(self.consumidos)))
+            if parada_antecipada and sum(len(a) for a in self.consumidos) >= MIN_REPLICAS:
+                larguras = larguras_ic(np.vstack(self.consumidos), nivel)
+                if self.larguras is not None and len(self.consumidos) < self.n_lotes \
+                        and estabilizou(self.larguras, larguras, tol):
+                    self.parou_cedo = True
+                self.larguras = larguras
+        return self.terminou
+
+    def amostras(self):
+        return np.vstack(self.consumidos)
+
+# ==================== EXECUÇÃO (SERIAL / PARALELO) ====================
+def iterar_bootstrap(especs, B=B_PADRAO, metodo='parametrico', nivel=NIVEL_IC, modo="serial", max_workers=None,
+                     parada_antecipada=False, tol=TOL_ESTABILIDADE, lote=LOTE_REPLICAS, backend=BACKEND_REPLICAS,
+                     tamanho_bloco=None, seed=SEMENTE_PADRAO):
+    """
+    Bootstrap dos vencedores (lista de especificacoes) como gerador: devolve
+    (ticker, resumo, erro) assim que cada ticker termina.
+    modo="serial"   → réplicas no processo principal, um ticker por vez
+    modo="paralelo" → lotes de `lote` réplicas num ProcessPoolExecutor,
+                      intercalando os tickers (lote 0 de todos, depois o 1...)
+                      para a parada antecipada cortar lotes ainda não enviados;
+                      no máximo 2 × max_workers lotes em andamento.
+    backend vai para ajustar_modelo; cada réplica parte da estimativa original.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"método de bootstrap desconhecido: {metodo}")
+    n_lotes = -(-B // lote)
+    acumuladores = [_Acumulador(n_lotes) for _ in especs]
+
+    def _tarefa(i, k):
+        return (especs[i], metodo, k, min(lote, B - k * lote), seed, backend, tamanho_bloco)
+
+    def _resumo(i):
+        acc = acumuladores[i]
+        return resumir(especs[i], acc.amostras(), metodo, B, nivel, acc.parou_cedo)
+
+    if modo == "serial":
+        for i, espec in enumerate(especs):
+            try:
+                for k in range(n_lotes):
+                    _, _, amostras = _replicas(*_tarefa(i, k))
+                    if acumuladores[i].receber(k, amostras, nivel, parada_antecipada, tol):
+                        break
+                resumo = _resumo(i)
+            except Exception as e:
+                yield espec['ticker'], None, e
+                continue
+            yield espec['ticker'], resumo, None
+        return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    falhos = set()
+    fila = ((i, k) for k in range(n_lotes) for i in range(len(especs)))
+    # "spawn" evita fork de um processo com threads (servidor Streamlit)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pendentes = {}
+
+        def _enviar():
+            for i, k in fila:
+                if acumuladores[i].terminou or i in falhos:
+                    continue  # ticker já encerrado: o lote nem chega ao pool
+                pendentes[pool.submit(_replicas, *_tarefa(i, k))] = (i, k)
+                return True
+            return False
+
+        try:
+            while len(pendentes) < 2 * max_workers and _enviar():
+                pass
+            while pendentes:
+                prontos, _ = wait(list(pendentes), return_when=FIRST_COMPLETED)
+                for fut in prontos:
+                    i, k = pendentes.pop(fut)
+                    saida = None
+                    # Lote além da parada antecipada (ou de ticker com erro): descartado
+                    if not (acumuladores[i].terminou or i in falhos):
+                        try:
+                            _, _, amostras = fut.result()
+                            if acumuladores[i].receber(k, amostras, nivel, parada_antecipada, tol):
+                                saida = (especs[i]['ticker'], _resumo(i), None)
+                        except Exception as e:
+                            # Falha do worker afeta só este ticker
+                            falhos.add(i)
+                            saida = (especs[i]['ticker'], None, e)
+                    _enviar()
+                    if saida is not None:
+                        yield saida
+        except GeneratorExit:
+            # Consumidor desistiu: só os lotes já em execução terminam
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+def executar_bootstrap(especs, ao_progredir=None, cancelado=None, **kwargs):
+    """
+    Bootstrap de todos os vencedores (ver iterar_bootstrap). ao_progredir(ticker,
+    concluidos, total, erro) a cada ticker; `cancelado` (threading.Event)
+    encerra depois do ticker atual. Retorna (resumos na ordem de `especs`,
+    {ticker: erro}).
+    """
+    resumos, erros = {}, {}
+    execucao = iterar_bootstrap(especs, **kwargs)
+    for ticker, resumo, erro in execucao:
+        if erro is None:
+            resumos[ticker] = resumo
+        else:
+            erros[ticker] = erro
+        if ao_progredir:
+            ao_progredir(ticker, len(resumos) + len(erros), len(especs), erro)
+        if cancelado is not None and cancelado.is_set():
+            execucao.close()
+            break
+    return [resumos[e['ticker']] for e in especs if e['ticker'] in resumos], erros
+
+# ==================== RELATÓRIO E CSV ====================
+def _intervalo(resumo, c):
+    # Ω de GARCH/GJR em fração fica na casa de 1e-6: notação científica
+    fmt = '.3e' if c == 'omega' and not resumo['model_name'].startswith('EGARCH') else '.4f'
+    lo, hi = resumo['ic'][c]
+    return f"{resumo['pontual'][c]:{fmt}} [{lo:{fmt}}, {hi:{fmt}}]"
+
+def _texto_regras(resumo):
+    """Regras com probabilidade > 0 (ou que disparam na estimativa, marcadas com *)"""
+    partes = [f"{rotulo}{'*' if rotulo in resumo['regras_pontuais'] else ''} {p:.0%}"
+              for rotulo, p in resumo['prob_regras'].items() if p > 0 or rotulo in resumo['regras_pontuais']]
+    return " · ".join(partes) or "-"
+
+def visao_bootstrap(resumos):
+    """Tabela para exibição (textos como no relatório), um ticker por linha"""
+    return pd.DataFrame([{
+        'Ativo': r['ativo'], 'Modelo': r['model_name'],
+        'B': f"{r['validas']}" + (" ↓" if r['parou_cedo'] else ""),
+        'Ω [IC]': _intervalo(r, 'omega'), 'α [IC]': _intervalo(r, 'alpha_total'),
+        'β [IC]': _intervalo(r, 'beta_total'), 'γ [IC]': _intervalo(r, 'gamma'),
+        'Regras (P nas réplicas)': _texto_regras(r),
+    } for r in resumos])
+
+def linhas_relatorio_bootstrap(resumos):
+    """Seção do relatório TXT com os ICs e a probabilidade de cada regra, um ticker por linha"""
+    if not resumos:
+        return []
+    width = LARGURA_RELATORIO
+    r0 = resumos[0]
+    metodo = "PARAMÉTRICO" if r0['metodo'] == 'parametrico' else "EM BLOCOS"
+    lines = []
+    lines.append(f"INCERTEZA DOS PARÂMETROS — BOOTSTRAP {metodo} (B = {r0['B_pedido']}, IC {r0['nivel']:.0%})")
+    lines.append("=" * width)
+    lines.append(f"{'Ativo':<8} {'Modelo':<16} {'B':<8} {'Ω [IC]':<36} {'α [IC]':<27} {'β [IC]':<27} "
+                 f"{'γ [IC]':<27} {'Regras (P nas réplicas)'}")
+    lines.append("=" * width)
+    for r in resumos:
+        b = f"{r['validas']}" + ("↓" if r['parou_cedo'] else "")
+        lines.append(f"{r['ativo']:<8} {r['model_name']:<16} {b:<8} {_intervalo(r, 'omega'):<36} "
+                     f"{_intervalo(r, 'alpha_total'):<27} {_intervalo(r, 'beta_total'):<27} "
+                     f"{_intervalo(r, 'gamma'):<27} {_texto_regras(r)}")
+    lines.append("=" * width)
+    lines.append("B = réplicas válidas (↓ = parada antecipada: larguras dos ICs estabilizadas)")
+    lines.append("P = fração das réplicas em que a regra dispara; * = dispara na estimativa pontual")
+    lines.append("Regras longe de 0% e de 100% estão na fronteira do limiar (ex.: β ≈ 0.98 → VOL DURA MUITO)")
+    lines.append("=" * width)
+    return lines
+
+def tabela_bootstrap(resumos):
+    """DataFrame (um ticker por linha) para o CSV do bootstrap"""
+    linhas = []
+    for r in resumos:
+        linha = {'Ativo': r['ativo'], 'Ticker': r['ticker'], 'Modelo': r['model_name'], 'Metodo': r['metodo'],
+                 'Nivel': r['nivel'], 'B': r['B'], 'B_Validas': r['validas'], 'Parou_Cedo': r['parou_cedo']}
+        for c, nome in COLUNAS_PARAMETROS.items():
+            linha[nome] = r['pontual'][c]
+            linha[f'{nome}_Lo'], linha[f'{nome}_Hi'] = r['ic'][c]
+            linha[f'{nome}_EP'] = r['erro_padrao'][c]
+        linha['Regras_Pontuais'] = " | ".join(r['regras_pontuais'])
+        linha['P_Regras'] = " | ".join(f"{rotulo}={p:.3f}" for rotulo, p in r['prob_regras'].items() if p > 0)
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
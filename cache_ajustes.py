@@ -0,0 +1,188 @@
+"""
+ASUS GARCH PRO 2025 - CACHE DE AJUSTES
+Resultados de ajuste memoizados por (ticker, hash da série, modelo, distribuição):
+LRU em memória + camada opcional em disco, ambas com limite de tamanho.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+
+FIT_CACHE_DIR = "fit_cache"
+VERSAO_CHAVE = "2"  # sobe quando o conteúdo da chave muda (entradas antigas deixam de casar)
+ALVO_DESPEJO = 0.9  # o despejo em disco desce até 90% do limite (não relista a cada gravação)
+
+def hash_serie(retornos):
+    """Hash do conteúdo da série (valores + datas), estável entre reruns"""
+    h = hashlib.sha256()
+    valores = getattr(retornos, 'y', None)  # EstatisticasRetorno do motor_garch
+    if valores is None:
+        valores = np.asarray(retornos, dtype=float)
+    h.update(np.ascontiguousarray(valores, dtype=float).tobytes())
+    index = getattr(retornos, 'index', None)
+    if index is not None:
+        h.update(np.asarray(index).astype('datetime64[ns]').view('int64').tobytes())
+    return h.hexdigest()
+
+def hash_semente(starting_values):
+    """Hash dos valores iniciais do otimizador ("" no ajuste a frio)"""
+    if starting_values is None:
+        return ""
+    return hashlib.sha256(np.ascontiguousarray(starting_values, dtype=float).tobytes()).hexdigest()
+
+def chave_ajuste(ticker, retornos, vol_type, p, o, q, dist='normal', backend='arch', starting_values=None):
+    """
+    Chave do cache: ticker + hash da série + especificação + distribuição +
+    motor + hash da semente (um warm start pode parar noutro ótimo que o
+    ajuste a frio, então não compartilham a entrada)
+    """
+    partes = [VERSAO_CHAVE, ticker or "", hash_serie(retornos), vol_type.upper(), str(p), str(o), str(q), dist,
+              backend, hash_semente(starting_values)]
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()
+
+class CacheAjustes:
+    """
+    LRU em memória limitado por bytes (tamanho do pickle de cada resultado).
+    Com `diretorio`, os resultados também vão para <diretorio>/<chave>.pkl;
+    quando o disco passa de `max_bytes_disco`, os arquivos menos usados saem.
+    O diretório é listado uma vez na criação; depois o total em disco é
+    mantido a cada gravação e só é relistado quando passa do limite (o
+    despejo então desce até ALVO_DESPEJO do limite).
+    Thread-safe (sessões Streamlit compartilham a mesma instância).
+    """
+
+    def __init__(self, max_bytes_memoria=64 * 2**20, diretorio=None, max_bytes_disco=512 * 2**20):
+        self.max_bytes_memoria = max_bytes_memoria
+        self.diretorio = diretorio
+        self.max_bytes_disco = max_bytes_disco
+        self._memoria = OrderedDict()  # chave -> (bytes, tamanho)
+        self._bytes_memoria = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self._tamanhos_disco = {}  # nome do .pkl -> bytes
+        self._bytes_disco = 0
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+            self._listar_disco()
+
+    # ---------- memória ----------
+    def _guardar_memoria(self, chave, dados):
+        if chave in self._memoria:
+            self._bytes_memoria -= self._memoria.pop(chave)[1]
+        if len(dados) > self.max_bytes_memoria:
+            return
+        self._memoria[chave] = (dados, len(dados))
+        self._bytes_memoria += len(dados)
+        while self._bytes_memoria > self.max_bytes_memoria:
+            _, (_, tam) = self._memoria.popitem(last=False)
+            self._bytes_memoria -= tam
+
+    # ---------- disco ----------
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.pkl")
+
+    def _guardar_disco(self, chave, dados):
+        caminho = self._caminho(chave)
+        tmp = caminho + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(dados)
+        os.replace(tmp, caminho)
+        nome = os.path.basename(caminho)
+        self._bytes_disco += len(dados) - self._tamanhos_disco.get(nome, 0)
+        self._tamanhos_disco[nome] = len(dados)
+        if self._bytes_disco > self.max_bytes_disco:
+            self._despejar_disco()
+
+    def _listar_disco(self):
+        """(mtime, tamanho, nome) de cada .pkl; ressincroniza o total em disco"""
+        arquivos = []
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith('.pkl'):
+                try:
+                    st = os.stat(os.path.join(self.diretorio, nome))
+                except OSError:
+                    continue  # removido por outro processo no meio da listagem
+                arquivos.append((st.st_mtime, st.st_size, nome))
+        self._tamanhos_disco = {nome: tam for _, tam, nome in arquivos}
+        self._bytes_disco = sum(self._tamanhos_disco.values())
+        return arquivos
+
+    def _despejar_disco(self):
+        # Relista: outros processos podem ter gravado no mesmo diretório
+        alvo = ALVO_DESPEJO * self.max_bytes_disco
+        for _, tam, nome in sorted(self._listar_disco()):
+            if self._bytes_disco <= alvo:
+                break
+            try:
+                os.remove(os.path.join(self.diretorio, nome))
+            except OSError:
+                pass
+            if self._tamanhos_disco.pop(nome, None) is not None:
+                self._bytes_disco -= tam
+
+    def _ler_disco(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                dados = f.read()
+            os.utime(caminho)  # marca como usado recentemente (ordem do despejo)
+            return dados
+        except OSError:
+            return None
+
+    # ---------- API ----------
+    def obter(self, chave, padrao=None):
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                self.acertos += 1
+                return pickle.loads(self._memoria[chave][0])
+            dados = self._ler_disco(chave) if self.diretorio else None
+            if dados is not None:
+                try:
+                    valor = pickle.loads(dados)
+                except Exception:
+                    valor = None
+                if valor is not None:
+                    self._guardar_memoria(chave, dados)
+                    self.acertos += 1
+                    return valor
+            self.faltas += 1
+            return padrao
+
+    def guardar(self, chave, valor):
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._guardar_memoria(chave, dados)
+            if self.diretorio:
+                self._guardar_disco(chave, dados)
+
+    def obter_ou_calcular(self, chave, calcular):
+        valor = self.obter(chave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._memoria.clear()
+            self._bytes_memoria = 0
+            if self.diretorio:
+                for nome in os.listdir(self.diretorio):
+                    if nome.endswith('.pkl'):
+                        os.remove(os.path.join(self.diretorio, nome))
+                self._tamanhos_disco.clear()
+                self._bytes_disco = 0
+
+    def estatisticas(self):
+        return {
+            'itens_memoria': len(self._memoria),
+            'bytes_memoria': self._bytes_memoria,
+            'acertos': self.acertos,
+            'faltas': self.faltas,
+        }
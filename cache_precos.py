@@ -0,0 +1,134 @@
+"""
+ASUS GARCH PRO 2025 - CACHE LOCAL DE PREÇOS
+Parquet por ticker + busca incremental só das datas que faltam (início/fim)
+"""
+
+import json
+import os
+import re
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from coordenacao import LIMITE_DOWNLOADS
+
+PRICE_CACHE_DIR = "price_cache"
+
+# ==================== PROVEDORES DE DADOS ====================
+class ProvedorYahoo:
+    """Provedor padrão: fechamentos diários ajustados do Yahoo Finance"""
+
+    def baixar(self, ticker, inicio, fim):
+        """Retorna pd.Series de fechamentos em [inicio, fim) (fim exclusivo)"""
+        import yfinance as yf  # importado sob demanda (início rápido do app)
+        df = yf.download(ticker, start=inicio, end=fim, progress=False, auto_adjust=True)
+        if df is None or df.empty:
+            return pd.Series(dtype=float, name='Close')
+        close = df['Close']
+        if isinstance(close, pd.DataFrame):
+            close = close.iloc[:, 0]
+        return close.dropna().rename('Close')
+
+# Qualquer objeto com .baixar(ticker, inicio, fim) -> pd.Series serve como
+# provedor (ex.: um provedor falso local para testes, sem acesso à internet).
+
+# ==================== CACHE EM DISCO ====================
+class CachePrecos:
+    """
+    Guarda o histórico já baixado em <diretorio>/<ticker>.parquet, junto com
+    o intervalo coberto (metadado do arquivo). Cada pedido busca no provedor
+    apenas o pedaço anterior (cabeça) e/ou posterior (cauda) ao já coberto.
+
+    offline=True → nunca chama o provedor, responde só com o que está no disco.
+    """
+
+    def __init__(self, diretorio=PRICE_CACHE_DIR, provedor=None, offline=False):
+        self.diretorio = diretorio
+        self.provedor = provedor or ProvedorYahoo()
+        self.offline = offline
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, ticker):
+        nome = re.sub(r'[^A-Za-z0-9._-]', '_', ticker)
+        return os.path.join(self.diretorio, f"{nome}.parquet")
+
+    def ler(self, ticker):
+        """Retorna (serie, (cob_inicio, cob_fim)) do disco, ou (None, None)"""
+        caminho = self._caminho(ticker)
+        if not os.path.exists(caminho):
+            return None, None
+        try:
+            tabela = pq.read_table(caminho)
+            meta = json.loads(tabela.schema.metadata[b'cobertura'])
+            serie = tabela.to_pandas()['Close']
+            return serie, (pd.Timestamp(meta['inicio']), pd.Timestamp(meta['fim']))
+        except Exception:
+            # Arquivo corrompido/antigo → trata como cache vazio
+            return None, None
+
+    def _gravar(self, ticker, serie, cobertura):
+        caminho = self._caminho(ticker)
+        tabela = pa.Table.from_pandas(serie.to_frame('Close'))
+        meta = dict(tabela.schema.metadata or {})
+        meta[b'cobertura'] = json.dumps({
+            'inicio': cobertura[0].strftime('%Y-%m-%d'),
+            'fim': cobertura[1].strftime('%Y-%m-%d')
+        }).encode()
+        tmp = caminho + ".tmp"
+        pq.write_table(tabela.replace_schema_metadata(meta), tmp)
+        os.replace(tmp, caminho)  # escrita atômica
+
+    def obter(self, ticker, inicio, fim):
+        """Fechamentos em [inicio, fim), buscando no provedor só o que falta"""
+        inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+        serie, cobertura = self.ler(ticker)
+
+        if not self.offline:
+            # O pregão de hoje ainda pode mudar → nunca conta como coberto
+            fim_coberto = min(fim, pd.Timestamp.today().normalize())
+            faltando = []
+            if cobertura is None:
+                faltando.append(('tudo', inicio, fim))
+            else:
+                if inicio < cobertura[0]:
+                    faltando.append(('inicio', inicio, cobertura[0]))
+                if fim > cobertura[1]:
+                    faltando.append(('fim', cobertura[1], fim))
+
+            if faltando:
+                novos = []
+                for lado, a, b in faltando:
+                    with LIMITE_DOWNLOADS:  # limite de chamadas ao provedor do processo inteiro
+                        novo = self.provedor.baixar(ticker, a.strftime('%Y-%m-%d'), b.strftime('%Y-%m-%d'))
+                    novos.append(novo)
+                    # Vazio em dias úteis = falha do provedor (o Yahoo devolve vazio em erro
+                    # transitório) → a cobertura não avança e o trecho é pedido de novo. A
+                    # exceção é a cabeça que termina antes do primeiro pregão já guardado: ali
+                    # o vazio é o ativo ainda não listado, e sem cobrir seria pedida para sempre
+                    antes_da_listagem = (lado == 'inicio' and serie is not None and len(serie)
+                                         and b <= serie.index[0])
+                    if ((novo is None or not len(novo)) and not antes_da_listagem
+                            and len(pd.bdate_range(a, b - pd.Timedelta(days=1)))):
+                        continue
+                    if lado == 'tudo':
+                        cobertura = (inicio, max(fim_coberto, inicio))
+                    elif lado == 'inicio':
+                        cobertura = (inicio, cobertura[1])
+                    else:
+                        cobertura = (cobertura[0], max(cobertura[1], fim_coberto))
+                partes = [s for s in novos if s is not None and len(s)]
+                if serie is not None:
+                    partes.append(serie)
+                if partes:
+                    # keep='first' → dado recém-baixado prevalece sobre o antigo
+                    serie = pd.concat(partes)
+                    serie = serie[~serie.index.duplicated(keep='first')].sort_index()
+                    serie.name = 'Close'
+                if serie is not None and cobertura is not None:
+                    with self._lock:
+                        self._gravar(ticker, serie, cobertura)
+
+        if serie is None:
+            raise ValueError(f"{ticker} sem dados no cache local")
+        return serie[(serie.index >= inicio) & (serie.index < fim)]
@@ -0,0 +1,155 @@
+"""
+ASUS GARCH PRO 2025 - COORDENAÇÃO ENTRE SESSÕES
+Camada do processo inteiro (compartilhada por todas as sessões Streamlit e
+tarefas em segundo plano): pedidos idênticos em voo — mesmo download
+(ticker + janela) ou mesmo ajuste (série + especificação) — esperam uma única
+execução e recebem o mesmo resultado (single-flight), e os downloads no
+provedor têm um limite global de concorrência. Nada é memoizado aqui: depois
+que a execução termina, quem guarda o resultado são os caches de preços e
+de ajustes.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, CancelledError
+
+MAX_DOWNLOADS_GLOBAL = 8  # chamadas simultâneas ao provedor, somando todas as sessões
+
+class VooUnico:
+    """
+    Single-flight por chave: a primeira chamada executa (líder) e as que
+    chegam enquanto ela está em voo esperam o mesmo Future. `copiar` é
+    aplicado ao resultado entregue a cada chamador (ex.: dict, para que uma
+    sessão possa alterar o seu sem afetar as outras). Thread-safe.
+    """
+
+    def __init__(self, copiar=None):
+        self.copiar = copiar
+        self._lock = threading.Lock()
+        self._em_voo = {}  # chave -> Future
+        self.execucoes = 0
+        self.compartilhados = 0
+        self.espera_s = 0.0
+        self.pico_em_voo = 0
+
+    def compartilhar(self, chave, criar=Future):
+        """
+        Future da execução em voo para `chave`; sem nenhuma, o de criar()
+        passa a ser a execução da chave. Retorna (future, lider).
+        """
+        with self._lock:
+            fut = self._em_voo.get(chave)
+            if fut is not None:
+                self.compartilhados += 1
+                return fut, False
+            fut = criar()
+            self._em_voo[chave] = fut
+            self.execucoes += 1
+            self.pico_em_voo = max(self.pico_em_voo, len(self._em_voo))
+        fut.add_done_callback(lambda f: self._pousar(chave, f))
+        return fut, True
+
+    def _pousar(self, chave, fut):
+        with self._lock:
+            if self._em_voo.get(chave) is fut:
+                del self._em_voo[chave]
+
+    def executar(self, chave, funcao, *args, **kwargs):
+        """funcao(*args, **kwargs), ou o resultado (ou exceção) da execução idêntica já em voo"""
+        fut, lider = self.compartilhar(chave)
+        if lider:
+            try:
+                fut.set_result(funcao(*args, **kwargs))
+            except BaseException as e:
+                fut.set_exception(e)
+        else:
+            t0 = time.perf_counter()
+            try:
+                fut.result()
+            except BaseException:
+                pass
+            finally:
+                with self._lock:
+                    self.espera_s += time.perf_counter() - t0
+        resultado = fut.result()
+        return self.copiar(resultado) if self.copiar else resultado
+
+    def estatisticas(self):
+        with self._lock:
+            pedidos = self.execucoes + self.compartilhados
+            return {'execucoes': self.execucoes, 'compartilhados': self.compartilhados,
+                    'taxa_compartilhada': self.compartilhados / pedidos if pedidos else 0.0,
+                    'espera_s': self.espera_s, 'em_voo': len(self._em_voo), 'pico_em_voo': self.pico_em_voo}
+
+class LimiteConcorrencia:
+    """
+    Semáforo com estatísticas (use com `with`): no máximo `maximo` blocos
+    ao mesmo tempo no processo; os demais esperam uma vaga.
+    """
+
+    def __init__(self, maximo=MAX_DOWNLOADS_GLOBAL):
+        self.maximo = maximo
+        self._semaforo = threading.BoundedSemaphore(maximo)
+        self._lock = threading.Lock()
+        self.em_uso = 0
+        self.pico = 0
+        self.chamadas = 0
+        self.esperas = 0
+        self.espera_s = 0.0
+
+    def __enter__(self):
+        t0 = time.perf_counter()
+        esperou = not self._semaforo.acquire(blocking=False)
+        if esperou:
+            self._semaforo.acquire()
+        with self._lock:
+            self.chamadas += 1
+            self.em_uso += 1
+            self.pico = max(self.pico, self.em_uso)
+            if esperou:
+                self.esperas += 1
+                self.espera_s += time.perf_counter() - t0
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.em_uso -= 1
+        self._semaforo.release()
+        return False
+
+    def estatisticas(self):
+        with self._lock:
+            return {'maximo': self.maximo, 'em_uso': self.em_uso, 'pico': self.pico, 'chamadas': self.chamadas,
+                    'esperas': self.esperas, 'espera_s': self.espera_s}
+
+def espelhar(fut, transformar=None):
+    """
+    Future próprio que termina junto com `fut`, com transformar(resultado)
+    ou a mesma exceção (CancelledError se `fut` foi cancelado). Permite que
+    vários consumidores esperem a mesma execução em voo cada um com o seu.
+    """
+    espelho = Future()
+
+    def _repassar(f):
+        if f.cancelled():
+            espelho.set_exception(CancelledError())
+        elif f.exception() is not None:
+            espelho.set_exception(f.exception())
+        else:
+            try:
+                espelho.set_result(transformar(f.result()) if transformar else f.result())
+            except Exception as e:
+                espelho.set_exception(e)
+
+    fut.add_done_callback(_repassar)
+    return espelho
+
+# ==================== INSTÂNCIAS DO PROCESSO ====================
+VOO_DOWNLOADS = VooUnico()
+VOO_AJUSTES = VooUnico(copiar=dict)
+LIMITE_DOWNLOADS = LimiteConcorrencia()
+
+def estatisticas_coordenacao():
+    """{'downloads': ..., 'ajustes': ..., 'provedor': ...} do processo"""
+    return {'downloads': VOO_DOWNLOADS.estatisticas(), 'ajustes': VOO_AJUSTES.estatisticas(),
+            'provedor': LIMITE_DOWNLOADS.estatisticas()}
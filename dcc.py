@@ -0,0 +1,142 @@
+"""
+ASUS GARCH PRO 2025 - CORRELAÇÃO DINÂMICA (DCC-GARCH)
+DCC(1,1) de Engle sobre os resíduos padronizados dos vencedores univariados:
+    Q_t = (1 - a - b)·Q̄ + a·z_{t-1} z_{t-1}' + b·Q_{t-1},   R_t = diag(Q_t)^-½ Q_t diag(Q_t)^-½
+(a, b) saem da verossimilhança composta dos pares adjacentes (Engle,
+Shephard & Sheppard), que escala para centenas de ativos sem inverter
+matrizes N × N; a recursão desses pares roda como um único filtro IIR
+(lfilter). Como Q_t é linear nos z z', o Q do início do trecho guardado sai
+de um produto de matrizes e só os últimos dias passam pela recursão na
+matriz inteira. O caminho das correlações é guardado em float32, só no
+triângulo superior (ou num np.memmap em disco).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+DIAS_CAMINHO = 60
+
+# ==================== DADOS ====================
+def alinhar_residuos(resultados):
+    """Resíduos padronizados dos resultados do Analyzer nas datas comuns → DataFrame (dias × ativos)"""
+    series = {r['ativo']: r['residuos_padronizados'] for r in resultados
+              if r.get('residuos_padronizados') is not None}
+    if len(series) < 2:
+        raise ValueError("DCC precisa de pelo menos 2 ativos com resíduos")
+    return pd.concat(series, axis=1, join='inner').dropna().astype(float)
+
+def simular_dcc(n, n_ativos, a=0.04, b=0.93, seed=0):
+    """Resíduos padronizados sintéticos de um DCC(1,1) com Q̄ de correlação ~0.3"""
+    rng = np.random.default_rng(seed)
+    fator = rng.uniform(0.3, 0.8, n_ativos)
+    qbar = np.outer(fator, fator)
+    np.fill_diagonal(qbar, 1.0)
+    Q, Z = qbar.copy(), np.empty((n, n_ativos))
+    for t in range(n):
+        d = 1 / np.sqrt(np.diag(Q))
+        R = Q * np.outer(d, d)
+        Z[t] = np.linalg.cholesky(R) @ rng.standard_normal(n_ativos)
+        Q = (1 - a - b) * qbar + a * np.outer(Z[t], Z[t]) + b * Q
+    return Z
+
+# ==================== VEROSSIMILHANÇA COMPOSTA ====================
+def _q_pares(Z, i, j, a, b, qbar):
+    """q_ij,t dos pares (i, j) via lfilter: dias × pares (primeiro dia = Q̄)"""
+    X = Z[:-1, i] * Z[:-1, j]
+    u = (1 - a - b) * qbar + a * X
+    resto = lfilter([1.0], [1.0, -b], u, axis=0, zi=(b * qbar)[None, :])[0]
+    return np.vstack([qbar[None, :], resto])
+
+def _loglik_composta(theta, Z, i, j, qbar_ij, qbar_ii, qbar_jj):
+    """Soma das log-verossimilhanças bivariadas (sem constantes) dos pares (i, j)"""
+    a, b = theta
+    q_ij = _q_pares(Z, i, j, a, b, qbar_ij)
+    q_ii = _q_pares(Z, i, i, a, b, qbar_ii)
+    q_jj = _q_pares(Z, j, j, a, b, qbar_jj)
+    rho = np.clip(q_ij / np.sqrt(q_ii * q_jj), -0.9999, 0.9999)
+    zi, zj = Z[:, i], Z[:, j]
+    um_menos = 1 - rho ** 2
+    return -0.5 * np.sum(np.log(um_menos) + (zi ** 2 + zj ** 2 - 2 * rho * zi * zj) / um_menos)
+
+class ResultadoDCC:
+    """a, b, Q̄, última matriz de correlação e caminho (float32, triângulo superior)"""
+
+    def __init__(self, ativos, a, b, qbar, correlacao_final, caminho, datas_caminho, loglik, nit, convergiu):
+        self.ativos = list(ativos)
+        self.a, self.b = a, b
+        self.qbar = qbar
+        self.correlacao_final = correlacao_final
+        self.caminho = caminho
+        self.datas_caminho = datas_caminho
+        self.loglik = loglik
+        self.nit = nit
+        self.convergiu = convergiu
+
+    def matriz(self, k=-1):
+        """Matriz de correlação no k-ésimo dia guardado do caminho"""
+        n = len(self.ativos)
+        i, j = np.triu_indices(n, 1)
+        R = np.eye(n)
+        R[i, j] = R[j, i] = self.caminho[k]
+        return R
+
+    def correlacao_df(self):
+        return pd.DataFrame(self.correlacao_final, index=self.ativos, columns=self.ativos)
+
+def ajustar_dcc(residuos, dias_caminho=DIAS_CAMINHO, arquivo_caminho=None, sv=(0.03, 0.95)):
+    """
+    DCC(1,1) sobre `residuos` (DataFrame dias × ativos, já padronizados).
+    dias_caminho: dias finais do caminho guardados em float32 (None = todos);
+    arquivo_caminho: grava o caminho num np.memmap em vez de na memória.
+    """
+    Z = np.ascontiguousarray(residuos.values, dtype=float)
+    T, n = Z.shape
+    qbar = Z.T @ Z / T
+
+    # (a, b) pela verossimilhança composta dos pares adjacentes
+    i, j = np.arange(n - 1), np.arange(1, n)
+    args = (Z, i, j, qbar[i, j], qbar[i, i], qbar[j, j])
+    opt = minimize(lambda th: -_loglik_composta(th, *args), sv, method='SLSQP',
+                   bounds=[(0.0, 1.0), (0.0, 1.0)],
+                   constraints=[{'type': 'ineq', 'fun': lambda th: 0.9999 - th[0] - th[1]}])
+    a, b = (float(x) for x in opt.x)
+
+    # Q no início do trecho guardado em forma fechada: a soma ponderada
+    # Σ b^(s-1-k)·z_k z_k' de todos os pares é um único produto de matrizes
+    dias = T if dias_caminho is None else min(dias_caminho, T)
+    s0 = T - dias  # índice (base 0) do primeiro dia guardado
+    w = a * b ** np.arange(s0 - 1, -1, -1.0)
+    Q = (b ** s0 + (1 - a - b) * (1 - b ** s0) / (1 - b)) * qbar + (Z[:s0] * w[:, None]).T @ Z[:s0]
+
+    # Daí em diante, a recursão na matriz inteira (todos os pares por passo)
+    I, J = np.triu_indices(n, 1)
+    if arquivo_caminho:
+        caminho = np.lib.format.open_memmap(arquivo_caminho, mode='w+', dtype=np.float32, shape=(dias, len(I)))
+    else:
+        caminho = np.empty((dias, len(I)), dtype=np.float32)
+    c = (1 - a - b) * qbar
+    for k, t in enumerate(range(s0, T)):
+        d = 1 / np.sqrt(np.diag(Q))
+        caminho[k] = Q[I, J] * d[I] * d[J]
+        Q = c + a * np.outer(Z[t], Z[t]) + b * Q
+    # Após o último dia: Q_{T+1}, a correlação prevista para o próximo pregão
+    d = 1 / np.sqrt(np.diag(Q))
+    final = Q * np.outer(d, d)
+    if arquivo_caminho:
+        caminho.flush()
+
+    return ResultadoDCC(residuos.columns, a, b, qbar, final, caminho, residuos.index[-dias:],
+                        float(-opt.fun), int(opt.nit), opt.status == 0)
+
+def ajustar_dcc_resultados(resultados, **kwargs):
+    """alinhar_residuos + ajustar_dcc a partir da saída do executar_analyzer"""
+    return ajustar_dcc(alinhar_residuos(resultados), **kwargs)
+
+# ==================== EXPORTAÇÃO ====================
+def exportar_correlacao(dcc, destino=None):
+    """Matriz mais recente em CSV (';', UTF-8 com BOM, como o CSV do MT5); sem destino, retorna o texto"""
+    df = dcc.correlacao_df()
+    df.index.name = 'Ativo'
+    return df.to_csv(destino, sep=';', encoding='utf-8-sig', float_format='%.6f')
@@ -0,0 +1,94 @@
+"""
+ASUS GARCH PRO 2025 - DIAGNÓSTICOS EM LOTE
+Ljung-Box (e ARCH-LM opcional) para todos os candidatos de um ticker de uma
+vez: as autocorrelações de todas as linhas saem de uma única FFT. Mesmos
+números do statsmodels (acorr_ljungbox / acorr_lm), sem um DataFrame por
+modelo.
+"""
+
+import numpy as np
+from scipy import stats
+
+# ==================== AUTOCORRELAÇÕES ====================
+def autocorrelacoes_fft(X, nlags):
+    """
+    ACF (como statsmodels.acf, adjusted=False) de cada linha de X (m × n),
+    lags 0..nlags, via FFT com zero-padding. Retorna array m × (nlags + 1).
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    n = X.shape[1]
+    Xc = X - X.mean(axis=1, keepdims=True)
+    nfft = 1 << int(np.ceil(np.log2(2 * n - 1)))
+    F = np.fft.rfft(Xc, n=nfft, axis=1)
+    acov = np.fft.irfft(F * np.conj(F), n=nfft, axis=1)[:, :nlags + 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return acov / acov[:, :1]
+
+# ==================== TESTES ====================
+def _como_linhas(series):
+    """Lista de 1-D arrays (ou array 2-D) → lista de arrays float"""
+    if isinstance(series, np.ndarray) and series.ndim == 2:
+        return list(series)
+    return [np.asarray(s, dtype=float) for s in series]
+
+def ljung_box_lote(series, lags=(20,), model_df=0):
+    """
+    Ljung-Box de várias séries (ex.: z² de cada candidato). `series` é um
+    array m × n ou uma lista de 1-D arrays (séries de tamanhos diferentes
+    são agrupadas por tamanho, uma FFT por grupo). Retorna (estatisticas,
+    pvalores), ambos m × len(lags); linhas inválidas (NaN/constantes) → NaN.
+    """
+    linhas = _como_linhas(series)
+    lags = np.atleast_1d(np.asarray(lags, dtype=int))
+    estat = np.full((len(linhas), len(lags)), np.nan)
+    for n in {len(x) for x in linhas}:
+        idx = [i for i, x in enumerate(linhas) if len(x) == n]
+        maxlag = int(lags.max())
+        if n <= maxlag:
+            continue
+        X = np.vstack([linhas[i] for i in idx])
+        acf = autocorrelacoes_fft(X, maxlag)
+        acum = np.cumsum(acf[:, 1:] ** 2 / (n - np.arange(1, maxlag + 1)), axis=1)
+        estat[idx] = n * (n + 2) * acum[:, lags - 1]
+    gl = lags - model_df
+    pval = np.full_like(estat, np.nan)
+    ok = np.isfinite(estat) & (gl > 0)
+    pval[ok] = stats.chi2.sf(estat[ok], np.broadcast_to(gl, estat.shape)[ok])
+    return estat, pval
+
+def arch_lm_lote(series, nlags=5, ddof=0):
+    """
+    Teste ARCH-LM de Engle (como statsmodels.acorr_lm) em cada série: regressão
+    de x_t em 1, x_{t-1..t-nlags}; LM = (nobs - ddof)·R². Passe os quadrados
+    (ex.: z²) para testar efeito ARCH remanescente. Retorna (lm, pvalores).
+    """
+    linhas = _como_linhas(series)
+    lm = np.full(len(linhas), np.nan)
+    for n in {len(x) for x in linhas}:
+        idx = [i for i, x in enumerate(linhas) if len(x) == n]
+        nobs = n - nlags
+        if nobs <= nlags + 1:
+            continue
+        X = np.vstack([linhas[i] for i in idx])
+        y = X[:, nlags:]
+        # Regressores defasados de todas as séries: m × nobs × (nlags + 1)
+        R = np.stack([np.ones_like(y)] + [X[:, nlags - k:n - k] for k in range(1, nlags + 1)], axis=2)
+        RtR = np.einsum('mti,mtj->mij', R, R)
+        Rty = np.einsum('mti,mt->mi', R, y)
+        with np.errstate(invalid='ignore'):
+            try:
+                beta = np.linalg.solve(RtR, Rty[..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                beta = np.stack([np.linalg.lstsq(a, b, rcond=None)[0] for a, b in zip(RtR, Rty)])
+            resid = y - np.einsum('mti,mi->mt', R, beta)
+            yc = y - y.mean(axis=1, keepdims=True)
+            r2 = 1 - np.sum(resid ** 2, axis=1) / np.sum(yc ** 2, axis=1)
+        lm[idx] = (nobs - ddof) * r2
+    pval = np.full_like(lm, np.nan)
+    ok = np.isfinite(lm)
+    pval[ok] = stats.chi2.sf(lm[ok], nlags)
+    return lm, pval
+
+def lags_ljung_box(n, lags=20):
+    """Mesma regra do ljung_box_test: séries curtas usam n // 4 lags"""
+    return lags if n >= lags * 2 else max(1, n // 4)
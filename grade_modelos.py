@@ -0,0 +1,131 @@
+"""
+ASUS GARCH PRO 2025 - GRADE DE MODELOS E BUSCA PODADA
+Grade configurável de especificações (vol, p, o, q, nome[, dist]) — a sexta
+posição é a distribuição dos erros ('normal' quando omitida, como nas seis
+de MODELOS_ANALYZER) — e a configuração da busca podada usada por
+analyzer.selecionar_melhor_modelo em grades grandes.
+"""
+
+import motor_garch
+
+DISTRIBUICOES = ('normal', 't', 'skewt')
+SUFIXO_DIST = {'normal': "", 't': "-t", 'skewt': "-skewt"}
+PARAMS_DIST = {'normal': [], 't': ['nu'], 'skewt': ['eta', 'lambda']}  # nomes do arch
+VALOR_INICIAL_DIST = {'nu': 8.0, 'eta': 8.0, 'lambda': 0.0}
+EQUIVALENTE_DIST = {'eta': 'nu'}  # graus de liberdade da t servem de semente para a skew-t
+FRACAO_LAG_NOVO = 0.2  # parcela da soma dos lags do pai que vai para os lags novos do filho
+
+# ==================== ESPECIFICAÇÕES ====================
+def dist_modelo(modelo):
+    """Distribuição de uma especificação da grade"""
+    return modelo[5] if len(modelo) > 5 else 'normal'
+
+def nome_modelo(vol, p, o, q, dist='normal'):
+    """Nome de exibição no padrão de MODELOS_ANALYZER (+ sufixo da distribuição)"""
+    if vol == 'GARCH':
+        base = f"GARCH({p},{q})"
+    elif vol == 'EGARCH':
+        base = f"EGARCH({p},{q})" if o == 1 else f"EGARCH({p},{o},{q})"
+    else:
+        base = f"GJR-GARCH({p},{o},{q})"
+    return base + SUFIXO_DIST[dist]
+
+def nomes_parametros(p, o, q, dist='normal'):
+    """Layout do arch: mu, omega, alpha..., gamma..., beta... e os parâmetros da distribuição"""
+    return motor_garch.nomes_parametros(p, o, q) + PARAMS_DIST[dist]
+
+def valor_inicial(params, nome):
+    """Valor de `nome` em params (Series/dict) para semente; termos ausentes partem de 0"""
+    if nome in params:
+        return float(params[nome])
+    if EQUIVALENTE_DIST.get(nome) in params:
+        return float(params[EQUIVALENTE_DIST[nome]])
+    return VALOR_INICIAL_DIST.get(nome, 0.0)
+
+def _lags(params, nome):
+    valores, i = [], 1
+    while f'{nome}[{i}]' in params:
+        valores.append(float(params[f'{nome}[{i}]']))
+        i += 1
+    return valores
+
+def _repartir(valores, n):
+    """n coeficientes com a mesma soma de `valores`: os lags novos ficam com FRACAO_LAG_NOVO dela"""
+    novos = n - len(valores)
+    if not valores or novos <= 0:
+        return valores[:n]
+    total = sum(valores)
+    return [v * (1 - FRACAO_LAG_NOVO) for v in valores] + [total * FRACAO_LAG_NOVO / novos] * novos
+
+def semente_aninhada(params_pai, vol, p, o, q, dist='normal'):
+    """
+    Valores iniciais do filho a partir das estimativas do pai aninhado. Os
+    termos novos não partem de 0 — ali o otimizador fica no ótimo do pai —:
+    lags novos recebem FRACAO_LAG_NOVO da soma dos existentes, e o γ novo do
+    GJR vale metade da soma dos α (que cedem 1/4: α + γ/2 + β não muda); no
+    EGARCH, γ novo = -Σα/4 (sinal usual da alavancagem).
+    """
+    alpha, gamma, beta = (_lags(params_pai, nome) for nome in ('alpha', 'gamma', 'beta'))
+    if o and not gamma:
+        soma = sum(alpha)
+        if vol.upper() == 'EGARCH':
+            gamma = [-soma / 4]
+        else:
+            alpha, gamma = [a * 0.75 for a in alpha], [soma / 2]
+    valores = {}
+    for nome, lista, n in (('alpha', alpha, p), ('gamma', gamma, o), ('beta', beta, q)):
+        valores.update({f'{nome}[{i}]': v for i, v in enumerate(_repartir(lista, n), 1)})
+    return [valores[nome] if nome in valores else valor_inicial(params_pai, nome)
+            for nome in nomes_parametros(p, o, q, dist)]
+
+def montar_grade(vols=('GARCH', 'EGARCH', 'GJR'), max_p=1, max_q=1, dists=('normal',)):
+    """
+    Grade com p = 1..max_p e q = 1..max_q para cada vol e distribuição
+    (o = 1 nos assimétricos). Ordenada por número de lags e distribuição:
+    o pai aninhado de cada modelo vem antes dele.
+    """
+    grade = []
+    for dist in dists:
+        for vol in vols:
+            o = 0 if vol == 'GARCH' else 1
+            for p in range(1, max_p + 1):
+                for q in range(1, max_q + 1):
+                    modelo = (vol, p, o, q, nome_modelo(vol, p, o, q, dist))
+                    grade.append(modelo if dist == 'normal' else modelo + (dist,))
+    return sorted(grade, key=lambda m: (sum(m[1:4]), DISTRIBUICOES.index(dist_modelo(m))))
+
+GRADE_ESTENDIDA = montar_grade(max_p=3, max_q=3, dists=DISTRIBUICOES)  # 81 modelos
+
+# ==================== BUSCA PODADA ====================
+class BuscaPodada:
+    """
+    Estratégia de selecionar_melhor_modelo para grades grandes:
+    - subamostra: triagem nos últimos N retornos (None = sem triagem); só os
+      `finalistas` de menor AIC da triagem (e o melhor de cada vol) são
+      ajustados na série inteira, partindo dos parâmetros da triagem; dali a
+      busca sobe pelas extensões do melhor enquanto o AIC cai, olhando até
+      `paciencia` passos à frente antes de parar;
+    - parar_sem_melhora: um modelo cujo AIC não melhorou o do seu pai aninhado
+      não tem suas ordens (nem sua distribuição) expandidas;
+    - pular_pai_falho: especificações cujo pai aninhado não convergiu não são
+      ajustadas.
+    """
+
+    def __init__(self, subamostra=750, finalistas=6, parar_sem_melhora=True, pular_pai_falho=True, paciencia=2):
+        self.subamostra = subamostra
+        self.finalistas = finalistas
+        self.paciencia = paciencia
+        self.parar_sem_melhora = parar_sem_melhora
+        self.pular_pai_falho = pular_pai_falho
+
+    def __repr__(self):
+        return (f"BuscaPodada(subamostra={self.subamostra}, finalistas={self.finalistas}, "
+                f"parar_sem_melhora={self.parar_sem_melhora}, pular_pai_falho={self.pular_pai_falho}, "
+                f"paciencia={self.paciencia})")
+
+MOTIVOS_PODA = {
+    'pai_nao_convergiu': "pai aninhado não convergiu",
+    'sem_melhora_aic': "pai não melhorou o AIC",
+    'pai_podado': "pai aninhado podado",
+    'triagem': "eliminado na triagem",
+}
@@ -0,0 +1,71 @@
+"""
+ASUS GARCH PRO 2025 - GRÁFICOS
+Volatilidade condicional reduzida com LTTB (Largest-Triangle-Three-Buckets)
+antes de plotar e renderizada em PNG numa Figure avulsa — fora do registro
+do pyplot, então nada fica acumulado no processo do servidor. O cache por
+(ticker, modelo, janela) fica no app (st.cache_data).
+"""
+
+import io
+import numpy as np
+import pandas as pd
+
+MAX_PONTOS_GRAFICO = 800
+
+# ==================== REDUÇÃO (LTTB) ====================
+def lttb(y, n_pontos, x=None):
+    """
+    Índices dos `n_pontos` pontos de y escolhidos pelo LTTB: o primeiro, o
+    último e, em cada balde, o que forma o maior triângulo com o ponto já
+    escolhido e a média do balde seguinte (preserva picos e vales).
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_pontos >= n or n_pontos < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    bordas = np.linspace(1, n - 1, n_pontos - 1).astype(int)
+    idx = np.empty(n_pontos, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_pontos - 2):
+        ini, fim = bordas[i], bordas[i + 1]
+        prox_ini, prox_fim = (bordas[i + 1], bordas[i + 2]) if i + 2 < len(bordas) else (n - 1, n)
+        xc, yc = x[prox_ini:prox_fim].mean(), y[prox_ini:prox_fim].mean()
+        area = np.abs((x[a] - xc) * (y[ini:fim] - y[a]) - (x[a] - x[ini:fim]) * (yc - y[a]))
+        a = ini + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def reduzir_serie(serie, max_pontos=MAX_PONTOS_GRAFICO):
+    """pd.Series com no máximo `max_pontos` pontos (NaN descartados), mesmo índice"""
+    serie = serie.dropna()
+    return serie.iloc[lttb(serie.values, max_pontos)]
+
+# ==================== RENDERIZAÇÃO ====================
+def renderizar_png(series, titulo, nivel=None, rotulo_nivel="Vol Longo Prazo", ylabel="Volatilidade",
+                   tamanho=(12, 6), dpi=100, max_pontos=MAX_PONTOS_GRAFICO):
+    """
+    {rótulo: pd.Series} → PNG (bytes). Cada série passa pelo LTTB; `nivel`
+    desenha a linha horizontal de referência. A Figure é limpa ao final.
+    """
+    from matplotlib.figure import Figure  # importado sob demanda (início rápido do app)
+
+    fig = Figure(figsize=tamanho, dpi=dpi)
+    try:
+        ax = fig.subplots()
+        for rotulo, serie in series.items():
+            reduzida = reduzir_serie(serie, max_pontos)
+            ax.plot(reduzida.index, reduzida.values, label=rotulo)
+        if nivel is not None and np.isfinite(nivel):
+            ax.axhline(nivel, color="red", linestyle="--", label=rotulo_nivel)
+        ax.set_title(titulo, fontsize=14, fontweight='bold')
+        ax.set_ylabel(ylabel)
+        ax.legend()
+        ax.grid(alpha=0.3)
+        fig.autofmt_xdate()
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', bbox_inches='tight')
+        return buf.getvalue()
+    finally:
+        fig.clear()
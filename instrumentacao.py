@@ -0,0 +1,86 @@
+"""
+ASUS GARCH PRO 2025 - INSTRUMENTAÇÃO
+Tempo por etapa (download, ajuste de cada modelo, Ljung-Box, relatório),
+iterações, convergência e tentativas por ticker; exportação em JSON lines e
+captura opcional com cProfile.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager
+import pandas as pd
+
+# ==================== REGISTROS POR ETAPA ====================
+def registros_download(relatorio_download):
+    """Uma linha por ticker a partir das estatísticas de baixar_dados"""
+    return [{
+        'etapa': 'download', 'ticker': e['ticker'], 'modelo': None,
+        'segundos': e.get('latencia_s', 0.0), 'tentativas': e['tentativas'],
+        'falhas': e['falhas'], 'ok': e['ok'], 'erro': e['erro'],
+        'compartilhado': e.get('compartilhado', False)
+    } for e in relatorio_download]
+
+def registros_ajustes(resultado):
+    """Ajuste + Ljung-Box de cada candidato de um ticker (montar_resultado com todos)"""
+    linhas = []
+    for c in resultado.get('candidatos', []):
+        base = {'ticker': resultado['ticker'], 'modelo': c['modelo'], 'do_cache': c['do_cache']}
+        linhas.append(dict(base, etapa='ajuste', segundos=c['tempo_ajuste_s'], nit=c['nit'],
+                           convergiu=c['convergiu'], ok=c['sucesso'], semente=c['semente']))
+        linhas.append(dict(base, etapa='ljung_box', segundos=c['tempo_lb_s']))
+    return linhas
+
+def registros_execucao(resultados, relatorio_download, extras=None):
+    """Todos os registros de uma execução do Analyzer (extras: ex. etapa 'relatorio')"""
+    linhas = registros_download(relatorio_download)
+    for r in resultados:
+        linhas.extend(registros_ajustes(r))
+    linhas.extend(extras or [])
+    return linhas
+
+@contextmanager
+def cronometro(etapa, destino, **campos):
+    """Mede o bloco e acrescenta {'etapa', 'segundos', **campos} em `destino` (lista)"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        destino.append(dict({'etapa': etapa, 'ticker': None, 'modelo': None,
+                             'segundos': time.perf_counter() - t0}, **campos))
+
+# ==================== RESUMO / EXPORTAÇÃO ====================
+def resumo_por_etapa(registros):
+    """Tempo total/médio/máximo por etapa (e por modelo nos ajustes)"""
+    if not registros:
+        return pd.DataFrame()
+    df = pd.DataFrame(registros)
+    df['modelo'] = df['modelo'].fillna('')
+    agg = {'segundos': ['count', 'sum', 'mean', 'max']}
+    if 'nit' in df:
+        agg['nit'] = 'sum'
+    resumo = df.groupby(['etapa', 'modelo']).agg(agg)
+    resumo.columns = ['n', 'total_s', 'media_s', 'max_s'] + (['iteracoes'] if 'nit' in df else [])
+    return resumo.reset_index().sort_values('total_s', ascending=False)
+
+def para_jsonl(registros):
+    return "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in registros)
+
+def exportar_jsonl(registros, caminho, anexar=True):
+    with open(caminho, 'a' if anexar else 'w', encoding='utf-8') as f:
+        f.write(para_jsonl(registros))
+
+# ==================== CPROFILE (OPCIONAL) ====================
+def perfilar(funcao, *args, linhas=40, **kwargs):
+    """
+    Executa funcao(*args, **kwargs) sob cProfile. Retorna (retorno, texto com
+    as `linhas` funções de maior tempo acumulado). No modo paralelo só o
+    processo principal é medido (os ajustes rodam nos workers).
+    """
+    perfil = cProfile.Profile()
+    retorno = perfil.runcall(funcao, *args, **kwargs)
+    buf = io.StringIO()
+    pstats.Stats(perfil, stream=buf).sort_stats('cumulative').print_stats(linhas)
+    return retorno, buf.getvalue()
@@ -0,0 +1,503 @@
+"""
+ASUS GARCH PRO 2025 - DADOS INTRADIÁRIOS E VOLATILIDADE REALIZADA
+Barras de 1 e 5 minutos (ex.: MES=F, MNQ=F) têm milhões de linhas por
+ticker, então nada aqui monta um DataFrame com a série inteira:
+  - ArmazemIntradiario guarda as barras em partes Parquet append-only, só
+    com ts (int64, segundos epoch) e close (float32), e as devolve em blocos;
+  - AcumuladorRV percorre os blocos uma vez e acumula, por dia de sessão, a
+    variância realizada (Σ r² dos retornos intradiários, sem o overnight),
+    o perfil intradiário médio de r² e, se pedido, só a cauda dos retornos;
+  - HAR-RV (Corsi) sobre a RV diária e GARCH intradiário (motor_garch) nos
+    últimos retornos dessazonalizados pelo perfil.
+
+Uso:
+    python intradiario.py MES=F --intervalo 5m
+    python intradiario.py MNQ=F --intervalo 1m --csv barras.csv --coluna-ts time --coluna-close close
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import motor_garch
+from coordenacao import LIMITE_DOWNLOADS
+from grade_modelos import nome_modelo
+
+INTRADAY_CACHE_DIR = "intraday_cache"
+SEGUNDOS_BARRA = {'1m': 60, '5m': 300}
+JANELA_PROVEDOR_DIAS = {'1m': 7, '5m': 59}     # máximo por pedido ao Yahoo
+HISTORICO_PROVEDOR_DIAS = {'1m': 29, '5m': 59}  # quanto o Yahoo guarda
+LINHAS_POR_BLOCO = 1_000_000
+MAX_PONTOS_GARCH = 100_000  # cauda de retornos do GARCH intradiário
+TRIAGEM_GARCH = 5_000       # retornos em que a grade de valores iniciais é avaliada
+LAGS_HAR = (1, 5, 22)       # diário, semanal, mensal
+MIN_OBS_HAR = 15            # regressões (dias) depois dos lags (4 coeficientes)
+DIAS_ANO = 252
+SEGUNDOS_DIA = 86400
+
+SCHEMA = pa.schema([('ts', pa.int64()), ('close', pa.float32())])
+
+# ==================== ARMAZÉM COLUNAR ====================
+class ArmazemIntradiario:
+    """
+    <diretorio>/<ticker>_<intervalo>/parte-NNNNNN.parquet, append-only e em
+    ordem de tempo, com um manifesto (partes, linhas, último ts). Na
+    ingestão, linhas com ts ≤ último já gravado são descartadas: só o que
+    falta entra. Thread-safe dentro do processo.
+    """
+
+    def __init__(self, diretorio=INTRADAY_CACHE_DIR):
+        self.diretorio = diretorio
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _pasta(self, ticker, intervalo):
+        nome = re.sub(r'[^A-Za-z0-9._-]', '_', ticker)
+        return os.path.join(self.diretorio, f"{nome}_{intervalo}")
+
+    def manifesto(self, ticker, intervalo):
+        """{'partes': [{arquivo, linhas, ts_min, ts_max}], 'linhas', 'ultimo_ts'}"""
+        caminho = os.path.join(self._pasta(ticker, intervalo), "manifesto.json")
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'partes': [], 'linhas': 0, 'ultimo_ts': None}
+
+    def _gravar_manifesto(self, ticker, intervalo, manifesto):
+        caminho = os.path.join(self._pasta(ticker, intervalo), "manifesto.json")
+        with open(caminho + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f)
+        os.replace(caminho + ".tmp", caminho)
+
+    def acrescentar(self, ticker, intervalo, ts, close):
+        """Grava um bloco (ts em segundos epoch, close); retorna as linhas novas"""
+        ts = np.asarray(ts, dtype=np.int64)
+        close = np.asarray(close, dtype=np.float32)
+        validos = np.isfinite(close) & (close > 0)
+        ts, close = ts[validos], close[validos]
+        if len(ts) and np.any(np.diff(ts) <= 0):
+            ordem = np.argsort(ts, kind='stable')
+            ts, close = ts[ordem], close[ordem]
+            ultimo_de_cada = np.r_[ts[1:] != ts[:-1], True]  # duplicados: fica a última barra
+            ts, close = ts[ultimo_de_cada], close[ultimo_de_cada]
+        with self._lock:
+            manifesto = self.manifesto(ticker, intervalo)
+            if manifesto['ultimo_ts'] is not None:
+                novos = ts > manifesto['ultimo_ts']
+                ts, close = ts[novos], close[novos]
+            if not len(ts):
+                return 0
+            pasta = self._pasta(ticker, intervalo)
+            os.makedirs(pasta, exist_ok=True)
+            nome = f"parte-{len(manifesto['partes']):06d}.parquet"
+            tabela = pa.Table.from_arrays([pa.array(ts), pa.array(close)], schema=SCHEMA)
+            pq.write_table(tabela, os.path.join(pasta, nome + ".tmp"), compression='zstd',
+                           row_group_size=LINHAS_POR_BLOCO)
+            os.replace(os.path.join(pasta, nome + ".tmp"), os.path.join(pasta, nome))
+            manifesto['partes'].append({'arquivo': nome, 'linhas': len(ts),
+                                        'ts_min': int(ts[0]), 'ts_max': int(ts[-1])})
+            manifesto['linhas'] += len(ts)
+            manifesto['ultimo_ts'] = int(ts[-1])
+            self._gravar_manifesto(ticker, intervalo, manifesto)
+            return len(ts)
+
+    def ingerir(self, ticker, intervalo, blocos):
+        """Grava cada (ts, close) de um iterável de blocos; retorna o total de linhas novas"""
+        return sum(self.acrescentar(ticker, intervalo, ts, close) for ts, close in blocos)
+
+    def iterar_blocos(self, ticker, intervalo, inicio_ts=None, fim_ts=None, linhas_por_bloco=LINHAS_POR_BLOCO):
+        """(ts int64, close float32) em ordem de tempo, com no máximo `linhas_por_bloco` linhas cada"""
+        pasta = self._pasta(ticker, intervalo)
+        for parte in self.manifesto(ticker, intervalo)['partes']:
+            if (inicio_ts is not None and parte['ts_max'] < inicio_ts) or \
+                    (fim_ts is not None and parte['ts_min'] >= fim_ts):
+                continue
+            arquivo = pq.ParquetFile(os.path.join(pasta, parte['arquivo']))
+            for lote in arquivo.iter_batches(batch_size=linhas_por_bloco, columns=['ts', 'close']):
+                ts = lote.column(0).to_numpy()
+                close = lote.column(1).to_numpy()
+                if inicio_ts is not None or fim_ts is not None:
+                    dentro = np.ones(len(ts), dtype=bool)
+                    if inicio_ts is not None:
+                        dentro &= ts >= inicio_ts
+                    if fim_ts is not None:
+                        dentro &= ts < fim_ts
+                    ts, close = ts[dentro], close[dentro]
+                if len(ts):
+                    yield ts, close
+
+    def bytes_em_disco(self, ticker, intervalo):
+        pasta = self._pasta(ticker, intervalo)
+        return sum(os.path.getsize(os.path.join(pasta, p['arquivo']))
+                   for p in self.manifesto(ticker, intervalo)['partes'])
+
+# ==================== FONTES DE BARRAS ====================
+def _segundos_epoch(coluna):
+    """Coluna Arrow de timestamps (ou inteiros epoch em s/ms) → int64 em segundos"""
+    if pa.types.is_timestamp(coluna.type):
+        return pc.cast(pc.cast(coluna, pa.timestamp('s', tz=coluna.type.tz)), pa.int64()).to_numpy()
+    ts = pc.cast(coluna, pa.int64()).to_numpy()
+    return ts // 1000 if len(ts) and ts.max() > 10 ** 11 else ts  # epoch em ms
+
+def blocos_csv(caminho, coluna_ts='ts', coluna_close='close', bytes_por_bloco=64 << 20):
+    """Lê um CSV de barras em fluxo (pyarrow.csv), sem carregar o arquivo inteiro"""
+    leitor = pacsv.open_csv(
+        caminho, read_options=pacsv.ReadOptions(block_size=bytes_por_bloco),
+        convert_options=pacsv.ConvertOptions(include_columns=[coluna_ts, coluna_close],
+                                             column_types={coluna_close: pa.float32()}))
+    for lote in leitor:
+        yield _segundos_epoch(lote.column(coluna_ts)), lote.column(coluna_close).to_numpy(zero_copy_only=False)
+
+class ProvedorYahooIntradiario:
+    """Barras intradiárias do Yahoo Finance (1m: últimos ~30 dias; 5m: ~60)"""
+
+    def baixar(self, ticker, inicio, fim, intervalo):
+        """(ts int64 em segundos, close float32) das barras em [inicio, fim)"""
+        import yfinance as yf  # importado sob demanda (início rápido do app)
+        with LIMITE_DOWNLOADS:
+            df = yf.download(ticker, start=inicio, end=fim, interval=intervalo, progress=False, auto_adjust=True)
+        if df is None or df.empty:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        close = df['Close']
+        if isinstance(close, pd.DataFrame):
+            close = close.iloc[:, 0]
+        close = close.dropna()
+        idx = close.index
+        origem = pd.Timestamp(0, tz='UTC') if idx.tz is not None else pd.Timestamp(0)
+        return (np.asarray((idx - origem) // pd.Timedelta(seconds=1), dtype=np.int64),
+                close.to_numpy(dtype=np.float32))
+
+def atualizar_do_provedor(armazem, ticker, intervalo, provedor=None, agora=None):
+    """Baixa, em janelas aceitas pelo provedor, só as barras posteriores às já gravadas"""
+    provedor = provedor or ProvedorYahooIntradiario()
+    agora = pd.Timestamp(agora or pd.Timestamp.now(tz='UTC')).tz_localize(None).normalize() + pd.Timedelta(days=1)
+    inicio = agora - pd.Timedelta(days=HISTORICO_PROVEDOR_DIAS[intervalo])
+    ultimo = armazem.manifesto(ticker, intervalo)['ultimo_ts']
+    if ultimo is not None:
+        inicio = max(inicio, pd.Timestamp(ultimo, unit='s').normalize())
+    novas = 0
+    while inicio < agora:
+        fim = min(inicio + pd.Timedelta(days=JANELA_PROVEDOR_DIAS[intervalo]), agora)
+        ts, close = provedor.baixar(ticker, inicio.strftime('%Y-%m-%d'), fim.strftime('%Y-%m-%d'), intervalo)
+        novas += armazem.acrescentar(ticker, intervalo, ts, close)
+        inicio = fim
+    return novas
+
+def simular_intradiario(n_linhas, segundos_barra=60, barras_por_dia=1380, omega=2e-6, alpha=0.08, beta=0.9,
+                        seed=0, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Blocos (ts, close float32) de barras sintéticas: variância diária
+    GARCH(1,1) sobre o retorno do dia, perfil intradiário em U e dias úteis
+    a partir de 2000-01-03 (sessão de 23h, como os micro futuros da CME).
+    """
+    rng = np.random.default_rng(seed)
+    tau = (np.arange(barras_por_dia) + 0.5) / barras_por_dia
+    perfil = 0.5 + 3 * (tau - 0.5) ** 2
+    perfil /= perfil.mean()
+    dias_por_bloco = max(1, linhas_por_bloco // barras_por_dia)
+    n_dias = -(-n_linhas // barras_por_dia)
+    datas = np.busday_offset('2000-01-03', np.arange(n_dias), roll='forward').astype('datetime64[s]').astype(np.int64)
+    sigma2 = omega / (1 - alpha - beta)
+    log_preco, r_dia = np.log(5000.0), 0.0
+    for d0 in range(0, n_dias, dias_por_bloco):
+        dias = range(d0, min(d0 + dias_por_bloco, n_dias))
+        variancias = np.empty(len(dias))
+        z = rng.standard_normal((len(dias), barras_por_dia))
+        r = np.empty_like(z)
+        for k, _ in enumerate(dias):
+            sigma2 = omega + alpha * r_dia ** 2 + beta * sigma2
+            variancias[k] = sigma2
+            r[k] = np.sqrt(sigma2 * perfil / barras_por_dia) * z[k]
+            r_dia = r[k].sum()
+        precos = log_preco + np.cumsum(r.ravel())
+        log_preco = precos[-1]
+        ts = (datas[d0:d0 + len(dias), None] + np.arange(barras_por_dia) * segundos_barra).ravel()
+        resto = n_linhas - d0 * barras_por_dia
+        yield ts[:resto], np.exp(precos[:resto]).astype(np.float32)
+
+# ==================== VARIÂNCIA REALIZADA EM FLUXO ====================
+class AcumuladorRV:
+    """
+    Uma passada pelos blocos: RV e nº de retornos por dia de sessão, último
+    preço de cada dia, perfil intradiário (média de r² por horário da barra)
+    e, com cauda > 0, os últimos `cauda` retornos intradiários com o horário.
+    O dia de sessão é floor((ts + deslocamento_h·3600) / 86400): para a CME
+    (abre às 17h de Chicago), deslocamento_h ≈ 1 põe a noite no dia seguinte.
+    Memória proporcional a um bloco + nº de dias, nunca à série inteira.
+    """
+
+    def __init__(self, segundos_barra, deslocamento_h=0.0, cauda=0):
+        self.segundos_barra = segundos_barra
+        self.deslocamento = int(round(deslocamento_h * 3600))
+        self.cauda = cauda
+        n_horarios = SEGUNDOS_DIA // segundos_barra
+        self._soma_perfil = np.zeros(n_horarios)
+        self._n_perfil = np.zeros(n_horarios, dtype=np.int64)
+        self._dias, self._rv, self._n, self._fechamento = [], [], [], []
+        self._anterior = None  # (dia, log do último preço) do bloco anterior
+        self._cauda_r, self._cauda_h = [], []
+        self.linhas = 0
+
+    def adicionar(self, ts, close):
+        self.linhas += len(ts)
+        t = ts + self.deslocamento
+        dia = t // SEGUNDOS_DIA
+        x = np.log(close.astype(np.float64))
+        if self._anterior is not None:
+            dia = np.r_[self._anterior[0], dia]
+            x = np.r_[self._anterior[1], x]
+            t = np.r_[-1, t]
+        self._anterior = (dia[-1], x[-1])
+        if len(x) < 2:
+            return
+        mesmo_dia = dia[1:] == dia[:-1]  # o retorno overnight fica de fora
+        r = np.diff(x)[mesmo_dia]
+        d_r = dia[1:][mesmo_dia]
+        horario = (t[1:][mesmo_dia] % SEGUNDOS_DIA) // self.segundos_barra
+        r2 = r * r
+
+        self._soma_perfil += np.bincount(horario, weights=r2, minlength=len(self._soma_perfil))
+        self._n_perfil += np.bincount(horario, minlength=len(self._n_perfil))
+
+        # Dias em ordem: somas por dia com reduceat nos pontos de troca
+        if len(r):
+            inicio_dia = np.r_[0, np.nonzero(np.diff(d_r))[0] + 1]
+            dias_bloco = d_r[inicio_dia]
+            rv = np.add.reduceat(r2, inicio_dia)
+            n = np.diff(np.r_[inicio_dia, len(r)])
+            if self._dias and self._dias[-1] == dias_bloco[0]:
+                self._rv[-1] += rv[0]
+                self._n[-1] += n[0]
+                dias_bloco, rv, n = dias_bloco[1:], rv[1:], n[1:]
+            self._dias.extend(dias_bloco.tolist())
+            self._rv.extend(rv.tolist())
+            self._n.extend(n.tolist())
+        fim_dia = np.r_[np.nonzero(np.diff(dia))[0], len(dia) - 1]
+        for d, v in zip(dia[fim_dia].tolist(), x[fim_dia].tolist()):
+            if self._fechamento and self._fechamento[-1][0] == d:
+                self._fechamento[-1] = (d, v)
+            else:
+                self._fechamento.append((d, v))
+
+        if self.cauda:
+            self._cauda_r.append(r[-self.cauda:])
+            self._cauda_h.append(horario[-self.cauda:])
+            while sum(len(c) for c in self._cauda_r[1:]) >= self.cauda:
+                self._cauda_r.pop(0)
+                self._cauda_h.pop(0)
+
+    def consumir(self, blocos):
+        for ts, close in blocos:
+            self.adicionar(ts, close)
+        return self
+
+    def _datas(self, dias):
+        return pd.to_datetime(np.asarray(dias, dtype=np.int64), unit='D')
+
+    def serie(self):
+        """DataFrame diário (poucos milhares de linhas): rv, n_retornos, vol_anual"""
+        com_retornos = np.asarray(self._n) > 0
+        rv = np.asarray(self._rv)[com_retornos]
+        return pd.DataFrame({'rv': rv, 'n_retornos': np.asarray(self._n)[com_retornos],
+                             'vol_anual': np.sqrt(DIAS_ANO * rv)},
+                            index=self._datas(np.asarray(self._dias)[com_retornos]))
+
+    def fechamentos(self):
+        """Último preço de cada dia de sessão"""
+        dias, log_precos = zip(*self._fechamento) if self._fechamento else ((), ())
+        return pd.Series(np.exp(log_precos), index=self._datas(dias), name='Close')
+
+    def perfil(self):
+        """Fator intradiário de variância por horário (média 1 nos horários negociados)"""
+        negociado = self._n_perfil > 0
+        media = np.zeros_like(self._soma_perfil)
+        media[negociado] = self._soma_perfil[negociado] / self._n_perfil[negociado]
+        fator = np.ones_like(media)
+        if negociado.any() and media[negociado].mean() > 0:
+            fator[negociado] = np.maximum(media[negociado] / media[negociado].mean(), 1e-3)
+        return fator
+
+    def cauda_dessazonalizada(self):
+        """Últimos retornos intradiários divididos pelo desvio do seu horário (perfil)"""
+        if not self._cauda_r:
+            return np.zeros(0)
+        r = np.concatenate(self._cauda_r)[-self.cauda:]
+        h = np.concatenate(self._cauda_h)[-self.cauda:]
+        return r / np.sqrt(self.perfil()[h])
+
+# ==================== HAR-RV ====================
+class ResultadoHAR:
+    """Coeficientes (b0, b_d, b_s, b_m), R², RV ajustada e previsão recursiva"""
+
+    def __init__(self, coeficientes, r2, rv, ajustado, usar_log, var_residuo):
+        self.coeficientes = coeficientes
+        self.r2 = r2
+        self.rv = rv
+        self.ajustado = ajustado
+        self.usar_log = usar_log
+        self.var_residuo = var_residuo
+
+    def prever(self, horizonte=1):
+        """RV prevista para os próximos `horizonte` dias (cada previsão alimenta as seguintes)"""
+        historico = list(np.log(self.rv.values) if self.usar_log else self.rv.values)
+        b = self.coeficientes.values
+        saida = []
+        for _ in range(horizonte):
+            x = np.r_[1.0, [np.mean(historico[-lag:]) for lag in LAGS_HAR]]
+            historico.append(float(x @ b))
+            saida.append(historico[-1])
+        saida = np.asarray(saida)
+        return np.exp(saida + 0.5 * self.var_residuo) if self.usar_log else np.maximum(saida, 0.0)
+
+    def vol_prevista(self, horizonte=1):
+        """Volatilidade anualizada média prevista para os próximos `horizonte` dias"""
+        return float(np.sqrt(DIAS_ANO * self.prever(horizonte).mean()))
+
+def matriz_har(valores):
+    """(X com constante e médias de 1, 5 e 22 dias até t, y = valor em t+1)"""
+    v = np.asarray(valores, dtype=float)
+    m = max(LAGS_HAR)
+    acumulado = np.r_[0.0, np.cumsum(v)]
+    colunas = [np.ones(len(v) - m)]
+    for lag in LAGS_HAR:
+        fim = np.arange(m, len(v))
+        colunas.append((acumulado[fim] - acumulado[fim - lag]) / lag)
+    return np.column_stack(colunas), v[m:]
+
+def ajustar_har(rv, usar_log=False):
+    """HAR-RV por MQO sobre a RV diária (pd.Series); usar_log=True ajusta log RV"""
+    rv = rv[rv > 0] if usar_log else rv
+    if len(rv) - max(LAGS_HAR) < MIN_OBS_HAR:
+        raise ValueError(f"HAR-RV precisa de {MIN_OBS_HAR + max(LAGS_HAR)} dias com RV (há {len(rv)})")
+    alvo = np.log(rv.values) if usar_log else rv.values
+    X, y = matriz_har(alvo)
+    b = np.linalg.lstsq(X, y, rcond=None)[0]
+    ajuste = X @ b
+    residuo = y - ajuste
+    r2 = 1 - residuo.var() / y.var() if y.var() > 0 else np.nan
+    ajustado = pd.Series(np.exp(ajuste + 0.5 * residuo.var()) if usar_log else ajuste,
+                         index=rv.index[max(LAGS_HAR):], name='rv_har')
+    return ResultadoHAR(pd.Series(b, index=['b0', 'b_d', 'b_s', 'b_m']), float(r2), rv, ajustado,
+                        usar_log, float(residuo.var()))
+
+# ==================== GARCH INTRADIÁRIO ====================
+def ajustar_garch_intradiario(retornos, vol_type='GARCH', p=1, o=0, q=1):
+    """
+    GARCH/GJR/EGARCH normal (motor_garch) nos retornos intradiários
+    dessazonalizados (array NumPy, sem índice). Como na triagem da busca
+    podada, os valores iniciais saem de um ajuste nos últimos TRIAGEM_GARCH
+    retornos: a grade de sementes do motor não roda na cauda inteira.
+    Retorna dict no formato de ajustar_modelo com a vol da última barra.
+    """
+    if len(retornos) < 1000:
+        raise ValueError(f"GARCH intradiário precisa de pelo menos 1000 retornos (há {len(retornos)})")
+    semente = None
+    if len(retornos) > TRIAGEM_GARCH:
+        semente = motor_garch.estimar(motor_garch.EstatisticasRetorno(retornos[-TRIAGEM_GARCH:]),
+                                      vol_type, p, o, q).params.values
+    res = motor_garch.estimar(motor_garch.EstatisticasRetorno(retornos), vol_type, p, o, q,
+                              starting_values=semente)
+    return {
+        'model_name': nome_modelo(vol_type, p, o, q),
+        'params': res.params, 'aic': res.aic, 'loglik': res.loglikelihood, 'nobs': len(retornos),
+        'nit': res.nit, 'convergiu': res.convergence_flag == 0,
+        'vol_barra': float(res.conditional_volatility.iloc[-1]),
+        'persistencia': float(res.params.filter(like='alpha').sum() + res.params.filter(like='beta').sum()
+                              + 0.5 * res.params.filter(like='gamma').sum()) if vol_type != 'EGARCH'
+        else float(res.params.filter(like='beta').sum()),
+    }
+
+# ==================== ANÁLISE COMPLETA ====================
+def analisar_intradiario(armazem, ticker, intervalo, inicio=None, fim=None, deslocamento_h=0.0,
+                         usar_log=True, garch=('GARCH', 1, 0, 1), max_pontos=MAX_PONTOS_GARCH):
+    """
+    Uma passada pelas barras gravadas de `ticker` em [inicio, fim) e os
+    modelos sobre o resultado. Retorna dict com 'rv' (DataFrame diário),
+    'fechamentos', 'perfil', 'har' (ResultadoHAR ou None), 'garch' (dict ou
+    None), 'erros' {modelo: mensagem}, 'linhas' e 'tempos' {etapa: s}.
+    """
+    tempos, erros = {}, {}
+    t0 = time.perf_counter()
+    inicio_ts = None if inicio is None else int(pd.Timestamp(inicio).timestamp())
+    fim_ts = None if fim is None else int(pd.Timestamp(fim).timestamp())
+    acumulador = AcumuladorRV(SEGUNDOS_BARRA.get(intervalo, 60), deslocamento_h,
+                              cauda=max_pontos if garch else 0)
+    acumulador.consumir(armazem.iterar_blocos(ticker, intervalo, inicio_ts, fim_ts))
+    rv = acumulador.serie()
+    tempos['rv_fluxo'] = time.perf_counter() - t0
+
+    har = resultado_garch = None
+    t0 = time.perf_counter()
+    try:
+        har = ajustar_har(rv['rv'], usar_log=usar_log)
+    except ValueError as e:
+        erros['HAR-RV'] = str(e)
+    tempos['har'] = time.perf_counter() - t0
+    if garch:
+        t0 = time.perf_counter()
+        try:
+            resultado_garch = ajustar_garch_intradiario(acumulador.cauda_dessazonalizada(), *garch)
+        except ValueError as e:
+            erros['GARCH'] = str(e)
+        tempos['garch'] = time.perf_counter() - t0
+    return {'rv': rv, 'fechamentos': acumulador.fechamentos(), 'perfil': acumulador.perfil(), 'har': har,
+            'garch': resultado_garch, 'erros': erros, 'linhas': acumulador.linhas, 'tempos': tempos}
+
+# ==================== LINHA DE COMANDO ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barras intradiárias, RV diária, HAR-RV e GARCH intradiário")
+    parser.add_argument("ticker")
+    parser.add_argument("--intervalo", choices=sorted(SEGUNDOS_BARRA), default="5m")
+    parser.add_argument("--diretorio", default=INTRADAY_CACHE_DIR)
+    parser.add_argument("--csv", help="ingere barras de um CSV (em fluxo) em vez de baixar do Yahoo")
+    parser.add_argument("--coluna-ts", default="ts")
+    parser.add_argument("--coluna-close", default="close")
+    parser.add_argument("--offline", action="store_true", help="só as barras já gravadas")
+    parser.add_argument("--deslocamento-h", type=float, default=0.0, help="início do dia de sessão em horas UTC")
+    parser.add_argument("--garch", default="GARCH", choices=["GARCH", "GJR", "EGARCH", "nenhum"])
+    args = parser.parse_args(argv)
+
+    armazem = ArmazemIntradiario(args.diretorio)
+    t0 = time.perf_counter()
+    if args.csv:
+        novas = armazem.ingerir(args.ticker, args.intervalo,
+                                blocos_csv(args.csv, args.coluna_ts, args.coluna_close))
+    elif not args.offline:
+        novas = atualizar_do_provedor(armazem, args.ticker, args.intervalo)
+    else:
+        novas = 0
+    print(f"{novas} barras novas em {time.perf_counter() - t0:.1f}s · "
+          f"{armazem.manifesto(args.ticker, args.intervalo)['linhas']} gravadas "
+          f"({armazem.bytes_em_disco(args.ticker, args.intervalo) / 2**20:.1f} MB)")
+
+    garch = None if args.garch == "nenhum" else (args.garch, 1, 0 if args.garch == "GARCH" else 1, 1)
+    res = analisar_intradiario(armazem, args.ticker, args.intervalo, deslocamento_h=args.deslocamento_h,
+                               garch=garch)
+    rv = res['rv']
+    print(f"{res['linhas']} barras · {len(rv)} dias · "
+          + " · ".join(f"{etapa} {s:.2f}s" for etapa, s in res['tempos'].items()))
+    if len(rv):
+        print(f"Vol realizada (último dia): {rv['vol_anual'].iloc[-1]:.2%} a.a.")
+    if res['har'] is not None:
+        har = res['har']
+        print(f"HAR-RV: " + " ".join(f"{k}={v:.4g}" for k, v in har.coeficientes.items())
+              + f" · R²={har.r2:.3f} · vol prevista 1d {har.vol_prevista(1):.2%} · 22d {har.vol_prevista(22):.2%}")
+    if res['garch'] is not None:
+        g = res['garch']
+        print(f"{g['model_name']} intradiário ({g['nobs']} retornos): AIC={g['aic']:.1f} · "
+              f"persistência={g['persistencia']:.4f}")
+    for modelo, erro in res['erros'].items():
+        print(f"{modelo}: {erro}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,460 @@
+"""
+ASUS GARCH PRO 2025 - MOTOR RÁPIDO DE ESTIMAÇÃO
+GARCH / GJR / EGARCH com média constante e erros normais, no mesmo formato
+do `arch`: recursões de variância vetorizadas em NumPy, gradientes
+analíticos e avaliação de vários vetores de parâmetros em lote.
+
+Uso: ajustar_modelo(..., backend="rapido") em analyzer.py.
+Conferência contra o arch: python motor_garch.py
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+LOG_2PI = np.log(2 * np.pi)
+SQRT2_OV_PI = np.sqrt(2 / np.pi)
+LNSIGMA_MAX = np.log(np.finfo(np.double).max) - 0.1
+ESCALA_ARCH = 100.0  # retornos em fração vão ao arch em % (em fração ele para perto do valor inicial)
+
+# ==================== ESTATÍSTICAS COMPARTILHADAS ====================
+class EstatisticasRetorno:
+    """
+    Estatísticas da série calculadas uma única vez e reaproveitadas por
+    todos os modelos da grade (média, resíduos iniciais, backcast).
+    """
+
+    def __init__(self, retornos):
+        self.index = retornos.index if isinstance(retornos, pd.Series) else None
+        self.y = np.asarray(retornos, dtype=float)
+        self.nobs = self.y.shape[0]
+        self.media = float(self.y.mean())
+        self.resid0 = self.y - self.media
+        self.var = float(np.mean(self.resid0 ** 2))
+        # Mesmo backcast do arch: média exponencial (0.94) dos 75 primeiros ε²
+        tau = min(75, self.nobs)
+        w = 0.94 ** np.arange(tau)
+        self.backcast = float(np.sum(self.resid0[:tau] ** 2 * (w / w.sum())))
+        self._padronizada = None
+
+    def padronizada(self):
+        """A mesma série dividida pelo desvio-padrão (variância unitária)"""
+        if self._padronizada is None:
+            self._padronizada = EstatisticasRetorno(self.y / np.sqrt(self.var))
+        return self._padronizada
+
+def nomes_parametros(p, o, q):
+    return (['mu', 'omega'] + [f'alpha[{i}]' for i in range(1, p + 1)]
+            + [f'gamma[{i}]' for i in range(1, o + 1)]
+            + [f'beta[{i}]' for i in range(1, q + 1)])
+
+def _normalizar_vol(vol_type):
+    vol = vol_type.upper()
+    if vol == 'GJR':
+        return 'GARCH'  # GJR = GARCH com termo assimétrico (o > 0)
+    if vol not in ('GARCH', 'EGARCH'):
+        raise ValueError("Unknown model type in vol")  # mesma regra do arch_model
+    return vol
+
+# ==================== RECURSÕES (EM LOTE) ====================
+def _loglik_garch(estat, p, o, q, params, gradiente):
+    """
+    GARCH/GJR para B vetores de parâmetros: params (B, k).
+    σ² é uma recursão linear na entrada x_t, então a parte não recursiva é
+    montada em lote e só o filtro IIR (lfilter, em C) roda por vetor.
+    """
+    B, k = params.shape
+    T, m, bc = estat.nobs, max(p, o, q), estat.backcast
+    mu, omega = params[:, 0], params[:, 1]
+    alpha, gamma, beta = params[:, 2:2 + p], params[:, 2 + p:2 + p + o], params[:, 2 + p + o:]
+
+    eps = estat.y[None, :] - mu[:, None]
+    eps2 = eps ** 2
+    neg = eps < 0
+    A = np.concatenate([np.full((B, m), bc), eps2], axis=1)
+    N = np.concatenate([np.full((B, m), 0.5 * bc), eps2 * neg], axis=1)
+
+    x = np.repeat(omega[:, None], T, axis=1)
+    for i in range(1, p + 1):
+        x += alpha[:, i - 1, None] * A[:, m - i:m - i + T]
+    for j in range(1, o + 1):
+        x += gamma[:, j - 1, None] * N[:, m - j:m - j + T]
+
+    if q:
+        sigma2 = np.empty((B, T))
+        # Estado inicial do filtro com σ² pré-amostra = backcast (equivale a lfiltic)
+        zi = bc * np.cumsum(beta[:, ::-1], axis=1)[:, ::-1]
+        for b in range(B):
+            sigma2[b] = lfilter([1.0], np.r_[1.0, -beta[b]], x[b], zi=zi[b])[0]
+    else:
+        sigma2 = x
+    sigma2 = np.maximum(sigma2, 1e-12 * estat.var)
+
+    ll = -0.5 * np.sum(LOG_2PI + np.log(sigma2) + eps2 / sigma2, axis=1)
+    if not gradiente:
+        return ll, None, sigma2
+
+    # dσ²_t/dθ = z_t + Σ β_k dσ²_{t-k}/dθ  → mesmo filtro, condição inicial nula
+    z = np.zeros((B, k, T))
+    dA = -2 * eps
+    dN = dA * neg
+    S = np.concatenate([np.full((B, m), bc), sigma2], axis=1)
+    z[:, 1] = 1.0
+    for i in range(1, p + 1):
+        if i <= T:
+            z[:, 0, i:] += alpha[:, i - 1, None] * dA[:, :T - i]
+        z[:, 1 + i] = A[:, m - i:m - i + T]
+    for j in range(1, o + 1):
+        if j <= T:
+            z[:, 0, j:] += gamma[:, j - 1, None] * dN[:, :T - j]
+        z[:, 1 + p + j] = N[:, m - j:m - j + T]
+    for l in range(1, q + 1):
+        z[:, 1 + p + o + l] = S[:, m - l:m - l + T]
+    if q:
+        D = np.empty_like(z)
+        for b in range(B):
+            D[b] = lfilter([1.0], np.r_[1.0, -beta[b]], z[b], axis=1)
+    else:
+        D = z
+
+    w = -0.5 * (1.0 / sigma2 - eps2 / sigma2 ** 2)
+    grad = np.einsum('bt,bkt->bk', w, D)
+    grad[:, 0] += np.sum(eps / sigma2, axis=1)
+    return ll, grad, sigma2
+
+def _loglik_egarch(estat, p, o, q, params, gradiente):
+    """
+    EGARCH para B vetores de parâmetros ao mesmo tempo: params (B, k).
+    A recursão é não linear em e_t, então o laço é no tempo e vetorizado em B.
+    """
+    B, k = params.shape
+    T, lbc = estat.nobs, np.log(estat.backcast)
+    mu, omega = params[:, 0], params[:, 1]
+    alpha, gamma, beta = params[:, 2:2 + p], params[:, 2 + p:2 + p + o], params[:, 2 + p + o:]
+
+    eps = estat.y[None, :] - mu[:, None]
+    h = np.empty((B, T))
+    e = np.empty((B, T))
+    if gradiente:
+        dh = np.empty((B, T, k))
+        de = np.empty((B, T, k))
+
+    for t in range(T):
+        ht = omega.copy()
+        if gradiente:
+            dht = np.zeros((B, k))
+            dht[:, 1] = 1.0
+        for i in range(1, p + 1):
+            if t - i >= 0:
+                ae = np.abs(e[:, t - i])
+                ht += alpha[:, i - 1] * (ae - SQRT2_OV_PI)
+                if gradiente:
+                    dht[:, 1 + i] += ae - SQRT2_OV_PI
+                    dht += (alpha[:, i - 1] * np.sign(e[:, t - i]))[:, None] * de[:, t - i]
+        for j in range(1, o + 1):
+            if t - j >= 0:
+                ht += gamma[:, j - 1] * e[:, t - j]
+                if gradiente:
+                    dht[:, 1 + p + j] += e[:, t - j]
+                    dht += gamma[:, j - 1, None] * de[:, t - j]
+        for l in range(1, q + 1):
+            lag = h[:, t - l] if t - l >= 0 else lbc
+            ht += beta[:, l - 1] * lag
+            if gradiente:
+                dht[:, 1 + p + o + l] += lag
+                if t - l >= 0:
+                    dht += beta[:, l - 1, None] * dh[:, t - l]
+        ht = np.minimum(ht, LNSIGMA_MAX)
+        h[:, t] = ht
+        inv_sigma = np.exp(-0.5 * ht)
+        e[:, t] = eps[:, t] * inv_sigma
+        if gradiente:
+            dh[:, t] = dht
+            de[:, t] = -0.5 * e[:, t, None] * dht
+            de[:, t, 0] -= inv_sigma
+
+    ll = -0.5 * np.sum(LOG_2PI + h + e ** 2, axis=1)
+    grad = -0.5 * np.sum(dh + 2 * e[:, :, None] * de, axis=1) if gradiente else None
+    return ll, grad, np.exp(h)
+
+def loglik_lote(estat, vol_type, p, o, q, params, gradiente=False):
+    """
+    Log-verossimilhança normal de vários vetores de parâmetros de uma vez.
+    params: (B, k) no layout do arch [mu, omega, alpha..., gamma..., beta...].
+    Retorna (ll (B,), grad (B, k) ou None, sigma2 (B, T)).
+    """
+    vol = _normalizar_vol(vol_type)
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    if vol == 'EGARCH':
+        return _loglik_egarch(estat, p, o, q, params, gradiente)
+    return _loglik_garch(estat, p, o, q, params, gradiente)
+
+def avaliar_grade(estat, especificacoes):
+    """
+    Avalia vários modelos e vetores de parâmetros num único chamado.
+    especificacoes: lista de ((vol, p, o, q), params (B, k)).
+    Retorna lista de ll (B,) na mesma ordem.
+    """
+    return [loglik_lote(estat, vol, p, o, q, params)[0]
+            for (vol, p, o, q), params in especificacoes]
+
+def ordens_parametros(params):
+    """(p, o, q) a partir dos nomes dos parâmetros (layout do arch)"""
+    return tuple(sum(1 for k in params.index if k.startswith(f'{nome}['))
+                 for nome in ('alpha', 'gamma', 'beta'))
+
+def volatilidade_condicional(retornos, vol_type, params):
+    """σ_t dos parâmetros já estimados (sem reajustar): uma passada do filtro"""
+    p, o, q = ordens_parametros(params)
+    estat = retornos if isinstance(retornos, EstatisticasRetorno) else EstatisticasRetorno(retornos)
+    _, _, sigma2 = loglik_lote(estat, vol_type, p, o, q, params[nomes_parametros(p, o, q)].values)
+    return pd.Series(np.sqrt(sigma2[0]), index=estat.index, name='cond_vol')
+
+def variancia_longo_prazo(vol_type, params):
+    """Variância incondicional (NaN se o processo não é estacionário)"""
+    p, o, q = ordens_parametros(params)
+    beta = sum(params[f'beta[{i}]'] for i in range(1, q + 1))
+    if _normalizar_vol(vol_type) == 'EGARCH':
+        return float(np.exp(params['omega'] / (1 - beta))) if beta < 1 else np.nan
+    persistencia = (sum(params[f'alpha[{i}]'] for i in range(1, p + 1)) + beta
+                    + sum(params[f'gamma[{i}]'] for i in range(1, o + 1)) / 2)
+    return float(params['omega'] / (1 - persistencia)) if persistencia < 1 else np.nan
+
+def reescalar_params(params, vol_type, fator):
+    """
+    Parâmetros para a série retornos × fator: mu escala por fator, ω por fator²
+    (GARCH/GJR) ou soma (1 - Σβ)·ln(fator²) (EGARCH); o resto não muda.
+    """
+    params = params.copy()
+    params['mu'] = params['mu'] * fator
+    if _normalizar_vol(vol_type) == 'EGARCH':
+        beta = sum(v for n, v in params.items() if n.startswith('beta['))
+        params['omega'] = params['omega'] + (1 - beta) * np.log(fator ** 2)
+    else:
+        params['omega'] = params['omega'] * fator ** 2
+    return params
+
+# ==================== VALORES INICIAIS, LIMITES E RESTRIÇÕES ====================
+def _valores_iniciais(estat, vol, p, o, q):
+    """Grade de valores iniciais do arch, avaliada em lote; retorna a melhor"""
+    if vol == 'EGARCH':
+        target = np.log(estat.var)
+        grade = []
+        for a, g, b in itertools.product([0.01, 0.05, 0.1, 0.2], [-0.1, 0.0, 0.1], [0.5, 0.7, 0.9, 0.98]):
+            sv = (1.0 - b) * target * np.ones(p + o + q + 1)
+            if p:
+                sv[1:1 + p] = a / p
+            if o:
+                sv[1 + p:1 + p + o] = g / o
+            if q:
+                sv[1 + p + o:] = b / q
+            grade.append(sv)
+    else:
+        target = estat.var
+        grade = []
+        for a, g, agb in itertools.product([0.01, 0.05, 0.1, 0.2], [0.01, 0.05, 0.1, 0.2], [0.5, 0.7, 0.9, 0.98]):
+            sv = (1.0 - agb) * target * np.ones(p + o + q + 1)
+            if p:
+                sv[1:1 + p] = a / p
+                agb -= a
+            if o:
+                sv[1 + p:1 + p + o] = g / o
+                agb -= g / 2.0
+            if q:
+                sv[1 + p + o:] = agb / q
+            grade.append(sv)
+    grade = np.column_stack([np.full(len(grade), estat.media), np.array(grade)])
+    with np.errstate(over='ignore', invalid='ignore'):  # pontos da grade que explodem viram -inf abaixo
+        ll, _, _ = loglik_lote(estat, vol, p, o, q, grade)
+    ll = np.where(np.isfinite(ll), ll, -np.inf)
+    return grade[int(np.argmax(ll))]
+
+def _limites(estat, vol, p, o, q):
+    if vol == 'EGARCH':
+        lnv, c = np.log(estat.var), np.log(10000.0)
+        return ([(None, None), (lnv - c, lnv + c)] + [(None, None)] * (p + o)
+                + [(0.0, float(q))] * q)
+    return ([(None, None), (1e-8 * estat.var, 10.0 * estat.var)] + [(0.0, 1.0)] * p
+            + [(-1.0, 2.0) if j < p else (0.0, 2.0) for j in range(o)] + [(0.0, 1.0)] * q)
+
+def _restricoes(vol, p, o, q):
+    """Restrições lineares do arch (a·θ_vol - b >= 0) com jacobiano explícito"""
+    k_arch = p + o + q
+    if vol == 'EGARCH':
+        a = np.zeros((1, k_arch + 1))
+        a[0, p + o + 1:] = -1.0
+        b = np.array([-1.0])
+    else:
+        a = np.zeros((k_arch + 2, k_arch + 1))
+        for i in range(k_arch + 1):
+            a[i, i] = 1.0
+        for i in range(min(o, p)):
+            a[i + p + 1, i + 1] = 1.0
+        a[k_arch + 1, 1:] = -1.0
+        a[k_arch + 1, p + 1:p + o + 1] = -0.5
+        b = np.zeros(k_arch + 2)
+        b[k_arch + 1] = -1.0
+    a_full = np.column_stack([np.zeros(a.shape[0]), a])  # coluna de mu
+    return {'type': 'ineq', 'fun': lambda x: a_full @ x - b, 'jac': lambda x: a_full}
+
+# ==================== ESTIMAÇÃO ====================
+class ResultadoRapido:
+    """Resultado com a mesma interface usada do ARCHModelResult do arch"""
+
+    def __init__(self, params, loglikelihood, resid, conditional_volatility, nit, convergence_flag):
+        self.params = params
+        self.loglikelihood = loglikelihood
+        self.num_params = len(params)
+        self.aic = -2 * loglikelihood + 2 * self.num_params
+        self.resid = resid
+        self.conditional_volatility = conditional_volatility
+        self.nit = nit
+        self.convergence_flag = convergence_flag
+
+def estimar(retornos, vol_type, p, o, q, maxiter=1000, starting_values=None):
+    """
+    Ajusta média constante + GARCH/GJR/EGARCH normal por máxima verossimilhança
+    (SLSQP com gradiente analítico). `retornos` pode ser uma pd.Series ou uma
+    EstatisticasRetorno já calculada (reaproveitada entre modelos).
+    """
+    vol = _normalizar_vol(vol_type)
+    estat = retornos if isinstance(retornos, EstatisticasRetorno) else EstatisticasRetorno(retornos)
+
+    # GARCH/GJR é invariante à escala (só mu e omega mudam): otimiza na série
+    # padronizada, bem condicionada, e converte de volta no final.
+    if vol == 'GARCH':
+        s = np.sqrt(estat.var)
+        fator = np.ones(2 + p + o + q)
+        fator[0], fator[1] = s, s ** 2
+        trabalho = estat.padronizada()
+    else:
+        s, fator, trabalho = 1.0, np.ones(2 + p + o + q), estat
+
+    limites = _limites(trabalho, vol, p, o, q)
+    if starting_values is None:
+        sv = _valores_iniciais(trabalho, vol, p, o, q)
+    else:
+        # Semente externa (warm start): só garante que está dentro dos limites
+        sv = np.asarray(starting_values, dtype=float) / fator
+        lo = [-np.inf if a is None else a for a, _ in limites]
+        hi = [np.inf if b is None else b for _, b in limites]
+        sv = np.clip(sv, lo, hi)
+
+    def objetivo(theta):
+        with np.errstate(over='ignore', invalid='ignore'):  # passo que explode → penalidade abaixo
+            ll, grad, _ = loglik_lote(trabalho, vol, p, o, q, theta, gradiente=True)
+        if not np.isfinite(ll[0]):
+            return 1e10, np.zeros_like(theta)
+        return -ll[0], -grad[0]
+
+    opt = minimize(objetivo, sv, jac=True, method='SLSQP', bounds=limites,
+                   constraints=[_restricoes(vol, p, o, q)], options={'maxiter': maxiter})
+
+    ll, _, sigma2 = loglik_lote(trabalho, vol, p, o, q, opt.x)
+    x = opt.x * fator
+    resid = estat.y - x[0]
+    return ResultadoRapido(
+        params=pd.Series(x, index=nomes_parametros(p, o, q), name='params'),
+        loglikelihood=float(ll[0]) - estat.nobs * np.log(s),
+        resid=pd.Series(resid, index=estat.index, name='resid'),
+        conditional_volatility=pd.Series(s * np.sqrt(sigma2[0]), index=estat.index, name='cond_vol'),
+        nit=int(opt.nit),
+        convergence_flag=int(opt.status)
+    )
+
+# ==================== CONFERÊNCIA CONTRA O ARCH ====================
+ESPECIFICACOES_EQUIVALENCIA = [
+    ('GARCH', 1, 0, 1), ('GARCH', 1, 0, 2), ('GARCH', 2, 0, 1),
+    ('GARCH', 1, 1, 1), ('EGARCH', 1, 1, 1), ('EGARCH', 1, 1, 2)
+]
+
+def simular_garch(n, omega=0.02, alpha=0.08, gamma=0.0, beta=0.9, mu=0.03, seed=0):
+    """Série GJR-GARCH(1,1,1) normal sintética (gamma=0 → GARCH(1,1))"""
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal(n + 500)
+    r = np.empty(n + 500)
+    s2 = omega / max(1e-6, 1 - alpha - beta - gamma / 2)
+    eps_ant = 0.0
+    for t in range(n + 500):
+        s2 = omega + (alpha + gamma * (eps_ant < 0)) * eps_ant ** 2 + beta * s2
+        eps_ant = np.sqrt(s2) * z[t]
+        r[t] = mu + eps_ant
+    return pd.Series(r[500:], index=pd.bdate_range('2000-01-03', periods=n))
+
+def simular_egarch(n, omega=-0.01, alpha=0.12, gamma=-0.06, beta=0.97, mu=0.03, seed=0):
+    """Série EGARCH(1,1,1) normal sintética (parametrização do arch)"""
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal(n + 500)
+    r = np.empty(n + 500)
+    ln_s2 = omega / (1 - beta)
+    z_ant = 0.0
+    for t in range(n + 500):
+        ln_s2 = omega + alpha * (abs(z_ant) - np.sqrt(2 / np.pi)) + gamma * z_ant + beta * ln_s2
+        r[t] = mu + np.exp(ln_s2 / 2) * z[t]
+        z_ant = z[t]
+    return pd.Series(r[500:], index=pd.bdate_range('2000-01-03', periods=n))
+
+def verificar_equivalencia(series=None, especificacoes=ESPECIFICACOES_EQUIVALENCIA,
+                           tol_params=5e-3, tol_aic=1e-4, tol_vol=1e-2):
+    """
+    Compara o motor rápido com o arch (params, AIC e volatilidade condicional)
+    dentro de tolerâncias. AIC: relativa; params e vol: absoluta em unidades de
+    desvio-padrão da série. Séries em fração (σ < 0.1) vão ao arch × ESCALA_ARCH,
+    como em analyzer.ajustar_modelo, e params/AIC/vol voltam para fração.
+    'ok' só quando tudo está dentro da tolerância; um AIC estritamente menor
+    que o do arch com params ou vol fora dela não passa e fica marcado à parte
+    (status 'melhor_que_arch', para conferir à mão). Retorna DataFrame com uma
+    linha por (série, modelo).
+    """
+    from arch import arch_model
+
+    if series is None:
+        series = {
+            'garch_2k': simular_garch(2000, seed=1),
+            'gjr_2k': simular_garch(2000, alpha=0.04, gamma=0.1, seed=2),
+            'garch_5k': simular_garch(5000, alpha=0.1, beta=0.85, seed=3),
+            # Retorno em fração (como no Analyzer): o motor rápido otimiza na
+            # série padronizada, o arch na série em %
+            'garch_2k_fracao': simular_garch(2000, alpha=0.06, gamma=0.06, seed=4) / 100,
+        }
+    linhas = []
+    for nome, r in series.items():
+        estat = EstatisticasRetorno(r)
+        escala = np.sqrt(estat.var)
+        fator = ESCALA_ARCH if escala < 0.1 else 1.0
+        for vol, p, o, q in especificacoes:
+            ref = arch_model(r * fator, vol=vol, p=p, o=o, q=q, dist='normal').fit(
+                disp='off', options={'maxiter': 1000})
+            params_ref = reescalar_params(ref.params, vol, 1 / fator).values
+            aic_ref = ref.aic - 2 * ref.nobs * np.log(fator)  # em % a log-verossimilhança perde n·ln(fator)
+            vol_ref = ref.conditional_volatility.values / fator
+            rap = estimar(estat, vol, p, o, q)
+            dp = np.max(np.abs(rap.params.values - params_ref))
+            if vol != 'EGARCH':
+                # omega está em unidades de variância
+                dp = max(np.max(np.abs(np.delete(rap.params.values - params_ref, 1))),
+                         abs(rap.params['omega'] - params_ref[1]) / estat.var)
+            daic = abs(rap.aic - aic_ref) / abs(aic_ref)
+            dvol = np.max(np.abs(rap.conditional_volatility.values - vol_ref)) / escala
+            linhas.append({
+                'serie': nome, 'modelo': f"{vol}({p},{o},{q})",
+                'aic_arch': aic_ref, 'aic_rapido': rap.aic,
+                'dif_params': dp, 'dif_aic_rel': daic, 'dif_vol': dvol,
+                'melhor_que_arch': rap.aic < aic_ref - tol_aic * abs(aic_ref),
+            })
+            igual = daic <= tol_aic and dp <= tol_params and dvol <= tol_vol
+            linhas[-1]['ok'] = igual
+            linhas[-1]['status'] = ('igual' if igual
+                                    else 'melhor_que_arch' if linhas[-1]['melhor_que_arch'] else 'diverge')
+    return pd.DataFrame(linhas)
+
+if __name__ == "__main__":
+    rel = verificar_equivalencia()
+    print(rel.to_string(index=False))
+    melhores = rel[rel['status'] == 'melhor_que_arch']
+    if len(melhores):
+        print(f"\n{len(melhores)} ajuste(s) com AIC menor que o do arch mas params/vol fora da tolerância:")
+        print(melhores[['serie', 'modelo', 'aic_arch', 'aic_rapido', 'dif_params', 'dif_vol']].to_string(index=False))
+    raise SystemExit(0 if rel['ok'].all() else 1)
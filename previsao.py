@@ -0,0 +1,299 @@
+"""
+ASUS GARCH PRO 2025 - PREVISÕES DE VARIÂNCIA E VaR/ES
+Previsões de 1 a 60 dias e VaR/ES a partir dos parâmetros do modelo vencedor
+(selecionar_melhor_modelo), para todos os tickers de uma vez:
+  - GARCH/GJR: variância h passos à frente pela recursão analítica;
+  - EGARCH: 1 passo exato, demais por simulação;
+  - VaR/ES de 1 dia pelo quantil da distribuição dos erros do vencedor
+    (normal, t ou skew-t do arch); horizontes maiores por Monte Carlo, com
+    choques da mesma distribuição.
+A simulação agrupa os tickers de mesma especificação num único array
+(tickers × caminhos), gerado em blocos de tamanho limitado. Cada ticker tem
+o próprio gerador (semente + ticker): o resultado não depende de quais
+outros tickers estão no lote.
+
+Colunas no CSV do MT5 (frações do log-retorno):
+  Vol_h{h}       → σ prevista para o dia t+h
+  VaR{95,99}_{h}d → perda (positiva) no horizonte de h dias
+  ES{95,99}_{h}d  → perda média além do VaR
+"""
+
+import zlib
+import numpy as np
+from scipy import stats
+import motor_garch
+from grade_modelos import PARAMS_DIST
+
+HORIZONTE_MAX = 60
+HORIZONTES_CSV = (1, 5, 10, 20, 60)
+HORIZONTES_VAR = (1, 10)
+NIVEIS_VAR = (0.95, 0.99)
+N_CAMINHOS = 10000
+MAX_ELEMENTOS_BLOCO = 2_000_000  # tickers × caminhos × passos por bloco (~16 MB em float64)
+SEMENTE_PADRAO = 2025
+NOS_CAUDA, PESOS_CAUDA = np.polynomial.legendre.leggauss(64)  # média da cauda (ES) por quadratura
+
+COLUNAS_PREVISAO = ([f'Vol_h{h}' for h in HORIZONTES_CSV]
+                    + [f'{medida}{int(nivel * 100)}_{h}d' for h in HORIZONTES_VAR
+                       for nivel in NIVEIS_VAR for medida in ('VaR', 'ES')])
+
+# ==================== DISTRIBUIÇÃO DOS ERROS ====================
+def quantil_padronizado(u, dist='normal', params_dist=()):
+    """Quantis da distribuição padronizada (média 0, variância 1) dos erros, a mesma do arch"""
+    if dist == 'normal':
+        return stats.norm.ppf(u)
+    from arch.univariate import StudentsT, SkewStudent  # importado sob demanda
+    distribuicao = StudentsT() if dist == 't' else SkewStudent()
+    return np.asarray(distribuicao.ppf(u, [float(v) for v in params_dist]))
+
+def choques(rng, forma, dist='normal', params_dist=()):
+    """Choques padronizados da distribuição dos erros (normal: standard_normal do gerador)"""
+    if dist == 'normal':
+        return rng.standard_normal(forma)
+    u = rng.random(int(np.prod(forma)))
+    return quantil_padronizado(u, dist, params_dist).reshape(forma)
+
+def cauda_parcial(nivel, dist='normal', params_dist=()):
+    """
+    E[z·1(z ≤ z_q)] no quantil 1 - nivel da distribuição padronizada (-φ(z_q)
+    na normal); ES = -(μ + σ·cauda / (1 - nivel)).
+    """
+    a = 1 - nivel
+    if dist == 'normal':
+        return -stats.norm.pdf(stats.norm.ppf(a))
+    # ∫₀ᵃ quantil(u) du com u = a·s⁸: suaviza a singularidade do quantil em u → 0
+    s = (NOS_CAUDA + 1) / 2
+    return float(a * np.sum(PESOS_CAUDA * 4 * s ** 7 * quantil_padronizado(a * s ** 8, dist, params_dist)))
+
+def dist_parametros(params):
+    """Distribuição dos erros a partir dos nomes dos parâmetros (layout do arch)"""
+    for dist in ('skewt', 't'):
+        if all(nome in params.index for nome in PARAMS_DIST[dist]):
+            return dist
+    return 'normal'
+
+# ==================== ESTADO NO FIM DA AMOSTRA ====================
+def estado_final(retornos, vol_type, params, sigma2=None, ticker="", dist=None):
+    """
+    O que a recursão precisa para prever a partir de T: parâmetros (layout do
+    arch), distribuição dos erros, últimos resíduos e variâncias (mais recente
+    primeiro). `sigma2` evita refazer o filtro quando a variância condicional
+    já foi calculada; sem `dist`, a distribuição sai dos nomes em `params`.
+    """
+    dist = dist or dist_parametros(params)
+    p, o, q = motor_garch.ordens_parametros(params)
+    estat = retornos if isinstance(retornos, motor_garch.EstatisticasRetorno) \
+        else motor_garch.EstatisticasRetorno(retornos)
+    theta = np.asarray(params[motor_garch.nomes_parametros(p, o, q)].values, dtype=float)
+    if sigma2 is None:
+        sigma2 = motor_garch.loglik_lote(estat, vol_type, p, o, q, theta)[2][0]
+    sigma2 = np.asarray(sigma2, dtype=float)
+    eps = estat.y - theta[0]
+    m, n_s = max(p, o, 1), max(q, 1)
+    return {
+        'ticker': ticker,
+        'vol': 'EGARCH' if vol_type.upper() == 'EGARCH' else 'GARCH',
+        'p': p, 'o': o, 'q': q,
+        'theta': theta,
+        'dist': dist,
+        'params_dist': np.array([float(params[nome]) for nome in PARAMS_DIST[dist]]),
+        'eps': eps[-m:][::-1].copy(),
+        'sigma2': sigma2[-max(m, n_s):][::-1].copy(),  # EGARCH: σ também dos lags de z
+    }
+
+# ==================== RECURSÕES ====================
+class _Recursao:
+    """
+    Histórico de um grupo de tickers (mesma especificação) com a forma
+    (B,) ou (B, caminhos). proxima() devolve σ² do passo seguinte;
+    avancar() incorpora o choque (simulado ou, na previsão analítica, None).
+    """
+
+    def __init__(self, estados, forma=()):
+        e0 = estados[0]
+        self.egarch, p, o, q = e0['vol'] == 'EGARCH', e0['p'], e0['o'], e0['q']
+        theta = np.stack([e['theta'] for e in estados])
+        extra = (None,) * len(forma)
+        self.mu, self.omega = theta[:, 0][(...,) + extra], theta[:, 1][(...,) + extra]
+        self.alpha = [theta[:, 2 + i][(...,) + extra] for i in range(p)]
+        self.gamma = [theta[:, 2 + p + j][(...,) + extra] for j in range(o)]
+        self.beta = [theta[:, 2 + p + o + k][(...,) + extra] for k in range(q)]
+        eps = np.stack([e['eps'] for e in estados])
+        s2 = np.stack([e['sigma2'] for e in estados])
+        alvo = (len(estados),) + tuple(forma)
+        col = lambda a, i: np.broadcast_to(a[:, i][(...,) + extra], alvo).copy()
+        if self.egarch:
+            zs = eps / np.sqrt(s2[:, :eps.shape[1]])  # z_{T-i} = ε_{T-i} / σ_{T-i}
+            self.z = [col(zs, i) for i in range(eps.shape[1])]
+            self.ln_s2 = [col(np.log(s2), k) for k in range(s2.shape[1])]
+        else:
+            self.e2 = [col(eps ** 2, i) for i in range(eps.shape[1])]
+            self.neg = [col(eps ** 2 * (eps < 0), i) for i in range(eps.shape[1])]
+            self.s2 = [col(s2, k) for k in range(s2.shape[1])]
+
+    def proxima(self):
+        if self.egarch:
+            ln_s2 = (self.omega + sum(a * (np.abs(z) - motor_garch.SQRT2_OV_PI) for a, z in zip(self.alpha, self.z))
+                     + sum(g * z for g, z in zip(self.gamma, self.z))
+                     + sum(b * h for b, h in zip(self.beta, self.ln_s2)))
+            return np.exp(np.minimum(ln_s2, motor_garch.LNSIGMA_MAX))
+        return (self.omega + sum(a * e2 for a, e2 in zip(self.alpha, self.e2))
+                + sum(g * n for g, n in zip(self.gamma, self.neg))
+                + sum(b * s for b, s in zip(self.beta, self.s2)))
+
+    def avancar(self, s2, z=None):
+        """z=None → valor esperado (E[ε²] = σ², E[ε²·1(ε<0)] = σ²/2)"""
+        if self.egarch:
+            self.z = [z] + self.z[:-1]
+            self.ln_s2 = [np.log(s2)] + self.ln_s2[:-1]
+            return
+        if z is None:
+            e2, neg = s2, 0.5 * s2
+        else:
+            e2 = s2 * z * z
+            neg = e2 * (z < 0)
+        self.e2 = [e2] + self.e2[:-1]
+        self.neg = [neg] + self.neg[:-1]
+        self.s2 = [s2] + self.s2[:-1]
+
+def atualizar_estado(estado, novos_retornos):
+    """
+    Avança um estado_final pelos retornos observados depois de T (mais antigo
+    primeiro), sem refazer o filtro na série inteira. Retorna (estado novo,
+    σ² de cada dia novo, z de cada dia novo).
+    """
+    rec = _Recursao([estado])
+    mu = estado['theta'][0]
+    eps, sigma2 = list(estado['eps']), list(estado['sigma2'])
+    s2_novos, z_novos = [], []
+    for r in np.asarray(novos_retornos, dtype=float):
+        s2 = rec.proxima()
+        e = r - mu
+        z = e / np.sqrt(s2)
+        rec.avancar(s2, z)
+        eps = [e] + eps[:-1]
+        sigma2 = [float(s2[0])] + sigma2[:-1]
+        s2_novos.append(float(s2[0]))
+        z_novos.append(float(z[0]))
+    novo = dict(estado, eps=np.array(eps), sigma2=np.array(sigma2))
+    return novo, np.array(s2_novos), np.array(z_novos)
+
+def simular_retornos(estado, Z, descartar=0):
+    """
+    Séries de retornos simuladas a partir de `estado` (formato de
+    estado_final), uma por linha dos choques padronizados Z (séries ×
+    passos), todas de uma vez; os primeiros `descartar` passos (burn-in)
+    não entram na saída.
+    """
+    rec = _Recursao([estado], (Z.shape[0],))
+    saida = np.empty((Z.shape[0], Z.shape[1] - descartar))
+    for h in range(Z.shape[1]):
+        s2 = rec.proxima()
+        z = Z[None, :, h]
+        if h >= descartar:
+            saida[:, h - descartar] = (rec.mu + np.sqrt(s2) * z)[0]
+        rec.avancar(s2, z)
+    return saida
+
+# ==================== PREVISÃO EM LOTE ====================
+def _analitica(estados, horizonte):
+    """GARCH/GJR: E[σ²_{T+h}] pela recursão com os choques futuros no valor esperado"""
+    rec = _Recursao(estados)
+    saida = np.empty((len(estados), horizonte))
+    for h in range(horizonte):
+        s2 = rec.proxima()
+        saida[:, h] = s2
+        rec.avancar(s2)
+    return saida
+
+def _geradores(estados, seed):
+    return [np.random.default_rng([seed, zlib.crc32(str(e['ticker']).encode())]) for e in estados]
+
+def _simular(estados, horizonte, horizontes_ret, n_caminhos, seed, max_elementos):
+    """
+    Monte Carlo do grupo: média de σ²_{T+h} (h = 1..horizonte) e retornos
+    acumulados nos `horizontes_ret`. Caminhos gerados em blocos de até
+    `max_elementos` choques; só os acumulados pedidos ficam guardados.
+    """
+    B = len(estados)
+    geradores = _geradores(estados, seed)
+    soma_s2 = np.zeros((B, horizonte))
+    acumulados = {h: np.empty((B, n_caminhos)) for h in horizontes_ret}
+    bloco = max(1, min(n_caminhos, max_elementos // (B * horizonte)))
+    for ini in range(0, n_caminhos, bloco):
+        c = min(bloco, n_caminhos - ini)
+        Z = np.stack([choques(g, (c, horizonte), e.get('dist', 'normal'), e.get('params_dist', ()))
+                      for g, e in zip(geradores, estados)])  # B × c × horizonte
+        rec = _Recursao(estados, (c,))
+        acum = np.zeros((B, c))
+        for h in range(horizonte):
+            s2 = rec.proxima()
+            z = Z[:, :, h]
+            acum += rec.mu + np.sqrt(s2) * z
+            soma_s2[:, h] += s2.sum(axis=1)
+            rec.avancar(s2, z)
+            if h + 1 in acumulados:
+                acumulados[h + 1][:, ini:ini + c] = acum
+    return soma_s2 / n_caminhos, acumulados
+
+def _var_es(amostras, nivel):
+    """VaR e ES (perdas positivas) de cada linha de `amostras`"""
+    q = np.quantile(amostras, 1 - nivel, axis=1)
+    cauda = np.where(amostras <= q[:, None], amostras, np.nan)
+    return -q, -np.nanmean(cauda, axis=1)
+
+def prever_lote(estados, horizonte=HORIZONTE_MAX, horizontes_var=HORIZONTES_VAR, niveis=NIVEIS_VAR,
+                n_caminhos=N_CAMINHOS, seed=SEMENTE_PADRAO, max_elementos=MAX_ELEMENTOS_BLOCO):
+    """
+    Previsões de vários tickers (lista de estado_final). Retorna, na mesma
+    ordem, dicts {'variancia': σ²_{T+1..T+horizonte}, 'var': {(nivel, h): v},
+    'es': {(nivel, h): v}, 'metodo': 'analitico' | 'simulacao'}.
+    """
+    saida = [None] * len(estados)
+    grupos = {}
+    for i, e in enumerate(estados):
+        grupos.setdefault((e['vol'], e['p'], e['o'], e['q']), []).append(i)
+    longos = sorted(h for h in horizontes_var if h > 1)
+
+    for (vol, _, _, _), idx in grupos.items():
+        grupo = [estados[i] for i in idx]
+        mu = np.array([e['theta'][0] for e in grupo])
+        egarch = vol == 'EGARCH'
+        var_mc, acumulados = None, {}
+        if egarch or longos:
+            h_sim = horizonte if egarch else max(longos)
+            var_mc, acumulados = _simular(grupo, h_sim, longos, n_caminhos, seed, max_elementos)
+        if egarch:
+            variancia = var_mc
+            variancia[:, 0] = _Recursao(grupo).proxima()  # 1 passo é conhecido em T
+        else:
+            variancia = _analitica(grupo, horizonte)
+
+        var, es = {}, {}
+        dists = [(e.get('dist', 'normal'), e.get('params_dist', ())) for e in grupo]
+        for nivel in niveis:
+            sigma1 = np.sqrt(variancia[:, 0])
+            if 1 in horizontes_var:
+                zq = np.array([quantil_padronizado(1 - nivel, d, pd_) for d, pd_ in dists], dtype=float)
+                cauda = np.array([cauda_parcial(nivel, d, pd_) for d, pd_ in dists])
+                var[(nivel, 1)] = -(mu + sigma1 * zq)
+                es[(nivel, 1)] = -(mu + sigma1 * cauda / (1 - nivel))
+            for h in longos:
+                var[(nivel, h)], es[(nivel, h)] = _var_es(acumulados[h], nivel)
+
+        for j, i in enumerate(idx):
+            saida[i] = {
+                'variancia': variancia[j],
+                'var': {k: float(v[j]) for k, v in var.items()},
+                'es': {k: float(v[j]) for k, v in es.items()},
+                'metodo': 'simulacao' if egarch else 'analitico',
+            }
+    return saida
+
+def colunas_previsao(previsao, horizontes=HORIZONTES_CSV):
+    """Colunas do CSV do MT5 (ver COLUNAS_PREVISAO)"""
+    linha = {f'Vol_h{h}': float(np.sqrt(previsao['variancia'][h - 1])) for h in horizontes}
+    for (nivel, h), v in sorted(previsao['var'].items(), key=lambda kv: (kv[0][1], kv[0][0])):
+        linha[f'VaR{int(nivel * 100)}_{h}d'] = v
+        linha[f'ES{int(nivel * 100)}_{h}d'] = previsao['es'][(nivel, h)]
+    return linha
@@ -0,0 +1,429 @@
+"""
+ASUS GARCH PRO 2025 - FEED LOCAL DE PARÂMETROS PARA O MT5
+Publica os parâmetros vencedores (Omega, Alpha_Total, Beta_Total, Gamma,
+os mesmos do CSV do MT5) de cada símbolo de TICKER_MAP num snapshot em
+disco mapeado em memória, lido pelo Expert Advisor sem parsing, e num
+endpoint HTTP em localhost para quem não mapeia o arquivo.
+
+Layout do snapshot (little-endian, tamanho fixo até a capacidade):
+  cabeçalho (64 bytes)
+    0  magic        4s   b'AGPF'
+    4  layout       u16  VERSAO_LAYOUT
+    6  tam_registro u16  64
+    8  sequencia    u64  seqlock: ímpar = escrita em andamento
+   16  versao       u64  +1 a cada publicação
+   24  n_registros  u32
+   28  capacidade   u32
+   32  publicado_em i64  epoch em ms
+   40  flags        u32  bit 0 = arquivo substituído (reabrir)
+   44  crc32        u32  dos n_registros registros
+  registros (64 bytes cada, ordenados por símbolo para busca binária)
+    0  simbolo      16s  ASCII, completado com NUL
+   16  vol          u8   0 = GARCH, 1 = EGARCH, 2 = GJR
+   17  dist         u8   0 = normal, 1 = t, 2 = skew-t
+   18  p, o, q      3×u8
+   21  (3 bytes livres)
+   24  omega, alpha_total, beta_total, gamma   4×f64
+   56  aic, lb_p    2×f32
+
+Leitura consistente (seqlock): ler `sequencia`; se ímpar, tentar de novo;
+copiar os registros; ler `sequencia` outra vez e repetir se mudou. Para
+saber se há parâmetros novos basta comparar `versao` (8 bytes).
+
+Vários escritores (app, analyzer_lote.py --publicar) podem publicar no mesmo
+arquivo: cada publicação trava <arquivo>.lock entre processos e relê versão
+e registros do snapshot antes de mesclar, então a versão só cresce e nenhum
+escritor apaga os símbolos de outro.
+
+Uso (servidor HTTP independente do app, lendo o snapshot):
+    python publicador_mt5.py --servir --arquivo PARAMETROS_MT5.bin --porta 8765
+    python publicador_mt5.py --mostrar
+"""
+
+import argparse
+import json
+import mmap
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+ARQ_SNAPSHOT = "PARAMETROS_MT5.bin"
+PORTA_PADRAO = 8765
+CAPACIDADE_PADRAO = 1024
+VERSAO_LAYOUT = 1
+MAGIC = b'AGPF'
+FLAG_SUBSTITUIDO = 1
+
+CABECALHO = struct.Struct('<4sHHQQIIqII16x')
+OFF_SEQUENCIA = 8
+OFF_VERSAO = 16
+OFF_FLAGS = 40
+
+REGISTRO = np.dtype([
+    ('simbolo', 'S16'), ('vol', 'u1'), ('dist', 'u1'), ('p', 'u1'), ('o', 'u1'), ('q', 'u1'), ('_livre', 'V3'),
+    ('omega', '<f8'), ('alpha_total', '<f8'), ('beta_total', '<f8'), ('gamma', '<f8'),
+    ('aic', '<f4'), ('lb_p', '<f4'),
+])
+assert CABECALHO.size == 64 and REGISTRO.itemsize == 64
+
+CODIGO_VOL = {'GARCH': 0, 'EGARCH': 1, 'GJR': 2}
+CODIGO_DIST = {'normal': 0, 't': 1, 'skewt': 2}
+NOME_VOL = {v: k for k, v in CODIGO_VOL.items()}
+NOME_DIST = {v: k for k, v in CODIGO_DIST.items()}
+
+# ==================== REGISTROS ====================
+def registros_da_tabela(tabela):
+    """Array REGISTRO com os vencedores de uma tabela de candidatos (ver tabela_candidatos.py)"""
+    from tabela_candidatos import visao_feed_mt5
+    df = visao_feed_mt5(tabela)
+    reg = np.zeros(len(df), dtype=REGISTRO)
+    simbolos = [str(a).encode('ascii', 'replace') for a in df['Ativo']]
+    if any(len(s) > 16 for s in simbolos):
+        raise ValueError(f"Símbolo com mais de 16 caracteres: {max(simbolos, key=len).decode()}")
+    reg['simbolo'] = simbolos
+    reg['vol'] = [CODIGO_VOL.get(v, 255) for v in df['vol']]
+    reg['dist'] = [CODIGO_DIST.get(d, 255) for d in df['dist']]
+    for c in ('p', 'o', 'q'):
+        reg[c] = df[c].values
+    reg['omega'], reg['alpha_total'] = df['Omega'].values, df['Alpha_Total'].values
+    reg['beta_total'], reg['gamma'] = df['Beta_Total'].values, df['Gamma'].values
+    reg['aic'], reg['lb_p'] = df['AIC'].values, df['LB_pval'].astype(float).values
+    return reg
+
+def registros_para_dicts(reg):
+    """Registros em dicts JSON-serializáveis (nomes das colunas do CSV do MT5)"""
+    return [{'Ativo': r['simbolo'].decode('ascii'), 'Vol': NOME_VOL.get(int(r['vol']), "?"),
+             'Dist': NOME_DIST.get(int(r['dist']), "?"), 'p': int(r['p']), 'o': int(r['o']), 'q': int(r['q']),
+             'Omega': float(r['omega']), 'Alpha_Total': float(r['alpha_total']),
+             'Beta_Total': float(r['beta_total']), 'Gamma': float(r['gamma']),
+             'AIC': float(r['aic']), 'LB_pval': float(r['lb_p'])} for r in reg]
+
+def _tamanho_arquivo(capacidade):
+    return CABECALHO.size + capacidade * REGISTRO.itemsize
+
+def _cabecalho_valido(bruto):
+    return len(bruto) >= CABECALHO.size and bruto[:4] == MAGIC and \
+        struct.unpack_from('<HH', bruto, 4) == (VERSAO_LAYOUT, REGISTRO.itemsize)
+
+# ==================== ESCRITA ====================
+class _TravaArquivo:
+    """Trava exclusiva entre processos (flock no POSIX, msvcrt no Windows) sobre `caminho`"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self.caminho, 'a+b')
+        if os.name == 'nt':
+            import msvcrt
+            self._f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK desiste depois de ~10 s: continua esperando
+        else:
+            import fcntl
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._f.close()
+            self._f = None
+        return False
+
+class PublicadorParametros:
+    """
+    Escritor do snapshot. Cada publicação mescla os vencedores recebidos
+    (por símbolo) com os já publicados e regrava os registros no mesmo
+    mapeamento, protegidos pelo seqlock. Acima da capacidade, o arquivo é
+    recriado maior (temporário + os.replace) e o antigo é marcado com
+    FLAG_SUBSTITUIDO. Thread-safe dentro do processo; entre processos, cada
+    publicação trava <arquivo>.lock e parte do que está no arquivo (outro
+    escritor pode ter publicado desde a última vez).
+    """
+
+    def __init__(self, arquivo=ARQ_SNAPSHOT, capacidade=CAPACIDADE_PADRAO):
+        self.arquivo = arquivo
+        self._lock = threading.Lock()
+        self._trava = _TravaArquivo(arquivo + ".lock")
+        self._atuais = {}  # simbolo (bytes) -> registro
+        self.versao = 0
+        self._mm = None
+        with self._lock, self._trava:
+            if os.path.exists(arquivo):
+                with open(arquivo, 'rb') as f:
+                    bruto = f.read()
+                if _cabecalho_valido(bruto):
+                    _, _, _, _, versao, n, cap, _, _, _ = CABECALHO.unpack_from(bruto)
+                    self.versao = versao
+                    capacidade = max(capacidade, cap)
+                    reg = np.frombuffer(bruto, dtype=REGISTRO, count=n, offset=CABECALHO.size)
+                    self._atuais = {r['simbolo']: r.copy() for r in reg}
+            self._abrir(max(capacidade, len(self._atuais)))
+
+    def _abrir(self, capacidade):
+        """Cria (ou reaproveita) o arquivo com `capacidade` registros e o mapeia"""
+        tamanho = _tamanho_arquivo(capacidade)
+        if not os.path.exists(self.arquivo) or os.path.getsize(self.arquivo) != tamanho:
+            tmp = self.arquivo + ".tmp"
+            with open(tmp, 'wb') as f:
+                f.write(b"\0" * tamanho)
+            os.replace(tmp, self.arquivo)
+        self.capacidade = capacidade
+        with open(self.arquivo, 'r+b') as f:
+            self._mm = mmap.mmap(f.fileno(), tamanho)
+        self._gravar()
+
+    def _sincronizar(self):
+        """
+        Relê versão e registros do snapshot (com a trava entre processos):
+        outro escritor pode ter publicado ou recriado o arquivo maior.
+        """
+        if self._mm is None or struct.unpack_from('<I', self._mm, OFF_FLAGS)[0] & FLAG_SUBSTITUIDO:
+            if self._mm is not None:
+                self._mm.close()
+            with open(self.arquivo, 'r+b') as f:
+                self._mm = mmap.mmap(f.fileno(), 0)
+            self.capacidade = (len(self._mm) - CABECALHO.size) // REGISTRO.itemsize
+        cabecalho = self._mm[:CABECALHO.size]
+        if not _cabecalho_valido(cabecalho):
+            return
+        _, _, _, _, versao, n, _, _, _, _ = CABECALHO.unpack_from(cabecalho)
+        self.versao = max(self.versao, versao)
+        dados = self._mm[CABECALHO.size:CABECALHO.size + n * REGISTRO.itemsize]  # cópia: o mmap segue fechável
+        self._atuais = {r['simbolo']: r.copy() for r in np.frombuffer(dados, dtype=REGISTRO)}
+
+    def _gravar(self):
+        mm = self._mm
+        reg = np.array([self._atuais[s] for s in sorted(self._atuais)], dtype=REGISTRO)
+        dados = reg.tobytes()
+        sequencia = struct.unpack_from('<Q', mm, OFF_SEQUENCIA)[0]
+        sequencia += 1 if sequencia % 2 == 0 else 0  # ímpar: escrita em andamento
+        struct.pack_into('<Q', mm, OFF_SEQUENCIA, sequencia)
+        mm[CABECALHO.size:CABECALHO.size + len(dados)] = dados
+        self.versao += 1
+        CABECALHO.pack_into(mm, 0, MAGIC, VERSAO_LAYOUT, REGISTRO.itemsize, sequencia, self.versao, len(reg),
+                            self.capacidade, int(time.time() * 1000), 0, zlib.crc32(dados))
+        struct.pack_into('<Q', mm, OFF_SEQUENCIA, sequencia + 1)
+
+    def publicar_registros(self, reg):
+        """Mescla `reg` (array REGISTRO) com o snapshot atual e publica; retorna a versão nova"""
+        with self._lock, self._trava:
+            self._sincronizar()
+            for r in reg:
+                self._atuais[r['simbolo']] = r.copy()
+            if len(self._atuais) > self.capacidade:
+                antigo = self._mm
+                self._abrir(max(2 * self.capacidade, len(self._atuais)))
+                # Leitores do mapeamento antigo precisam reabrir o arquivo
+                flags = struct.unpack_from('<I', antigo, OFF_FLAGS)[0]
+                struct.pack_into('<I', antigo, OFF_FLAGS, flags | FLAG_SUBSTITUIDO)
+                antigo.close()
+            else:
+                self._gravar()
+            return self.versao
+
+    def publicar_tabela(self, tabela):
+        """Publica os vencedores de uma tabela de candidatos"""
+        return self.publicar_registros(registros_da_tabela(tabela))
+
+    def publicar(self, resultados):
+        """Publica os vencedores de resultados do Analyzer (montar_resultado)"""
+        from tabela_candidatos import construir_tabela
+        return self.publicar_tabela(construir_tabela(resultados))
+
+    def simbolos(self):
+        with self._lock, self._trava:
+            self._sincronizar()
+            return [s.decode('ascii') for s in sorted(self._atuais)]
+
+    def fechar(self):
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+
+# ==================== LEITURA ====================
+class LeitorSnapshot:
+    """
+    Leitor do snapshot pelo mapeamento (o mesmo protocolo do EA). versao()
+    custa uma leitura de 8 bytes; ler() devolve uma cópia consistente.
+    Reabre o arquivo quando ele é recriado (FLAG_SUBSTITUIDO).
+    """
+
+    def __init__(self, arquivo=ARQ_SNAPSHOT, max_tentativas=1000):
+        self.arquivo = arquivo
+        self.max_tentativas = max_tentativas
+        self._mm = None
+
+    def _mapeamento(self):
+        if self._mm is not None and not struct.unpack_from('<I', self._mm, OFF_FLAGS)[0] & FLAG_SUBSTITUIDO:
+            return self._mm
+        self.fechar()
+        try:
+            with open(self.arquivo, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None  # ainda não publicado (ou arquivo vazio)
+        if mm[:4] == b"\0" * 4:
+            mm.close()
+            return None  # criado, primeira publicação em andamento
+        if not _cabecalho_valido(mm[:CABECALHO.size]):
+            mm.close()
+            raise ValueError(f"{self.arquivo} não é um snapshot do feed do MT5 (layout {VERSAO_LAYOUT})")
+        self._mm = mm
+        return mm
+
+    def versao(self):
+        """Versão publicada (0 = arquivo ainda não existe)"""
+        mm = self._mapeamento()
+        return 0 if mm is None else struct.unpack_from('<Q', mm, OFF_VERSAO)[0]
+
+    def ler(self):
+        """(versao, publicado_em em ms, array REGISTRO) consistentes entre si"""
+        for _ in range(self.max_tentativas):
+            mm = self._mapeamento()
+            if mm is None:
+                return 0, 0, np.zeros(0, dtype=REGISTRO)
+            antes = struct.unpack_from('<Q', mm, OFF_SEQUENCIA)[0]
+            if antes % 2:
+                time.sleep(0)
+                continue
+            _, _, _, _, versao, n, _, publicado_em, _, crc = CABECALHO.unpack_from(mm)
+            dados = mm[CABECALHO.size:CABECALHO.size + n * REGISTRO.itemsize]
+            if struct.unpack_from('<Q', mm, OFF_SEQUENCIA)[0] == antes and zlib.crc32(dados) == crc:
+                return versao, publicado_em, np.frombuffer(dados, dtype=REGISTRO)
+        raise TimeoutError(f"Snapshot {self.arquivo} em escrita contínua")
+
+    def fechar(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+# ==================== SERVIDOR HTTP ====================
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: o EA reaproveita a conexão entre consultas
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status, corpo=b"", tipo="application/json", etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        caminho = self.path.split('?', 1)[0].rstrip('/')
+        visao = self.server.visao()
+        if caminho == "/versao":
+            return self._responder(200, visao['versao_txt'], "text/plain")
+        if self.headers.get("If-None-Match") == visao['etag']:
+            return self._responder(304, etag=visao['etag'])
+        if caminho == "/snapshot":
+            return self._responder(200, visao['binario'], "application/octet-stream", visao['etag'])
+        if caminho == "/parametros":
+            return self._responder(200, visao['json'], etag=visao['etag'])
+        if caminho.startswith("/parametros/"):
+            corpo = visao['por_simbolo'].get(caminho[len("/parametros/"):].upper())
+            if corpo is not None:
+                return self._responder(200, corpo, etag=visao['etag'])
+        self._responder(404, b'{"erro": "nao encontrado"}')
+
+class ServidorParametros(ThreadingHTTPServer):
+    """
+    Endpoint HTTP em localhost sobre o snapshot (somente leitura):
+      GET /versao               → versão publicada (texto)
+      GET /snapshot             → registros no layout binário do arquivo
+      GET /parametros           → todos os símbolos em JSON
+      GET /parametros/<SIMBOLO> → um símbolo em JSON
+    As respostas são montadas uma vez por versão; ETag = versão
+    (If-None-Match → 304).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, arquivo=ARQ_SNAPSHOT, host="127.0.0.1", porta=PORTA_PADRAO):
+        self.leitor = LeitorSnapshot(arquivo)
+        self._lock = threading.Lock()
+        self._visao = None
+        super().__init__((host, porta), _Handler)
+
+    def visao(self):
+        """Respostas prontas da versão atual (refeitas só quando a versão muda)"""
+        with self._lock:
+            if self._visao is None or self._visao['versao'] != self.leitor.versao():
+                versao, publicado_em, reg = self.leitor.ler()
+                linhas = registros_para_dicts(reg)
+                self._visao = {
+                    'versao': versao, 'etag': f'"{versao}"', 'versao_txt': str(versao).encode(),
+                    'binario': reg.tobytes(),
+                    'json': json.dumps({'versao': versao, 'publicado_em': publicado_em,
+                                        'parametros': linhas}).encode(),
+                    'por_simbolo': {l['Ativo'].upper(): json.dumps(dict(l, versao=versao)).encode()
+                                    for l in linhas},
+                }
+            return self._visao
+
+    def iniciar(self):
+        """Atende numa thread daemon; retorna a própria instância"""
+        threading.Thread(target=self.serve_forever, name="feed-mt5", daemon=True).start()
+        return self
+
+    def parar(self):
+        self.shutdown()
+        self.server_close()
+        self.leitor.fechar()
+
+# ==================== LINHA DE COMANDO ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Feed local de parâmetros GARCH para o MT5")
+    parser.add_argument("--arquivo", default=ARQ_SNAPSHOT, help="snapshot mapeado em memória")
+    parser.add_argument("--servir", action="store_true", help="atende o endpoint HTTP em localhost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--mostrar", action="store_true", help="imprime o snapshot atual")
+    args = parser.parse_args(argv)
+
+    if args.mostrar:
+        versao, publicado_em, reg = LeitorSnapshot(args.arquivo).ler()
+        print(f"Versão {versao} · {len(reg)} símbolos · publicado em {publicado_em}")
+        for linha in registros_para_dicts(reg):
+            print(f"  {linha['Ativo']:<16} {linha['Vol']:<6} {linha['Dist']:<6} Ω={linha['Omega']:.6g} "
+                  f"α={linha['Alpha_Total']:.4f} β={linha['Beta_Total']:.4f} γ={linha['Gamma']:.4f}")
+    if args.servir:
+        servidor = ServidorParametros(args.arquivo, args.host, args.porta)
+        print(f"Feed do MT5 em http://{args.host}:{args.porta}/parametros ({args.arquivo})")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            servidor.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
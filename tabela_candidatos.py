@@ -0,0 +1,249 @@
+"""
+ASUS GARCH PRO 2025 - TABELA COLUNAR DE CANDIDATOS
+Todos os modelos ajustados de cada ticker (não só o vencedor) numa tabela
+Arrow tipada: especificação, parâmetros, AIC, Ljung-Box, convergência, tempo
+de ajuste e, na linha do vencedor, as previsões/VaR/ES. Gravada em Parquet
+para consulta posterior (pq.read_table com filtros/colunas, DuckDB, pandas).
+O relatório TXT e o CSV do MT5 são visões desta tabela, montadas com
+operações vetorizadas sobre as colunas.
+"""
+
+from datetime import date
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import motor_garch
+from previsao import COLUNAS_PREVISAO, colunas_previsao
+
+MAX_LAGS = 3  # colunas alpha_1..3, gamma_1..3, beta_1..3 (nulas quando o modelo não tem o lag)
+
+_PARAMS = (['mu', 'omega'] + [f'alpha_{i}' for i in range(1, MAX_LAGS + 1)]
+           + [f'gamma_{i}' for i in range(1, MAX_LAGS + 1)] + [f'beta_{i}' for i in range(1, MAX_LAGS + 1)]
+           + ['nu', 'eta', 'lambda'])  # t (nu) e skew-t (eta, lambda)
+
+_COLUNA_PARAM = {c if '_' not in c else c.replace('_', '[') + ']': c for c in _PARAMS}  # 'alpha[1]' → 'alpha_1'
+
+SCHEMA = pa.schema(
+    [('data_analise', pa.date32()), ('inicio', pa.date32()), ('fim', pa.date32()),
+     ('ticker', pa.dictionary(pa.int32(), pa.string())), ('ativo', pa.dictionary(pa.int32(), pa.string())),
+     ('modelo', pa.dictionary(pa.int8(), pa.string())), ('model_name', pa.string()),
+     ('vol', pa.dictionary(pa.int8(), pa.string())), ('p', pa.int8()), ('o', pa.int8()), ('q', pa.int8()),
+     ('dist', pa.dictionary(pa.int8(), pa.string())),
+     ('vencedor', pa.bool_()), ('sucesso', pa.bool_()), ('convergiu', pa.bool_()), ('do_cache', pa.bool_()),
+     ('semente', pa.string()), ('nit', pa.int32()), ('aic', pa.float64()), ('lb_p', pa.float64()),
+     ('tempo_ajuste_s', pa.float32()), ('tempo_lb_s', pa.float32())]
+    + [(c, pa.float64()) for c in _PARAMS]
+    + [(c, pa.float64()) for c in COLUNAS_PREVISAO]
+)
+
+# ==================== CONSTRUÇÃO ====================
+def _data(valor):
+    if valor is None or isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10])
+
+def _colunas_params(params):
+    linha = dict.fromkeys(_PARAMS)
+    if params is None:
+        return linha
+    for nome, valor in zip(params.index.tolist(), params.to_numpy(dtype=float).tolist()):
+        chave = _COLUNA_PARAM.get(nome)
+        if chave is not None:
+            linha[chave] = valor
+    return linha
+
+def _especificacao(c):
+    """(vol, p, o, q) do candidato; ajustes antigos do cache não a trazem"""
+    if c.get('especificacao'):
+        return c['especificacao']
+    if c.get('params') is not None:
+        return (c['model_name'].split('(')[0],) + motor_garch.ordens_parametros(c['params'])
+    return (c['model_name'].split('(')[0], None, None, None)
+
+def linhas_ticker(resultado, previsao=None, inicio=None, fim=None, data_analise=None):
+    """Linhas (dicts) de um resultado do Analyzer: uma por candidato"""
+    candidatos = resultado.get('candidatos')
+    if not candidatos or 'params' not in candidatos[0]:
+        # Resultado sem os candidatos completos (ex.: gerado por versões antigas): só o vencedor
+        candidatos = [{'modelo': resultado['model_name'], 'model_name': resultado['model_name'],
+                       'params': resultado['params'], 'aic': resultado['aic'], 'lb_p': resultado['lb_p'],
+                       'sucesso': True, 'vencedor': True}]
+    base = {'data_analise': _data(data_analise or date.today()), 'inicio': _data(inicio), 'fim': _data(fim),
+            'ticker': resultado['ticker'], 'ativo': resultado['ativo']}
+    linhas = []
+    for c in candidatos:
+        vol, p, o, q = _especificacao(c)
+        linha = dict(base, modelo=c['modelo'], model_name=c['model_name'], vol=vol, p=p, o=o, q=q,
+                     dist=c.get('dist', 'normal'),
+                     vencedor=bool(c.get('vencedor')), sucesso=bool(c['sucesso']),
+                     convergiu=c.get('convergiu'), do_cache=c.get('do_cache'), semente=c.get('semente'),
+                     nit=c.get('nit'), aic=float(c['aic']),
+                     lb_p=None if c.get('lb_p') is None else float(c['lb_p']),
+                     tempo_ajuste_s=c.get('tempo_ajuste_s'), tempo_lb_s=c.get('tempo_lb_s'))
+        linha.update(_colunas_params(c.get('params')))
+        if linha['vencedor'] and previsao is not None:
+            linha.update(colunas_previsao(previsao))
+        linhas.append(linha)
+    return linhas
+
+def construir_tabela(resultados, previsoes=None, inicio=None, fim=None, data_analise=None):
+    """pa.Table (SCHEMA) com todos os candidatos de todos os resultados, na ordem recebida"""
+    previsoes = previsoes or [None] * len(resultados)
+    linhas = []
+    for r, previsao in zip(resultados, previsoes):
+        linhas.extend(linhas_ticker(r, previsao, inicio, fim, data_analise))
+    return tabela_de_linhas(linhas)
+
+def tabela_de_linhas(linhas):
+    return pa.Table.from_pylist([dict(l, data_analise=_data(l['data_analise']), inicio=_data(l['inicio']),
+                                      fim=_data(l['fim'])) for l in linhas], schema=SCHEMA)
+
+# ==================== PARQUET ====================
+def gravar_parquet(tabela, destino):
+    """Parquet (zstd) num caminho ou objeto de arquivo; retorna o destino"""
+    pq.write_table(tabela, destino, compression='zstd')
+    return destino
+
+def ler_tabela(origem, colunas=None, filtros=None):
+    """
+    Lê um Parquet (ou diretório de Parquets) lendo só as `colunas` e linhas
+    pedidas, ex.: filtros=[('vencedor', '=', True), ('vol', '=', 'EGARCH')].
+    """
+    return pq.read_table(origem, columns=colunas, filters=filtros)
+
+# ==================== VISÕES ====================
+def vencedores(tabela):
+    """DataFrame só com as linhas dos vencedores (um por ticker, na ordem da tabela)"""
+    return tabela.filter(pa.compute.field('vencedor')).to_pandas()
+
+def _totais(df):
+    """omega, alpha_total, beta_total e gamma[1] como em extrair_parametros"""
+    alpha = beta = 0
+    for i in range(1, MAX_LAGS + 1):
+        alpha = alpha + df[f'alpha_{i}'].fillna(0).values
+        beta = beta + df[f'beta_{i}'].fillna(0).values
+    return (df['omega'].fillna(0).values, np.asarray(alpha, dtype=float),
+            np.asarray(beta, dtype=float), df['gamma_1'].fillna(0).values)
+
+def visao_csv_mt5(tabela):
+    """CSV do MT5: uma linha por vencedor (+ previsões, se a tabela as tiver)"""
+    df = vencedores(tabela)
+    omega, alpha, beta, gamma = _totais(df)
+    csv = pd.DataFrame({
+        'Ativo': df['ativo'].astype(object).values,
+        'Modelo': df['model_name'].values,
+        'Omega': omega,
+        'Alpha_Total': alpha,
+        'Beta_Total': beta,
+        'Gamma': gamma,
+        'AIC': df['aic'].values,
+        'LB_pval': df['lb_p'].values
+    })
+    previsoes = [c for c in COLUNAS_PREVISAO if df[c].notna().any()]
+    for c in previsoes:
+        csv[c] = df[c].values
+    return csv
+
+def visao_feed_mt5(tabela):
+    """Vencedores para o feed local do MT5 (publicador_mt5.py): especificação + totais do CSV"""
+    df = vencedores(tabela)
+    omega, alpha, beta, gamma = _totais(df)
+    return pd.DataFrame({
+        'Ativo': df['ativo'].astype(object).values,
+        'vol': df['vol'].astype(object).values,
+        'dist': df['dist'].astype(object).fillna('normal').values,
+        'p': df['p'].fillna(0).astype(int).values,
+        'o': df['o'].fillna(0).astype(int).values,
+        'q': df['q'].fillna(0).astype(int).values,
+        'Omega': omega,
+        'Alpha_Total': alpha,
+        'Beta_Total': beta,
+        'Gamma': gamma,
+        'AIC': df['aic'].values,
+        'LB_pval': df['lb_p'].values
+    })
+
+def _texto(valores):
+    """Array numpy de str (np.char não aceita object nem as strings do pandas/Arrow)"""
+    return np.array([str(v) for v in valores], dtype=str)
+
+def _juntar(acumulado, regra):
+    """Acrescenta `regra` (array de str, '' = não se aplica) com ' | ' entre as regras"""
+    com_separador = np.where((acumulado != '') & (regra != ''), np.char.add(acumulado, ' | '), acumulado)
+    return np.char.add(com_separador, regra)
+
+def _tipo_ativo(ativo, ticker):
+    forex = ativo.isin(['EURUSD', 'USDBRL']) | ticker.str.contains('USD', regex=False) \
+        | ticker.str.contains('=X', regex=False)
+    futuros = ticker.str.contains('=F', regex=False) | ativo.isin(['ES', 'NQ', 'RTY', 'YM'])
+    indice = ativo.str.startswith('^') | ativo.isin(['SPX', 'NDX', 'RUT'])
+    return np.select([forex, futuros, indice], ["FOREX", "FUTUROS", "INDICE"], "ACAO")
+
+# Rótulos de cada regra da interpretação automática, na ordem do relatório
+ROTULOS_REGRAS = (
+    ("QUEDAS EXPLODEM VOL!", "Quedas aumentam vol", "Leve alavancagem"),
+    ("VOL DURA MUITO (CRISES)", "Vol persistente"),
+    ("REAÇÃO FORTE A NOTÍCIAS", "Choques moderados"),
+    ("FOREX CLÁSSICO", "VOL TÉCNICA (FUTUROS)", "ACAO MADURA", "ACAO VOLÁTIL"),
+    ("TECH/PÂNICO",),
+)
+ROTULO_ESTAVEL = "Estável"  # nenhuma regra se aplica
+
+def regras_interpretacao(ativo, ticker, modelo, omega, alpha, beta):
+    """
+    Rótulo de cada regra (ROTULOS_REGRAS; '' = não se aplica) para cada
+    linha: ativo/ticker/modelo são Series (object), omega/alpha/beta os
+    totais de _totais. Usada pelo relatório e pelo bootstrap dos parâmetros.
+    """
+    tipo = _tipo_ativo(ativo, ticker)
+    egarch = modelo.str.startswith('EGARCH').values
+    garch = modelo.str.startswith('GARCH').values
+    vazio = np.full(len(modelo), '', dtype=object)
+    alavancagem, persistencia, choques, perfil, panico = ROTULOS_REGRAS
+    return [
+        np.select([egarch & (omega < -0.5), egarch & (omega < -0.2), egarch & (omega < 0)],
+                  list(alavancagem), vazio),
+        np.select([beta > 0.98, beta > 0.95], list(persistencia), vazio),
+        np.select([alpha > 0.20, alpha > 0.10], list(choques), vazio),
+        np.select([(tipo == "FOREX") & garch & (alpha < 0.07) & (beta > 0.90),
+                   (tipo == "FUTUROS") & garch & (alpha > 0.08),
+                   (tipo == "ACAO") & garch & (alpha < 0.07),
+                   (tipo == "ACAO") & garch & (alpha > 0.15)],
+                  list(perfil), vazio),
+        np.where(egarch & (omega < -0.3), panico[0], vazio),
+    ]
+
+def visao_linhas_relatorio(tabela):
+    """Linhas da tabela do relatório TXT (vencedor + interpretação), uma por ticker"""
+    df = vencedores(tabela)
+    if df.empty:
+        return []
+    ativo, ticker = df['ativo'].astype(object), df['ticker'].astype(object)
+    modelo = df['model_name'].astype(object)
+    omega, alpha, beta, gamma = _totais(df)
+    aic, lb = df['aic'].values, df['lb_p'].values
+
+    regras = regras_interpretacao(ativo, ticker, modelo, omega, alpha, beta)
+    interp = np.array([''] * len(df), dtype=str)
+    for regra in regras:
+        interp = _juntar(interp, _texto(regra))
+    interp = np.where(interp == '', ROTULO_ESTAVEL, interp)
+    status = np.where(lb > 0.05, "EXCELENTE", "BOM")
+
+    colunas = [
+        np.char.ljust(_texto(ativo), 8),
+        np.char.ljust(_texto(modelo), 16),
+        np.char.ljust(np.char.mod('%.1f', aic), 8),
+        np.char.ljust(np.char.mod('%.3f', lb), 6),
+        np.char.ljust(np.char.mod('%.6f', omega), 12),
+        np.char.ljust(np.char.mod('%.6f', alpha), 10),
+        np.char.ljust(np.char.mod('%.6f', beta), 10),
+        np.char.ljust(np.char.mod('%.6f', gamma), 10),
+        np.char.ljust(_texto(status), 10),
+        np.char.ljust(_texto(interp), 50),
+    ]
+    linhas = colunas[0]
+    for c in colunas[1:]:
+        linhas = np.char.add(np.char.add(linhas, ' '), c)
+    return linhas.tolist()
@@ -0,0 +1,207 @@
+"""
+ASUS GARCH PRO 2025 - TAREFAS EM SEGUNDO PLANO
+Fila de análises executadas fora da thread do script do Streamlit: um rerun
+(qualquer clique num widget) ou uma reconexão não interrompe mais a análise.
+Cada tarefa tem um id, progresso consultável, cancelamento cooperativo e o
+resultado gravado em disco (<diretorio>/<id>.pkl), para ser buscado depois
+por qualquer sessão do mesmo usuário. A fila tem limite total e por usuário.
+"""
+
+import json
+import os
+import pickle
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+TAREFAS_DIR = "tarefas"
+MAX_SIMULTANEAS = 2     # análises rodando ao mesmo tempo (cada uma pode ter seu pool de processos)
+MAX_FILA = 8            # tarefas aguardando um worker, somando todos os usuários
+MAX_POR_USUARIO = 2     # tarefas na fila + em execução de um mesmo usuário
+DIAS_RETENCAO = 7
+INTERVALO_GRAVACAO_S = 1.0  # progresso vai para o disco no máximo uma vez por intervalo
+
+NA_FILA, EXECUTANDO, CONCLUIDA, CANCELADA, FALHOU, INTERROMPIDA = (
+    "na_fila", "executando", "concluida", "cancelada", "falhou", "interrompida")
+ATIVAS = (NA_FILA, EXECUTANDO)
+
+class FilaCheia(RuntimeError):
+    """Limite de tarefas da fila (total ou do usuário) atingido"""
+
+class GerenciadorTarefas:
+    """
+    Pool de `max_simultaneas` threads. A função da tarefa recebe
+    (progresso, cancelado): progresso(concluidos, total, mensagem) atualiza o
+    estado e cancelado (threading.Event) deve ser consultado entre as etapas.
+    O estado de cada tarefa fica em <id>.json; tarefas ativas de um servidor
+    anterior aparecem como 'interrompida'. Thread-safe.
+    """
+
+    def __init__(self, diretorio=TAREFAS_DIR, max_simultaneas=MAX_SIMULTANEAS, max_fila=MAX_FILA,
+                 max_por_usuario=MAX_POR_USUARIO, dias_retencao=DIAS_RETENCAO):
+        self.diretorio = diretorio
+        self.max_simultaneas = max_simultaneas
+        self.max_fila = max_fila
+        self.max_por_usuario = max_por_usuario
+        self._pool = ThreadPoolExecutor(max_workers=max_simultaneas, thread_name_prefix="tarefa")
+        self._lock = threading.Lock()
+        self._estados = {}    # id -> dict (o mesmo gravado no JSON)
+        self._cancelar = {}   # id -> threading.Event (só tarefas ativas)
+        self._gravado_em = {}
+        os.makedirs(diretorio, exist_ok=True)
+        self._recuperar(dias_retencao)
+
+    # ---------- disco ----------
+    def _caminho(self, id_tarefa, ext):
+        return os.path.join(self.diretorio, f"{id_tarefa}.{ext}")
+
+    def _gravar_estado(self, estado):
+        """JSON gravado num temporário e renomeado (nunca fica meio escrito)"""
+        tmp = self._caminho(estado['id'], "json.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, ensure_ascii=False)
+        os.replace(tmp, self._caminho(estado['id'], "json"))
+        self._gravado_em[estado['id']] = time.monotonic()
+
+    def _recuperar(self, dias_retencao):
+        limite = datetime.now() - timedelta(days=dias_retencao)
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.diretorio, nome), 'r', encoding='utf-8') as f:
+                    estado = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if datetime.fromisoformat(estado['criada_em']) < limite:
+                for ext in ("json", "pkl"):
+                    if os.path.exists(self._caminho(estado['id'], ext)):
+                        os.remove(self._caminho(estado['id'], ext))
+                continue
+            if estado['status'] in ATIVAS:
+                # O processo que rodava a tarefa não existe mais
+                estado.update(status=INTERROMPIDA, finalizada_em=datetime.now().isoformat(timespec='seconds'))
+                self._gravar_estado(estado)
+            self._estados[estado['id']] = estado
+
+    # ---------- fila ----------
+    def submeter(self, dono, funcao, descricao="", parametros=None):
+        """
+        Enfileira funcao(progresso, cancelado) → resultado (picklável).
+        Retorna o id da tarefa; levanta FilaCheia acima dos limites.
+        """
+        with self._lock:
+            ativas = [e for e in self._estados.values() if e['status'] in ATIVAS]
+            if sum(e['dono'] == dono for e in ativas) >= self.max_por_usuario:
+                raise FilaCheia(f"Limite de {self.max_por_usuario} análises por usuário em andamento")
+            if sum(e['status'] == NA_FILA for e in ativas) >= self.max_fila:
+                raise FilaCheia(f"Fila cheia ({self.max_fila} análises aguardando)")
+            id_tarefa = uuid.uuid4().hex[:12]
+            estado = {
+                'id': id_tarefa, 'dono': dono, 'descricao': descricao, 'parametros': parametros or {},
+                'status': NA_FILA, 'concluidos': 0, 'total': 0, 'mensagem': "Aguardando na fila...",
+                'erro': None, 'criada_em': datetime.now().isoformat(timespec='seconds'),
+                'iniciada_em': None, 'finalizada_em': None
+            }
+            self._estados[id_tarefa] = estado
+            self._cancelar[id_tarefa] = threading.Event()
+            self._gravar_estado(estado)
+        self._pool.submit(self._executar, id_tarefa, funcao)
+        return id_tarefa
+
+    def _atualizar(self, id_tarefa, forcar=False, **campos):
+        with self._lock:
+            estado = self._estados[id_tarefa]
+            estado.update(campos)
+            if forcar or time.monotonic() - self._gravado_em.get(id_tarefa, 0) >= INTERVALO_GRAVACAO_S:
+                self._gravar_estado(estado)
+
+    def _executar(self, id_tarefa, funcao):
+        # Checagem e passagem para EXECUTANDO sob o lock: um cancelar() no meio não se perde
+        with self._lock:
+            cancelado = self._cancelar.get(id_tarefa)
+            estado = self._estados[id_tarefa]
+            if cancelado is None or cancelado.is_set():
+                # Cancelada ainda na fila (cancelar() já tirou o evento e gravou o estado)
+                if estado['status'] in ATIVAS:
+                    estado.update(status=CANCELADA, mensagem="Cancelada na fila",
+                                  finalizada_em=datetime.now().isoformat(timespec='seconds'))
+                    self._gravar_estado(estado)
+                self._cancelar.pop(id_tarefa, None)
+                return
+            estado.update(status=EXECUTANDO, mensagem="Iniciando...",
+                          iniciada_em=datetime.now().isoformat(timespec='seconds'))
+            self._gravar_estado(estado)
+
+        def progresso(concluidos, total, mensagem=""):
+            self._atualizar(id_tarefa, concluidos=concluidos, total=total, mensagem=mensagem)
+
+        try:
+            resultado = funcao(progresso, cancelado)
+            if cancelado.is_set():
+                final = dict(status=CANCELADA, mensagem="Cancelada pelo usuário")
+            else:
+                with open(self._caminho(id_tarefa, "pkl.tmp"), 'wb') as f:
+                    pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(self._caminho(id_tarefa, "pkl.tmp"), self._caminho(id_tarefa, "pkl"))
+                final = dict(status=CONCLUIDA, mensagem="Concluída")
+        except Exception as e:
+            final = dict(status=FALHOU, erro=f"{type(e).__name__}: {e}", mensagem="Falhou")
+        self._atualizar(id_tarefa, forcar=True, finalizada_em=datetime.now().isoformat(timespec='seconds'),
+                        **final)
+        with self._lock:
+            self._cancelar.pop(id_tarefa, None)
+
+    def cancelar(self, id_tarefa, dono=None):
+        """Pede o cancelamento; na fila, a tarefa sai na hora. Retorna False se não estava ativa"""
+        with self._lock:
+            estado = self._estados.get(id_tarefa)
+            evento = self._cancelar.get(id_tarefa)
+            if estado is None or evento is None or (dono is not None and estado['dono'] != dono):
+                return False
+            evento.set()
+            if estado['status'] == NA_FILA:
+                estado.update(status=CANCELADA, mensagem="Cancelada na fila",
+                              finalizada_em=datetime.now().isoformat(timespec='seconds'))
+                self._cancelar.pop(id_tarefa, None)
+            else:
+                estado['mensagem'] = "Cancelando..."
+            self._gravar_estado(estado)
+            return True
+
+    # ---------- consulta ----------
+    def estado(self, id_tarefa):
+        """Cópia do estado (com 'posicao_fila' para as que aguardam) ou None"""
+        with self._lock:
+            estado = self._estados.get(id_tarefa)
+            if estado is None:
+                return None
+            estado = dict(estado)
+            if estado['status'] == NA_FILA:
+                fila = sorted((e['criada_em'], e['id']) for e in self._estados.values() if e['status'] == NA_FILA)
+                estado['posicao_fila'] = fila.index((estado['criada_em'], id_tarefa)) + 1
+            return estado
+
+    def listar(self, dono):
+        """Tarefas do usuário, mais recentes primeiro"""
+        with self._lock:
+            return sorted((dict(e) for e in self._estados.values() if e['dono'] == dono),
+                          key=lambda e: e['criada_em'], reverse=True)
+
+    def resultado(self, id_tarefa):
+        """Resultado de uma tarefa concluída (lido do disco) ou None"""
+        caminho = self._caminho(id_tarefa, "pkl")
+        if not os.path.exists(caminho):
+            return None
+        with open(caminho, 'rb') as f:
+            return pickle.load(f)
+
+    def resumo(self):
+        """Contagem de tarefas por status (todas as sessões)"""
+        with self._lock:
+            contagem = {}
+            for e in self._estados.values():
+                contagem[e['status']] = contagem.get(e['status'], 0) + 1
+            return contagem
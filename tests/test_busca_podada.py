@@ -0,0 +1,33 @@
+"""Busca podada × grade exaustiva (grade estendida, t/skew-t e ordens até 3,3)"""
+
+import warnings
+import pytest
+import motor_garch
+from analyzer import selecionar_melhor_modelo, BuscaPodada, GRADES
+
+# Log-retornos em fração, como no Analyzer
+SERIES = {
+    'gjr_gamma_012': lambda: motor_garch.simular_garch(3000, alpha=0.03, gamma=0.12, beta=0.88, seed=5) / 100,
+    'gjr_gamma_010': lambda: motor_garch.simular_garch(3000, alpha=0.04, gamma=0.1, beta=0.88, seed=11) / 100,
+    'egarch': lambda: motor_garch.simular_egarch(3000, seed=7) / 100,
+}
+
+
+@pytest.fixture(scope="module", params=sorted(SERIES))
+def exaustivo(request):
+    retornos = SERIES[request.param]()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        melhor, _ = selecionar_melhor_modelo(retornos, "SINT", "rapido", modelos=GRADES['estendida'])
+    return retornos, melhor
+
+
+@pytest.mark.parametrize("busca", [BuscaPodada(), BuscaPodada(subamostra=None)], ids=repr)
+def test_podada_escolhe_o_vencedor_da_exaustiva(exaustivo, busca):
+    retornos, melhor = exaustivo
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        podado, _ = selecionar_melhor_modelo(retornos, "SINT", "rapido", modelos=GRADES['estendida'], busca=busca)
+    assert podado['model_name'] == melhor['model_name']
+    assert podado['aic'] == pytest.approx(melhor['aic'], abs=1e-3)
+    assert podado['poda']['evitados'] > 0
@@ -0,0 +1,38 @@
+"""Ljung-Box e ARCH-LM em lote conferidos contra o statsmodels"""
+
+import warnings
+import numpy as np
+import pytest
+from statsmodels.stats.diagnostic import acorr_ljungbox, het_arch
+import motor_garch
+from diagnosticos import ljung_box_lote, arch_lm_lote
+
+
+@pytest.fixture(scope="module")
+def residuos():
+    # Tamanhos diferentes (uma FFT/regressão por grupo) e uma série com efeito ARCH
+    rng = np.random.default_rng(3)
+    return [rng.standard_normal(500), rng.standard_t(5, 500), rng.standard_normal(731),
+            motor_garch.simular_garch(1200, seed=9)]
+
+
+@pytest.mark.parametrize("model_df", [0, 2])
+def test_ljung_box_lote_igual_statsmodels(residuos, model_df):
+    lags = [5, 10, 20]
+    z2 = [z ** 2 for z in residuos]
+    estat, pval = ljung_box_lote(z2, lags=lags, model_df=model_df)
+    for i, x in enumerate(z2):
+        ref = acorr_ljungbox(x, lags=lags, model_df=model_df)
+        np.testing.assert_allclose(estat[i], ref['lb_stat'].values, rtol=1e-9)
+        np.testing.assert_allclose(pval[i], ref['lb_pvalue'].values, rtol=1e-9, atol=1e-300)
+
+
+@pytest.mark.parametrize("nlags, ddof", [(5, 0), (10, 3)])
+def test_arch_lm_lote_igual_statsmodels(residuos, nlags, ddof):
+    lm, pval = arch_lm_lote([z ** 2 for z in residuos], nlags=nlags, ddof=ddof)
+    for i, z in enumerate(residuos):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)  # aviso do formato de retorno do acorr_lm
+            ref_lm, ref_pval, _, _ = het_arch(z, nlags=nlags, ddof=ddof)
+        assert lm[i] == pytest.approx(ref_lm, rel=1e-8)
+        assert pval[i] == pytest.approx(ref_pval, rel=1e-8, abs=1e-300)
@@ -0,0 +1,30 @@
+"""Motor rápido (motor_garch) conferido contra o arch"""
+
+import warnings
+import numpy as np
+import pytest
+import motor_garch
+from analyzer import ajustar_modelo
+
+
+def test_verificar_equivalencia_padrao():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        rel = motor_garch.verificar_equivalencia()
+    falhas = rel[~rel['ok']]
+    assert falhas.empty, "\n" + falhas.to_string(index=False)
+
+
+@pytest.mark.parametrize("vol, p, o, q", [('GARCH', 1, 0, 1), ('GJR', 1, 1, 1)])
+def test_backends_do_analyzer_concordam_em_fracao(vol, p, o, q):
+    # Log-retornos em fração, como o Analyzer passa para ajustar_modelo
+    r = motor_garch.simular_garch(2000, alpha=0.04, gamma=0.1, beta=0.88, seed=5) / 100
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        arch = ajustar_modelo(r, vol, p, o, q, "arch", calcular_lb=False)
+        rapido = ajustar_modelo(r, vol, p, o, q, "rapido", calcular_lb=False)
+    assert arch['success'] and rapido['success']
+    assert abs(arch['aic'] - rapido['aic']) <= 1e-6 * abs(arch['aic'])
+    np.testing.assert_allclose(rapido['params'].drop('omega').values, arch['params'].drop('omega').values,
+                               atol=5e-3)
+    assert abs(rapido['params']['omega'] - arch['params']['omega']) <= 5e-3 * r.var()
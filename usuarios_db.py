@@ -0,0 +1,129 @@
+"""
+ASUS GARCH PRO 2025 - BANCO DE USUÁRIOS (SQLite)
+Substitui a regravação completa do users_database.json: cada cadastro ou
+aprovação é um upsert de uma linha numa transação, em modo WAL (leitores não
+bloqueiam o escritor). Migra o JSON antigo uma única vez.
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+USERS_DB = "users.db"
+USERS_FILE = "users_database.json"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    email     TEXT PRIMARY KEY,
+    senha     TEXT NOT NULL,
+    aprovado  INTEGER NOT NULL DEFAULT 0,
+    criado_em TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_usuarios_aprovado ON usuarios (aprovado);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+_UPSERT = """
+INSERT INTO usuarios (email, senha, aprovado, criado_em) VALUES (?, ?, ?, ?)
+ON CONFLICT(email) DO UPDATE SET senha = excluded.senha, aprovado = excluded.aprovado
+"""
+
+class RepositorioUsuarios:
+    """
+    Mesma visão do JSON antigo: {email: {"senha": sha256, "aprovado": bool}}.
+    Uma conexão por operação (o Streamlit atende cada sessão numa thread).
+    """
+
+    def __init__(self, caminho=USERS_DB, arquivo_json=USERS_FILE):
+        self.caminho = caminho
+        with closing(self._conectar()) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            with con:
+                con.executescript(_ESQUEMA)
+        self.migrar_json(arquivo_json)
+
+    def _conectar(self):
+        con = sqlite3.connect(self.caminho, timeout=10)
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    # ---------- migração ----------
+    def migrar_json(self, arquivo_json):
+        """Importa o users_database.json uma vez (registrado na tabela meta)"""
+        if not arquivo_json or not os.path.exists(arquivo_json):
+            return 0
+        with closing(self._conectar()) as con, con:
+            if con.execute("SELECT 1 FROM meta WHERE chave = 'migrado_json'").fetchone():
+                return 0
+            try:
+                with open(arquivo_json, 'r', encoding='utf-8') as f:
+                    antigos = json.load(f)
+            except (OSError, ValueError):
+                antigos = {}
+            # INSERT OR IGNORE: quem já existe no banco não é sobrescrito
+            con.executemany(
+                "INSERT OR IGNORE INTO usuarios (email, senha, aprovado, criado_em) VALUES (?, ?, ?, ?)",
+                [(email, d["senha"], int(bool(d.get("aprovado"))), None) for email, d in antigos.items()]
+            )
+            con.execute("INSERT INTO meta (chave, valor) VALUES ('migrado_json', ?)",
+                        (f"{datetime.now():%Y-%m-%d %H:%M:%S} ({len(antigos)} usuários)",))
+        return len(antigos)
+
+    # ---------- consultas ----------
+    @staticmethod
+    def _linha(senha, aprovado):
+        return {"senha": senha, "aprovado": bool(aprovado)}
+
+    def obter(self, email):
+        """Dados de um usuário ou None"""
+        with closing(self._conectar()) as con:
+            linha = con.execute("SELECT senha, aprovado FROM usuarios WHERE email = ?", (email,)).fetchone()
+        return self._linha(*linha) if linha else None
+
+    def existe(self, email):
+        return self.obter(email) is not None
+
+    def pendentes(self):
+        """{email: dados} aguardando aprovação (usa o índice de aprovado)"""
+        with closing(self._conectar()) as con:
+            linhas = con.execute("SELECT email, senha, aprovado FROM usuarios WHERE aprovado = 0 "
+                                 "ORDER BY criado_em, email").fetchall()
+        return {email: self._linha(senha, aprovado) for email, senha, aprovado in linhas}
+
+    def carregar(self):
+        """Todos os usuários (interface antiga de carregar_usuarios)"""
+        with closing(self._conectar()) as con:
+            linhas = con.execute("SELECT email, senha, aprovado FROM usuarios").fetchall()
+        return {email: self._linha(senha, aprovado) for email, senha, aprovado in linhas}
+
+    # ---------- escrita ----------
+    def salvar_usuario(self, email, dados):
+        """Upsert de uma linha"""
+        with closing(self._conectar()) as con, con:
+            con.execute(_UPSERT, (email, dados["senha"], int(bool(dados.get("aprovado"))),
+                                  f"{datetime.now():%Y-%m-%d %H:%M:%S}"))
+
+    def cadastrar(self, email, dados):
+        """Insere só se o e-mail ainda não existe; retorna False se já existia"""
+        with closing(self._conectar()) as con, con:
+            cur = con.execute(
+                "INSERT OR IGNORE INTO usuarios (email, senha, aprovado, criado_em) VALUES (?, ?, ?, ?)",
+                (email, dados["senha"], int(bool(dados.get("aprovado"))), f"{datetime.now():%Y-%m-%d %H:%M:%S}")
+            )
+            return cur.rowcount == 1
+
+    def aprovar(self, email):
+        with closing(self._conectar()) as con, con:
+            con.execute("UPDATE usuarios SET aprovado = 1 WHERE email = ?", (email,))
+
+    def salvar(self, users_dict):
+        """Interface antiga de salvar_usuarios: upsert de cada usuário numa transação"""
+        with closing(self._conectar()) as con, con:
+            agora = f"{datetime.now():%Y-%m-%d %H:%M:%S}"
+            con.executemany(_UPSERT, [(email, d["senha"], int(bool(d.get("aprovado"))), agora)
+                                      for email, d in users_dict.items()])